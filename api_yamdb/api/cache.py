@@ -0,0 +1,171 @@
+"""Кэш дорогих ответов API без лавины пересчётов.
+
+Когда закэшированный список произведений устаревает, его не должны
+одновременно пересчитывать все воркеры. Поверх кэша Django:
+
+- один пересчёт на ключ: пересчитывает тот, кто взял блокировку
+  (cache.add), остальные ждут значение или отдают устаревшее;
+- вероятностное раннее обновление (XFetch): чем ближе срок и чем
+  дольше пересчёт, тем вероятнее запрос обновит значение заранее;
+- устаревшее значение отдаётся ещё stale секунд после срока, пока
+  идёт пересчёт (stale-while-revalidate).
+
+Записи пространства имён сбрасываются invalidate(namespace): в запись
+сохраняется версия пространства, и запись другой версии считается
+устаревшей, но пригодной для отдачи во время пересчёта. Версия меняется
+после фиксации транзакции: иначе параллельный запрос мог бы сохранить
+под новой версией данные, ещё не видевшие изменений.
+
+Блокировки и версии живут в кэше Django, поэтому при нескольких
+процессах нужен общий для них кэш (CACHES в настройках).
+"""
+import hashlib
+import math
+import random
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+# Пространство имён списков произведений, сбрасывается сигналами
+# reviews.signals при изменении каталога и рейтингов
+TITLES = 'titles'
+
+# Как часто ждущий запрос проверяет, появилось ли значение, секунды
+WAIT_INTERVAL = 0.05
+
+
+def version_key(namespace):
+    return f'api-cache:{namespace}:version'
+
+
+def invalidate(namespace):
+    """Помечает устаревшими все записи пространства имён.
+
+    Внутри транзакции записи устаревают после её фиксации.
+    """
+    def bump():
+        cache.set(version_key(namespace), uuid.uuid4().hex, None)
+
+    # Вне транзакции on_commit открыл бы соединение с БД без надобности
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
+    else:
+        bump()
+
+
+def is_fresh(entry, version, beta, now):
+    """Запись актуальна и раннее обновление не выпало (XFetch)."""
+    _, entry_version, delta, expires = entry
+    # 1 - random() лежит в (0, 1], логарифм не бывает бесконечным
+    early = -delta * beta * math.log(1 - random.random())
+    return entry_version == version and now + early < expires
+
+
+class Lock:
+    """Блокировка пересчёта ключа, живёт не дольше timeout секунд."""
+
+    def __init__(self, key, timeout):
+        self.key = f'{key}:lock'
+        self.timeout = timeout
+        self.token = uuid.uuid4().hex
+
+    def acquire(self):
+        return cache.add(self.key, self.token, self.timeout)
+
+    def release(self):
+        # Блокировку с истёкшим сроком мог взять другой запрос
+        if cache.get(self.key) == self.token:
+            cache.delete(self.key)
+
+
+def get_or_compute(key, compute, namespace='default', ttl=None, stale=None,
+                   beta=None, lock_timeout=None):
+    """Значение key из кэша или результат compute(), посчитанный один раз.
+
+    ttl — сколько секунд значение актуально, stale — сколько ещё его
+    можно отдавать во время пересчёта, beta — склонность к раннему
+    обновлению (0 отключает его).
+    """
+    ttl = settings.API_CACHE_TTL if ttl is None else ttl
+    stale = settings.API_CACHE_STALE if stale is None else stale
+    beta = settings.API_CACHE_BETA if beta is None else beta
+    lock_timeout = lock_timeout or settings.API_CACHE_LOCK_TIMEOUT
+
+    values = cache.get_many([key, version_key(namespace)])
+    entry = values.get(key)
+    version = values.get(version_key(namespace))
+    if entry is not None and is_fresh(entry, version, beta, time.time()):
+        return entry[0]
+
+    lock = Lock(key, lock_timeout)
+    if lock.acquire():
+        return refresh(key, compute, lock, version, ttl, stale)
+    if entry is not None:
+        # Пересчитывает другой запрос, пока отдаём то, что есть
+        return entry[0]
+
+    # Значения нет совсем: ждём результат пересчёта другого запроса
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        if lock.acquire():
+            # Пересчитывавший запрос упал, не сохранив значение
+            return refresh(key, compute, lock, version, ttl, stale)
+    return compute()
+
+
+def refresh(key, compute, lock, version, ttl, stale):
+    """Пересчитывает значение под взятой блокировкой и сохраняет его."""
+    try:
+        started = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - started
+        cache.set(
+            key, (value, version, delta, time.time() + ttl), ttl + stale
+        )
+        return value
+    finally:
+        lock.release()
+
+
+class Uncacheable(Exception):
+    """Ответ не кэшируется (не 200), его нужно отдать как есть."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+def cached_response(namespace, ttl=None, stale=None, beta=None):
+    """Декоратор метода viewset: кэширует данные ответа 200 по URL.
+
+    Ключ не зависит от пользователя, поэтому декоратор подходит только
+    для ответов, одинаковых для всех.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            def compute():
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    raise Uncacheable(response)
+                return response.data
+
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            try:
+                data = get_or_compute(
+                    f'api-cache:{namespace}:{path}', compute, namespace,
+                    ttl, stale, beta
+                )
+            except Uncacheable as e:
+                return e.response
+            return Response(data)
+        return wrapper
+    return decorator
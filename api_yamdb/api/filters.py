@@ -1,14 +1,55 @@
+from django.db.models import Subquery
 from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
 
-from backend.models import Title
+from backend.models import Category, Title
+
+GENRE_MODE_ANY = 'or'
+GENRE_MODE_ALL = 'and'
+
+# Сортировка по умолчанию при фильтре по диапазону: индекс поля и
+# отбирает строки, и отдаёт их по порядку, без обхода всей таблицы по id
+RANGE_ORDERING = (
+    ('year_min', '-year'),
+    ('year_max', '-year'),
+    ('rating_min', '-rating'),
+    ('rating_max', '-rating'),
+    ('weighted_rating_min', '-weighted_rating'),
+)
+
+
+class StableOrderingFilter(filters.OrderingFilter):
+    """Сортировка с id в конце, чтобы страницы не пересекались.
+
+    Направление id совпадает с направлением последнего поля, поэтому
+    SQLite обходит индекс по полю, не досортировывая строки.
+    """
+
+    def filter(self, qs, value):
+        qs = super().filter(qs, value)
+        if value in EMPTY_VALUES:
+            return qs
+        ordering = list(qs.query.order_by)
+        if ordering:
+            descending = ordering[-1].startswith('-')
+            ordering.append('-id' if descending else 'id')
+        return qs.order_by(*ordering)
 
 
 class TitleFilter(filters.FilterSet):
     category = filters.CharFilter(
-        field_name='category__slug',
+        method='filter_category',
     )
     genre = filters.CharFilter(
-        field_name='genre__slug',
+        method='filter_genre',
+        help_text='Один или несколько slug жанров через запятую',
+    )
+    genre_mode = filters.ChoiceFilter(
+        method='filter_noop',
+        choices=(
+            (GENRE_MODE_ANY, 'Любой из жанров'),
+            (GENRE_MODE_ALL, 'Все жанры'),
+        ),
     )
     name = filters.CharFilter(
         field_name='name',
@@ -17,6 +58,34 @@ class TitleFilter(filters.FilterSet):
     year = filters.NumberFilter(
         field_name='year',
     )
+    year_min = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='gte',
+    )
+    year_max = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='lte',
+    )
+    rating_min = filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='gte',
+    )
+    rating_max = filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='lte',
+    )
+    weighted_rating_min = filters.NumberFilter(
+        field_name='weighted_rating',
+        lookup_expr='gte',
+    )
+    ordering = StableOrderingFilter(
+        fields=(
+            'year',
+            'name',
+            'rating',
+            'weighted_rating',
+        ),
+    )
 
     class Meta:
         model = Title
@@ -24,6 +93,53 @@ class TitleFilter(filters.FilterSet):
         fields = (
             'category',
             'genre',
+            'genre_mode',
             'year',
+            'year_min',
+            'year_max',
             'name',
+            'rating_min',
+            'rating_max',
+            'weighted_rating_min',
         )
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.form.cleaned_data.get('ordering'):
+            return queryset
+        for name, ordering in RANGE_ORDERING:
+            if self.form.cleaned_data.get(name) is not None:
+                return queryset.order_by(ordering, '-id')
+        return queryset
+
+    def filter_noop(self, queryset, name, value):
+        # genre_mode учитывается в filter_genre
+        return queryset
+
+    def filter_category(self, queryset, name, value):
+        # Категория, помеченная удалённой, уже не находит произведений.
+        # Равенство скалярному подзапросу, а не JOIN, оставляет
+        # планировщику индексы по category
+        return queryset.filter(category=Subquery(
+            Category.objects.alive().filter(slug=value).values('pk')[:1]
+        ))
+
+    def filter_genre(self, queryset, name, value):
+        """Произведения с любым (or) или со всеми (and) жанрами.
+
+        Жанры проверяются подзапросами к таблице связи по индексу
+        genre_id, без JOIN, который размножал бы строки произведений.
+        """
+        slugs = [slug.strip() for slug in value.split(',') if slug.strip()]
+        if not slugs:
+            return queryset
+        through = Title.genre.through.objects
+        if self.form.cleaned_data.get('genre_mode') == GENRE_MODE_ALL:
+            for slug in slugs:
+                queryset = queryset.filter(pk__in=through.filter(
+                    genre__slug=slug, genre__is_deleted=False
+                ).values('title_id'))
+            return queryset
+        return queryset.filter(pk__in=through.filter(
+            genre__slug__in=slugs, genre__is_deleted=False
+        ).values('title_id'))
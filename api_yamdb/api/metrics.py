@@ -0,0 +1,277 @@
+"""Метрики API в текстовом формате Prometheus.
+
+Каждый поток пишет в собственное хранилище, поэтому обработка запроса
+обходится без блокировок: хранилища объединяются только при чтении
+метрик. Хранилища завершившихся потоков переносятся в общий снимок,
+так что их число не растёт вместе с числом созданных потоков. В режиме
+нескольких процессов (METRICS_MULTIPROC_DIR) каждый процесс
+периодически сохраняет снимок своих метрик в файл, а /metrics суммирует
+файлы всех процессов.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+# Границы корзин гистограммы задержки, секунды
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+_local = threading.local()
+# Хранилища живых потоков по потоку и снимок метрик завершившихся
+_stores = {}
+_retired = {}
+_stores_lock = threading.Lock()
+_last_flush = [0.0]
+
+
+class ViewMetrics:
+    """Метрики одного действия view в пределах одного потока."""
+
+    def __init__(self):
+        self.responses = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.duration_sum = 0.0
+        self.queries = 0
+        self.query_duration = 0.0
+        self.errors = 0
+
+    def observe(self, method, status, duration, queries, query_duration):
+        key = (method, status)
+        self.responses[key] = self.responses.get(key, 0) + 1
+        self.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.duration_sum += duration
+        self.queries += queries
+        self.query_duration += query_duration
+        if status >= 500:
+            self.errors += 1
+
+    def to_dict(self):
+        return {
+            'responses': [
+                [method, status, count]
+                for (method, status), count in list(self.responses.items())
+            ],
+            'buckets': list(self.buckets),
+            'duration_sum': self.duration_sum,
+            'queries': self.queries,
+            'query_duration': self.query_duration,
+            'errors': self.errors,
+        }
+
+
+def get_store():
+    """Хранилище метрик текущего потока."""
+    store = getattr(_local, 'store', None)
+    if store is None:
+        store = _local.store = {}
+        with _stores_lock:
+            prune()
+            _stores[threading.current_thread()] = store
+    return store
+
+
+def prune():
+    """Переносит хранилища завершившихся потоков в _retired.
+
+    Вызывается под _stores_lock. Завершившийся поток больше не пишет в
+    своё хранилище, поэтому его можно читать без гонок.
+    """
+    for thread in [thread for thread in _stores if not thread.is_alive()]:
+        for (view, action), metrics in _stores.pop(thread).items():
+            merge(_retired, view, action, metrics.to_dict())
+
+
+def responses_list(metrics):
+    return [
+        [method, status, count]
+        for (method, status), count in metrics['responses'].items()
+    ]
+
+
+def observe(view, action, method, status, duration, queries,
+            query_duration):
+    store = get_store()
+    metrics = store.get((view, action))
+    if metrics is None:
+        metrics = store[(view, action)] = ViewMetrics()
+    metrics.observe(method, status, duration, queries, query_duration)
+
+
+def merge(target, view, action, data):
+    """Добавляет снимок метрик действия к агрегату target."""
+    total = target.setdefault((view, action), {
+        'responses': {},
+        'buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+        'duration_sum': 0.0,
+        'queries': 0,
+        'query_duration': 0.0,
+        'errors': 0,
+    })
+    for method, status, count in data['responses']:
+        key = (method, status)
+        total['responses'][key] = total['responses'].get(key, 0) + count
+    for index, count in enumerate(data['buckets']):
+        total['buckets'][index] += count
+    for name in ('duration_sum', 'queries', 'query_duration', 'errors'):
+        total[name] += data[name]
+
+
+def process_snapshot():
+    """Метрики всех потоков текущего процесса."""
+    snapshot = {}
+    with _stores_lock:
+        prune()
+        stores = list(_stores.values())
+        for (view, action), metrics in _retired.items():
+            merge(snapshot, view, action, {
+                **metrics, 'responses': responses_list(metrics)
+            })
+    for store in stores:
+        for (view, action), metrics in list(store.items()):
+            merge(snapshot, view, action, metrics.to_dict())
+    return snapshot
+
+
+def flush(force=False):
+    """Сохраняет снимок процесса в METRICS_MULTIPROC_DIR."""
+    directory = settings.METRICS_MULTIPROC_DIR
+    now = time.monotonic()
+    if not directory or (
+            not force
+            and now - _last_flush[0] < settings.METRICS_FLUSH_INTERVAL):
+        return
+    _last_flush[0] = now
+    data = [
+        {
+            'view': view,
+            'action': action,
+            **metrics,
+            'responses': responses_list(metrics),
+        }
+        for (view, action), metrics in process_snapshot().items()
+    ]
+    # Запись через временный файл, чтобы /metrics не прочитал его частично
+    handle, path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(handle, 'w') as file:
+        json.dump(data, file)
+    os.replace(path, os.path.join(directory, f'metrics-{os.getpid()}.json'))
+
+
+def collect():
+    """Метрики процесса или, в режиме нескольких процессов, всех воркеров."""
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return process_snapshot()
+
+    flush(force=True)
+    snapshot = {}
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith('metrics-') and name.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            continue
+        for metrics in data:
+            merge(snapshot, metrics['view'], metrics['action'], metrics)
+    return snapshot
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('\n', r'\n')
+        .replace('"', r'\"')
+    )
+
+
+def render(snapshot):
+    """Текстовый формат экспозиции Prometheus 0.0.4."""
+    lines = [
+        '# HELP yamdb_http_requests_total Количество обработанных запросов.',
+        '# TYPE yamdb_http_requests_total counter',
+    ]
+    items = sorted(snapshot.items())
+    for (view, action), metrics in items:
+        for (method, status), count in sorted(metrics['responses'].items()):
+            lines.append(
+                f'yamdb_http_requests_total{{view="{escape(view)}",'
+                f'action="{escape(action)}",method="{method}",'
+                f'status="{status}"}} {count}'
+            )
+
+    lines += [
+        '# HELP yamdb_http_errors_total Количество ответов с кодом 5xx.',
+        '# TYPE yamdb_http_errors_total counter',
+    ]
+    for (view, action), metrics in items:
+        lines.append(
+            f'yamdb_http_errors_total{{view="{escape(view)}",'
+            f'action="{escape(action)}"}} {metrics["errors"]}'
+        )
+
+    lines += [
+        '# HELP yamdb_http_request_duration_seconds Время обработки запроса.',
+        '# TYPE yamdb_http_request_duration_seconds histogram',
+    ]
+    for (view, action), metrics in items:
+        labels = f'view="{escape(view)}",action="{escape(action)}"'
+        cumulative = 0
+        for bound, count in zip(
+                LATENCY_BUCKETS + ('+Inf',), metrics['buckets']):
+            cumulative += count
+            lines.append(
+                f'yamdb_http_request_duration_seconds_bucket'
+                f'{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append(
+            f'yamdb_http_request_duration_seconds_sum{{{labels}}} '
+            f'{metrics["duration_sum"]}'
+        )
+        lines.append(
+            f'yamdb_http_request_duration_seconds_count{{{labels}}} '
+            f'{cumulative}'
+        )
+
+    lines += [
+        '# HELP yamdb_db_queries_total Количество SQL-запросов.',
+        '# TYPE yamdb_db_queries_total counter',
+    ]
+    for (view, action), metrics in items:
+        lines.append(
+            f'yamdb_db_queries_total{{view="{escape(view)}",'
+            f'action="{escape(action)}"}} {metrics["queries"]}'
+        )
+
+    lines += [
+        '# HELP yamdb_db_query_duration_seconds_total Время SQL-запросов.',
+        '# TYPE yamdb_db_query_duration_seconds_total counter',
+    ]
+    for (view, action), metrics in items:
+        lines.append(
+            f'yamdb_db_query_duration_seconds_total{{view="{escape(view)}",'
+            f'action="{escape(action)}"}} {metrics["query_duration"]}'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+class QueryCounter:
+    """Обёртка для connection.execute_wrapper(), считающая SQL-запросы."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
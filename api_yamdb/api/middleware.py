@@ -0,0 +1,129 @@
+import hashlib
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from api import metrics, profiling
+from api.routers import replica_reads
+
+
+def get_client_key(request):
+    """Ключ клиента для «липкого» чтения из основной БД.
+
+    Пользователь API определяется по токену из заголовка Authorization:
+    аутентификация DRF выполняется позже, уже внутри view.
+    """
+    credentials = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    digest = hashlib.sha1(credentials.encode()).hexdigest()
+    return f'replica-sticky:{digest}'
+
+
+class ReplicaRoutingMiddleware:
+    """Направляет безопасные запросы к API v1 на реплики БД."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS or not request.path.startswith(
+                settings.REPLICA_ROUTED_PATHS):
+            return self.get_response(request)
+
+        client_key = get_client_key(request)
+        use_replicas = (
+            request.method in SAFE_METHODS
+            and not cache.get(client_key)
+        )
+        with replica_reads(use_replicas) as state:
+            response = self.get_response(request)
+            if state.wrote:
+                cache.set(client_key, True, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+
+class ProfilingMiddleware:
+    """Собирает профиль запроса и отдаёт его в заголовке Server-Timing.
+
+    Подключается только при API_PROFILING = True.
+    """
+
+    def __init__(self, get_response):
+        if not settings.API_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = profiling.RequestProfile(request.method, request.path)
+        profiling._local.profile = profile
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(profile)
+                    )
+                response = self.get_response(request)
+        finally:
+            profiling._local.profile = None
+        profile.total = (time.perf_counter() - started) * 1000
+
+        if request.resolver_match is not None:
+            profile.view_name = request.resolver_match.view_name
+        response['Server-Timing'] = profile.server_timing()
+        profiling.record(profile)
+        return response
+
+
+class MetricsMiddleware:
+    """Считает запросы, задержку и SQL-запросы по view и действию.
+
+    Отключается настройкой METRICS_ENABLED = False.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = metrics.QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(counter)
+                )
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        view, action = getattr(
+            request, 'metrics_labels', ('<unresolved>', '')
+        )
+        metrics.observe(
+            view, action, request.method, response.status_code,
+            duration, counter.count, counter.duration
+        )
+        metrics.flush()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is None:
+            request.metrics_labels = (view_func.__name__, '')
+            return None
+        # Для ViewSet действие определяется по методу запроса
+        actions = getattr(view_func, 'actions', None) or {}
+        method = request.method.lower()
+        request.metrics_labels = (
+            view_class.__name__, actions.get(method, method)
+        )
+        return None
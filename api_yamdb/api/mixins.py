@@ -2,6 +2,9 @@ from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
 from rest_framework.viewsets import GenericViewSet
 
+from api.profiling import section
+from backend.deletion import schedule_deletion
+
 
 class CreateDestroyListViewSet(
     CreateModelMixin,
@@ -10,3 +13,18 @@ class CreateDestroyListViewSet(
     GenericViewSet
 ):
     pass
+
+
+class ProfiledFilterMixin:
+    """Учитывает время построения фильтров в профиле запроса."""
+
+    def filter_queryset(self, queryset):
+        with section('filter'):
+            return super().filter_queryset(queryset)
+
+
+class ScheduledDeletionMixin:
+    """Удаляет объект в фоне: запрос только ставит задачу в очередь."""
+
+    def perform_destroy(self, instance):
+        schedule_deletion(instance)
@@ -0,0 +1,15 @@
+from rest_framework.pagination import CursorPagination
+
+
+class HistoryPagination(CursorPagination):
+    """Постраничный вывод истории пользователя по курсору.
+
+    Страница выбирается условием по pub_date, а не OFFSET, поэтому
+    индекс (author, pub_date) читается только в пределах страницы.
+    """
+    ordering = '-pub_date'
+
+
+class ModerationQueuePagination(CursorPagination):
+    """Очередь модерации по курсору, сначала старые записи."""
+    ordering = 'pub_date'
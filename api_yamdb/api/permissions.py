@@ -22,6 +22,16 @@ class IsAdminOrSuperuser(BasePermission):
         return False
 
 
+class IsModerator(BasePermission):
+    """Доступ модераторам, администраторам и суперпользователям."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if user.is_anonymous:
+            return False
+        return user.is_moderator() or user.is_admin() or user.is_superuser
+
+
 class ReviewPermissions(BasePermission):
     def has_permission(self, request, view):
         method = request.method
@@ -0,0 +1,191 @@
+"""Профилирование запросов к API: SQL, фильтры, сериализация, рендеринг.
+
+Включается настройкой API_PROFILING. Когда профилирование выключено,
+ProfilingMiddleware не подключается, а section() сводится к одной
+проверке thread-local переменной.
+"""
+import os
+import threading
+import time
+import traceback
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework import serializers
+
+_local = threading.local()
+
+_history = deque(maxlen=settings.API_PROFILING_HISTORY)
+_history_lock = threading.Lock()
+
+# Сколько самых медленных SQL-запросов хранить для каждого запроса
+SLOWEST_QUERIES = 5
+
+
+def current_profile():
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def section(name):
+    """Добавляет время выполнения блока к разделу текущего профиля."""
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.sections[name] += (time.perf_counter() - started) * 1000
+
+
+# Кадры, которые не считаются местом вызова SQL-запроса
+IGNORED_FRAMES = (
+    os.path.join('django', 'db', ''),
+    os.path.join('api', 'profiling.py'),
+    os.path.join('api', 'middleware.py'),
+)
+SITE_PACKAGES = os.sep + 'site-packages' + os.sep
+
+
+def get_query_origin():
+    """Место вызова SQL-запроса: ближайший кадр из кода проекта.
+
+    Если запрос выполнен библиотекой без участия кода проекта
+    (например, пагинатором DRF), возвращается кадр библиотеки.
+    """
+    fallback = ''
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if any(ignored in filename for ignored in IGNORED_FRAMES):
+            continue
+        if SITE_PACKAGES in filename:
+            if not fallback:
+                fallback = (
+                    f'{filename.split(SITE_PACKAGES, 1)[1]}:{frame.lineno} '
+                    f'in {frame.name}'
+                )
+            continue
+        if filename.startswith(settings.BASE_DIR):
+            path = os.path.relpath(filename, settings.BASE_DIR)
+            return f'{path}:{frame.lineno} in {frame.name}'
+    return fallback
+
+
+class RequestProfile:
+    """Замеры одного запроса, время в миллисекундах."""
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.view_name = ''
+        self.total = 0.0
+        self.sections = defaultdict(float)
+        self.query_count = 0
+        self.slowest_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper()."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.query_count += 1
+            self.sections['sql'] += duration
+            self.add_query(duration, sql)
+
+    def add_query(self, duration, sql):
+        if (len(self.slowest_queries) >= SLOWEST_QUERIES
+                and duration <= self.slowest_queries[-1]['duration']):
+            return
+        self.slowest_queries.append({
+            'duration': round(duration, 3),
+            'sql': sql,
+            'origin': get_query_origin(),
+        })
+        self.slowest_queries.sort(key=lambda query: -query['duration'])
+        del self.slowest_queries[SLOWEST_QUERIES:]
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing."""
+        metrics = [
+            f'{name};dur={duration:.3f}'
+            for name, duration in sorted(self.sections.items())
+        ]
+        metrics.append(f'queries;desc="{self.query_count} queries"')
+        metrics.append(f'total;dur={self.total:.3f}')
+        return ', '.join(metrics)
+
+
+def record(profile):
+    with _history_lock:
+        _history.append(profile)
+
+
+def summary():
+    """Средние значения по view за последние API_PROFILING_HISTORY запросов."""
+    with _history_lock:
+        profiles = list(_history)
+
+    views = defaultdict(list)
+    for profile in profiles:
+        views[(profile.method, profile.view_name or profile.path)].append(
+            profile
+        )
+
+    result = []
+    for (method, view_name), items in views.items():
+        count = len(items)
+        sections = defaultdict(float)
+        for profile in items:
+            for name, duration in profile.sections.items():
+                sections[name] += duration
+        result.append({
+            'method': method,
+            'view': view_name,
+            'requests': count,
+            'avg_total': round(sum(p.total for p in items) / count, 3),
+            'max_total': round(max(p.total for p in items), 3),
+            'avg_queries': round(
+                sum(p.query_count for p in items) / count, 2
+            ),
+            'avg_sections': {
+                name: round(duration / count, 3)
+                for name, duration in sorted(sections.items())
+            },
+        })
+    result.sort(key=lambda item: -item['avg_total'] * item['requests'])
+
+    slowest = sorted(
+        (query for profile in profiles for query in profile.slowest_queries),
+        key=lambda query: -query['duration']
+    )[:SLOWEST_QUERIES * 2]
+    return {
+        'enabled': settings.API_PROFILING,
+        'requests': len(profiles),
+        'views': result,
+        'slowest_queries': slowest,
+    }
+
+
+class ProfiledListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with section('serializer'):
+            return super().data
+
+
+class ProfiledSerializerMixin:
+    """Учитывает время сериализации в профиле запроса.
+
+    Для many=True в Meta нужно указать
+    list_serializer_class = ProfiledListSerializer.
+    """
+
+    @property
+    def data(self):
+        with section('serializer'):
+            return super().data
@@ -0,0 +1,58 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.profiling import section
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON-рендерер на orjson с откатом на стандартный json.
+
+    Если orjson не установлен или клиент запросил форматированный вывод
+    (indent), рендеринг выполняет стандартный JSONRenderer из DRF.
+    """
+    if orjson is not None:
+        options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with section('render'):
+            return self.render_json(
+                data, accepted_media_type, renderer_context
+            )
+
+    def render_json(self, data, accepted_media_type, renderer_context):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # datetime, UUID и dataclass orjson сериализует сам, остальное
+        # (Decimal, ленивые строки, QuerySet) — через кодировщик DRF
+        ret = orjson.dumps(
+            data, default=JSONEncoder().default, option=self.options
+        )
+
+        # Как и DRF, экранируем U+2028 и U+2029 для совместимости с JS
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028')
+            ret = ret.replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Текстовый формат экспозиции метрик Prometheus."""
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data.encode(self.charset)
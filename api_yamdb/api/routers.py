@@ -0,0 +1,63 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+
+def choose_replica():
+    """Реплика с учётом весов или основная БД, если реплик нет."""
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas:
+        return DEFAULT_DB_ALIAS
+    return random.choices(
+        list(replicas), weights=list(replicas.values())
+    )[0]
+
+
+@contextmanager
+def replica_reads(enabled):
+    """Разрешает чтение из реплик на время обработки запроса.
+
+    Реплика выбирается одна на запрос: запросы одной страницы (COUNT
+    пагинатора и выборка) видят данные с одинаковым отставанием.
+    """
+    previous = (
+        getattr(_state, 'use_replicas', False),
+        getattr(_state, 'replica', DEFAULT_DB_ALIAS),
+    )
+    _state.use_replicas = enabled
+    _state.replica = choose_replica() if enabled else DEFAULT_DB_ALIAS
+    _state.wrote = False
+    try:
+        yield _state
+    finally:
+        _state.use_replicas, _state.replica = previous
+
+
+class ReplicaRouter:
+    """Роутер, отправляющий чтение на реплики, а запись — в основную БД.
+
+    Реплики используются только внутри replica_reads(True), который
+    включает ReplicaRoutingMiddleware. После первой записи в рамках
+    запроса всё дальнейшее чтение идёт в основную БД.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not getattr(_state, 'use_replicas', False):
+            return DEFAULT_DB_ALIAS
+        return _state.replica
+
+    def db_for_write(self, model, **hints):
+        _state.use_replicas = False
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
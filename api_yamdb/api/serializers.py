@@ -1,53 +1,168 @@
+from django.conf import settings
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 
-from backend.models import Category, Genre, Title, User
-from reviews.models import Comment, Review
+from api.profiling import ProfiledListSerializer, ProfiledSerializerMixin
+from backend.models import Category, Genre, ImportJob, Job, Title, User
+from reviews.models import Comment, LeaderboardEntry, Review
+from reviews.moderation import ACTIONS
 
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        exclude = ('id', )
+        exclude = ('id', 'is_deleted')
         ordering = ['-id']
 
 
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Genre
-        exclude = ('id', )
+        exclude = ('id', 'is_deleted')
         ordering = ['-id']
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(ProfiledSerializerMixin,
+                          serializers.ModelSerializer):
     genre = GenreSerializer(
+        source='alive_genres',
         read_only=True,
         many=True)
-    category = CategorySerializer(read_only=True)
+    category = CategorySerializer(source='alive_category', read_only=True)
     rating = serializers.IntegerField(read_only=True, required=False)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('is_deleted', )
         model = Title
         ordering = ['-id']
+        list_serializer_class = ProfiledListSerializer
+
+
+class LeaderboardSerializer(serializers.ModelSerializer):
+    """Произведение в списке лучших с рейтингом за период"""
+    title = TitleReadSerializer(read_only=True)
+
+    class Meta:
+        fields = ['rating', 'review_count', 'title']
+        model = LeaderboardEntry
+
+
+class RatingsSerializer(serializers.Serializer):
+    """Гистограмма оценок произведения"""
+    count = serializers.IntegerField()
+    mean = serializers.FloatField(allow_null=True)
+    median = serializers.FloatField(allow_null=True)
+    distribution = serializers.DictField(child=serializers.IntegerField())
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(),
+        queryset=Genre.objects.alive(),
         slug_field='slug',
         many=True
     )
     category = serializers.SlugRelatedField(
-        queryset=Category.objects.all(),
+        queryset=Category.objects.alive(),
         slug_field='slug'
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('is_deleted', )
         model = Title
         ordering = ['-id']
+        read_only_fields = ['rating', 'weighted_rating', 'review_count']
+
+
+class TitleBriefSerializer(serializers.ModelSerializer):
+    """Произведение в истории отзывов и комментариев пользователя"""
+
+    class Meta:
+        fields = ['id', 'name']
+        model = Title
+
+
+class UserReviewSerializer(ProfiledSerializerMixin,
+                           serializers.ModelSerializer):
+    author = serializers.SlugRelatedField(
+        read_only=True,
+        slug_field='username',
+    )
+    title = TitleBriefSerializer(read_only=True)
+
+    class Meta:
+        fields = ['id', 'text', 'author', 'score', 'pub_date', 'title']
+        model = Review
+        list_serializer_class = ProfiledListSerializer
+
+
+class UserCommentSerializer(ProfiledSerializerMixin,
+                            serializers.ModelSerializer):
+    author = serializers.SlugRelatedField(
+        read_only=True, slug_field='username')
+    title = TitleBriefSerializer(source='review.title', read_only=True)
+
+    class Meta:
+        fields = ['id', 'text', 'author', 'pub_date', 'review', 'title']
+        model = Comment
+        list_serializer_class = ProfiledListSerializer
+
+
+class ModerationSerializer(serializers.Serializer):
+    """Массовое действие модератора над отзывами или комментариями"""
+    action = serializers.ChoiceField(choices=ACTIONS)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+    )
+
+    def validate_ids(self, value):
+        limit = settings.MODERATION_BULK_LIMIT
+        if len(value) > limit:
+            raise ValidationError(
+                f'За один запрос можно обработать не больше {limit} записей'
+            )
+        return list(dict.fromkeys(value))
+
+
+class BulkReviewSerializer(serializers.Serializer):
+    """Отзыв партнёра: автор указывается именем пользователя"""
+    title = serializers.IntegerField(min_value=1)
+    author = serializers.CharField(max_length=150)
+    text = serializers.CharField()
+    score = serializers.IntegerField(min_value=1, max_value=10)
+
+
+class ReviewBulkSerializer(serializers.Serializer):
+    """Пачка отзывов для массовой загрузки"""
+    reviews = BulkReviewSerializer(many=True, allow_empty=False)
+
+    def validate_reviews(self, value):
+        limit = settings.REVIEW_BULK_LIMIT
+        if len(value) > limit:
+            raise ValidationError(
+                f'За один запрос можно загрузить не больше {limit} отзывов'
+            )
+        return value
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """Ход загрузки CSV-файла"""
+
+    class Meta:
+        model = ImportJob
+        exclude = ('path',)
+        read_only_fields = (
+            'file_name', 'size', 'status', 'processed', 'error'
+        )
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Задача фоновой очереди"""
+
+    class Meta:
+        model = Job
+        exclude = ('lease',)
 
 
 class SignupSerializer(serializers.ModelSerializer):
@@ -128,7 +243,8 @@ class UserRoleSerializer(serializers.ModelSerializer):
         return username
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(ProfiledSerializerMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
@@ -141,10 +257,10 @@ class ReviewSerializer(serializers.ModelSerializer):
     def validate(self, data):
         request = self.context['request']
         title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
+        title = get_object_or_404(Title.objects.alive(), pk=title_id)
 
         if request.method == 'POST':
-            if Review.objects.filter(
+            if Review.objects.alive().filter(
                     title=title,
                     author=request.user
             ).exists():
@@ -153,12 +269,15 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
     class Meta:
-        fields = ['id', 'text', 'author', 'score', 'pub_date']
+        fields = ['id', 'text', 'author', 'score', 'pub_date', 'comment_count']
+        read_only_fields = ['comment_count']
         model = Review
         ordering = ['-pub_date']
+        list_serializer_class = ProfiledListSerializer
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(ProfiledSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username')
     review = serializers.PrimaryKeyRelatedField(
@@ -170,3 +289,4 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         read_only_fields = ['author', 'review']
         ordering = ['-pub_date']
+        list_serializer_class = ProfiledListSerializer
@@ -2,12 +2,25 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, SignupAPI, TitleViewSet, TokenAPI,
+                       ImportViewSet, JobViewSet, ModerationCommentViewSet,
+                       ModerationReviewViewSet, ProfilingSummaryAPI,
+                       ReviewBulkAPI, ReviewViewSet, SignupAPI, TitleViewSet,
+                       TokenAPI, UserCommentViewSet, UserReviewViewSet,
                        UserViewSet)
 
 # Регистрация роутера и вьюсетов для API v1
 router_v1 = DefaultRouter()
 router_v1.register('users', UserViewSet, basename='user')
+router_v1.register(
+    r'users/(?P<username>[^/.]+)/reviews',
+    UserReviewViewSet,
+    basename='user-review'
+)
+router_v1.register(
+    r'users/(?P<username>[^/.]+)/comments',
+    UserCommentViewSet,
+    basename='user-comment'
+)
 router_v1.register('categories', CategoryViewSet, basename='category')
 router_v1.register('genres', GenreViewSet, basename='genre')
 router_v1.register(
@@ -21,11 +34,25 @@ router_v1.register(
     basename='comment'
 )
 router_v1.register('titles', TitleViewSet, basename='title')
+router_v1.register(
+    'moderation/reviews',
+    ModerationReviewViewSet,
+    basename='moderation-review'
+)
+router_v1.register('imports', ImportViewSet, basename='import')
+router_v1.register('jobs', JobViewSet, basename='job')
+router_v1.register(
+    'moderation/comments',
+    ModerationCommentViewSet,
+    basename='moderation-comment'
+)
 
 # Urls для API v1
 api_urls_v1 = [
     path('auth/signup/', SignupAPI.as_view(), name='signup'),
     path('auth/token/', TokenAPI.as_view(), name='token'),
+    path('profiling/', ProfilingSummaryAPI.as_view(), name='profiling'),
+    path('reviews/bulk/', ReviewBulkAPI.as_view(), name='reviews-bulk'),
     path('', include(router_v1.urls))
 ]
 
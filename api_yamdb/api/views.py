@@ -1,35 +1,69 @@
-from django.conf import settings
+import io
+import itertools
+import json
+from collections import OrderedDict
+
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
+from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
 from rest_framework.pagination import (LimitOffsetPagination,
                                        PageNumberPagination)
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
+from api.cache import TITLES, cached_response
 from api.filters import TitleFilter
+from api import metrics, profiling
+from api.pagination import HistoryPagination, ModerationQueuePagination
 from api.permissions import (ReviewPermissions, CommentPermissions,
-                             IsAdminOrReadOnly, IsAdminOrSuperuser)
+                             IsAdminOrReadOnly, IsAdminOrSuperuser,
+                             IsModerator)
+from api.renderers import PrometheusRenderer
 from api.serializers import (CategorySerializer, CommentSerializer,
-                             GenreSerializer, ReviewSerializer,
-                             SignupSerializer, TitleReadSerializer,
-                             TitleWriteSerializer, TokenSerializer,
-                             UserRoleSerializer, UserSerializer)
+                             GenreSerializer, ImportJobSerializer,
+                             JobSerializer,
+                             LeaderboardSerializer,
+                             ModerationSerializer, RatingsSerializer,
+                             ReviewBulkSerializer, ReviewSerializer,
+                             SignupSerializer,
+                             TitleReadSerializer, TitleWriteSerializer,
+                             TokenSerializer, UserCommentSerializer,
+                             UserReviewSerializer, UserRoleSerializer,
+                             UserSerializer)
 from api.tokens import get_tokens_for_user
-from backend.models import Category, Genre, Title, User
-from reviews.models import Review
-from .mixins import CreateDestroyListViewSet
+from backend import jobs
+from backend.importers import (CHUNK_SIZE, MODEL_FILE_NAMES, check_header,
+                               save_upload)
+from backend.mail import CONFIRMATION_CODE
+from backend.models import Category, Genre, ImportJob, Job, Title, User
+from reviews import documents
+from reviews.bulk import ingest_reviews
+from reviews.counters import get_distribution
+from reviews.leaderboard import WINDOW_DAYS, top_titles
+from reviews.models import Comment, LeaderboardEntry, Review
+from reviews.moderation import delete_comments, moderate
+from .mixins import (CreateDestroyListViewSet, ProfiledFilterMixin,
+                     ScheduledDeletionMixin)
+
+# Размер списка лучших произведений по умолчанию и максимальный
+TOP_TITLES_LIMIT = 10
+TOP_TITLES_MAX_LIMIT = 100
 
 
-class CategoryViewSet(CreateDestroyListViewSet):
+class CategoryViewSet(ScheduledDeletionMixin, CreateDestroyListViewSet):
     """ViewSet для работы с категориями контента"""
-    queryset = Category.objects.all()
+    queryset = Category.objects.alive()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (SearchFilter,)
@@ -38,9 +72,9 @@ class CategoryViewSet(CreateDestroyListViewSet):
     lookup_field = 'slug'
 
 
-class GenreViewSet(CreateDestroyListViewSet):
+class GenreViewSet(ScheduledDeletionMixin, CreateDestroyListViewSet):
     """ViewSet для работы с жанрами"""
-    queryset = Genre.objects.all()
+    queryset = Genre.objects.alive()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (SearchFilter,)
@@ -49,39 +83,187 @@ class GenreViewSet(CreateDestroyListViewSet):
     lookup_field = 'slug'
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(ProfiledFilterMixin, ModelViewSet):
     """ViewSet для работы с комментариями"""
     serializer_class = CommentSerializer
     permission_classes = (CommentPermissions,)
     pagination_class = LimitOffsetPagination
 
+    def get_review(self):
+        return get_object_or_404(
+            Review.objects.visible(), pk=self.kwargs.get('review_id')
+        )
+
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return self.get_review().comments.visible()
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
+
+    def perform_destroy(self, instance):
+        # Строку удалит команда purge_deleted
+        delete_comments([instance.pk])
 
+    @action(methods=['POST'], detail=True,
+            permission_classes=[permissions.IsAuthenticated])
+    def flag(self, request, title_id=None, review_id=None, pk=None):
+        """Отправляет комментарий в очередь модерации"""
+        Comment.objects.filter(pk=self.get_object().pk).update(
+            is_flagged=True
+        )
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+def document_response(request, content):
+    """Ответ с готовым JSON из документа произведения.
+
+    Клиенту, принимающему обычный JSON, строка отдаётся как есть, без
+    повторной сериализации. Для других форматов (браузерный API, JSON с
+    отступами) она разбирается и рендерится как обычно.
+    """
+    renderer = request.accepted_renderer
+    if (renderer.format == 'json'
+            and request.accepted_media_type == renderer.media_type):
+        return HttpResponse(content, content_type=renderer.media_type)
+    return Response(json.loads(content, object_pairs_hook=OrderedDict))
+
+
+class ReviewViewSet(ProfiledFilterMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (ReviewPermissions,)
     pagination_class = PageNumberPagination
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        title = get_object_or_404(
+            Title.objects.alive(), id=self.kwargs.get('title_id')
+        )
+        return title.reviews.visible()
+
+    def list(self, request, *args, **kwargs):
+        # Первая страница популярного произведения — из готового документа
+        document = None
+        if dict(request.query_params.items()) in ({}, {'page': '1'}):
+            document = documents.load(kwargs['title_id'])
+        if document is None:
+            return super().list(request, *args, **kwargs)
+        next_url = None
+        if document.review_total > self.paginator.page_size:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'page', 2
+            )
+        # Страница собирается вокруг готового JSON отзывов без разбора
+        return document_response(request, (
+            f'{{"count":{document.review_total},'
+            f'"next":{documents.dumps(next_url)},"previous":null,'
+            f'"results":{document.reviews}}}'
+        ))
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        title = get_object_or_404(
+            Title.objects.alive(), id=self.kwargs.get('title_id')
+        )
         serializer.save(author=self.request.user, title_id=title.id)
 
+    def perform_destroy(self, instance):
+        # Сохранение обновит рейтинг, а строку с комментариями удалит
+        # команда purge_deleted
+        instance.is_deleted = True
+        instance.save(update_fields=['is_deleted'])
+
+    @action(methods=['POST'], detail=True,
+            permission_classes=[permissions.IsAuthenticated])
+    def flag(self, request, title_id=None, pk=None):
+        """Отправляет отзыв в очередь модерации"""
+        Review.objects.filter(pk=self.get_object().pk).update(is_flagged=True)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UserHistoryViewSet(ListModelMixin, GenericViewSet):
+    """Базовый ViewSet истории отзывов или комментариев пользователя.
+
+    Страница читается одним запросом: автор выбирается по username в
+    том же запросе, а контекст подтягивается через select_related.
+    """
+    pagination_class = HistoryPagination
+
+    def get_queryset(self):
+        return self.queryset.visible().filter(
+            author__username=self.kwargs.get('username')
+        )
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if not response.data['results'] and not User.objects.filter(
+                username=self.kwargs.get('username')).exists():
+            raise Http404
+        return response
 
-class TitleViewSet(ModelViewSet):
+
+class UserReviewViewSet(UserHistoryViewSet):
+    """Отзывы пользователя, сначала новые"""
+    queryset = Review.objects.select_related('author', 'title').filter(
+        title__is_deleted=False
+    )
+    serializer_class = UserReviewSerializer
+
+
+class UserCommentViewSet(UserHistoryViewSet):
+    """Комментарии пользователя, сначала новые"""
+    queryset = Comment.objects.select_related(
+        'author', 'review__title'
+    ).filter(review__title__is_deleted=False)
+    serializer_class = UserCommentSerializer
+
+
+class ModerationViewSet(ListModelMixin, GenericViewSet):
+    """Базовый ViewSet очереди модерации и массовых действий.
+
+    Права проверяются один раз на запрос, без проверки каждого объекта.
+    """
+    permission_classes = (IsModerator,)
+    pagination_class = ModerationQueuePagination
+
+    def get_queryset(self):
+        return self.queryset.flagged()
+
+    @action(methods=['POST'], detail=False)
+    def bulk(self, request):
+        """Скрывает, удаляет или одобряет несколько записей сразу"""
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        action_name = serializer.validated_data['action']
+        processed = moderate(
+            self.queryset.model, action_name,
+            serializer.validated_data['ids']
+        )
+        return Response(
+            {'action': action_name, 'processed': processed},
+            status=status.HTTP_200_OK
+        )
+
+
+class ModerationReviewViewSet(ModerationViewSet):
+    """Отзывы, отмеченные пользователями"""
+    queryset = Review.objects.select_related('author', 'title').filter(
+        title__is_deleted=False
+    )
+    serializer_class = UserReviewSerializer
+
+
+class ModerationCommentViewSet(ModerationViewSet):
+    """Комментарии, отмеченные пользователями"""
+    queryset = Comment.objects.select_related('author', 'review__title')
+    serializer_class = UserCommentSerializer
+
+
+class TitleViewSet(ScheduledDeletionMixin, ProfiledFilterMixin,
+                   ModelViewSet):
     """ViewSet для работы с произведениями"""
-    queryset = Title.objects.annotate(rating=Avg(
-        'reviews__score')).order_by('-id')
+    queryset = Title.objects.alive().select_related(
+        'category'
+    ).prefetch_related(
+        Prefetch('genre', queryset=Genre.objects.alive())
+    ).order_by('-id')
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
@@ -92,6 +274,55 @@ class TitleViewSet(ModelViewSet):
             return TitleWriteSerializer
         return TitleReadSerializer
 
+    @cached_response(TITLES)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        # Параметры фильтров влияют на ответ, документ — только без них
+        document = None if request.query_params else documents.load(
+            kwargs['pk']
+        )
+        if document is None:
+            return super().retrieve(request, *args, **kwargs)
+        return document_response(request, document.detail)
+
+    @action(methods=['GET'], detail=False)
+    @cached_response(TITLES)
+    def top(self, request):
+        """Лучшие произведения из материализованного рейтинга"""
+        window = request.query_params.get('window', LeaderboardEntry.ALL_TIME)
+        if window not in WINDOW_DAYS:
+            raise ValidationError(
+                {'window': f'Допустимые значения: {", ".join(WINDOW_DAYS)}'}
+            )
+        try:
+            limit = min(
+                int(request.query_params.get('limit', TOP_TITLES_LIMIT)),
+                TOP_TITLES_MAX_LIMIT
+            )
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число'})
+        entries = top_titles(
+            window,
+            max(limit, 0),
+            category=request.query_params.get('category'),
+            genre=request.query_params.get('genre'),
+        )
+        serializer = LeaderboardSerializer(entries, many=True)
+        return Response(
+            {'window': window, 'results': serializer.data},
+            status=status.HTTP_200_OK
+        )
+
+    @action(methods=['GET'], detail=True)
+    def ratings(self, request, pk=None):
+        """Гистограмма оценок из счётчиков, без чтения отзывов"""
+        if not Title.objects.alive().filter(pk=pk).exists():
+            raise Http404
+        serializer = RatingsSerializer(get_distribution(pk))
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
 class SignupAPI(APIView):
     permission_classes = (permissions.AllowAny,)
@@ -104,14 +335,8 @@ class SignupAPI(APIView):
             User,
             username=serializer.validated_data.get('username')
         )
-        confirmation_code = default_token_generator.make_token(user)
-        send_mail(
-            'Your Confirmation Code',
-            f'Your Confirmation Code is {confirmation_code}',
-            settings.NO_REPLY_EMAIL,
-            [serializer.validated_data['email']],
-            fail_silently=False,
-        )
+        # Письмо отправит воркер очереди, запрос его не ждёт
+        jobs.enqueue(CONFIRMATION_CODE, {'user_id': user.pk})
         return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
 
@@ -178,3 +403,137 @@ class UserViewSet(viewsets.ModelViewSet):
                 serializer.data,
                 status=status.HTTP_200_OK
             )
+
+
+class ReviewBulkAPI(APIView):
+    """Массовая загрузка отзывов партнёров по многим произведениям"""
+    permission_classes = (IsAdminOrSuperuser,)
+
+    def post(self, request):
+        serializer = ReviewBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            created, skipped = ingest_reviews(
+                serializer.validated_data['reviews']
+            )
+        except IntegrityError:
+            # Такой же отзыв успел создать параллельный запрос
+            return Response(
+                {'detail': 'Отзывы изменились во время загрузки, '
+                           'повторите запрос'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(
+            {'created': created, 'skipped': skipped},
+            status=status.HTTP_200_OK
+        )
+
+
+# Строка заголовка загружаемого CSV ищется не дальше стольких байт
+MAX_HEADER_SIZE = CHUNK_SIZE
+
+
+def request_body(request):
+    """Поток тела запроса без multipart, в том числе chunked.
+
+    Без Content-Length DRF считает тело пустым (request.stream is None),
+    поэтому тело chunked-запроса читается из wsgi.input: сервер WSGI
+    отдаёт его уже без разметки на куски.
+    """
+    if request.stream is not None:
+        return request.stream
+    meta = request._request.META
+    if meta.get('HTTP_TRANSFER_ENCODING', '').lower() == 'chunked':
+        return meta['wsgi.input']
+    return io.BytesIO()
+
+
+class ImportViewSet(RetrieveModelMixin, ListModelMixin, GenericViewSet):
+    """Загрузка CSV-файлов в формате populatedb и ход её выполнения.
+
+    Тело запроса сохраняется на диск блоками, не целиком в памяти, а
+    строки вставляет воркер очереди задач.
+    """
+    queryset = ImportJob.objects.order_by('-created')
+    serializer_class = ImportJobSerializer
+    permission_classes = (IsAdminOrSuperuser,)
+    parser_classes = (MultiPartParser,)
+    pagination_class = PageNumberPagination
+
+    def create(self, request):
+        file_name = request.query_params.get('file_name')
+        if request.content_type.startswith('multipart/'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                raise ValidationError({'file': 'Файл не передан'})
+            file_name = file_name or upload.name
+            chunks = upload.chunks(CHUNK_SIZE)
+        else:
+            # CSV в теле запроса, в том числе chunked
+            stream = request_body(request)
+            chunks = iter(lambda: stream.read(CHUNK_SIZE), b'')
+        if file_name not in MODEL_FILE_NAMES:
+            raise ValidationError({'file_name': (
+                f'Допустимые значения: {", ".join(sorted(MODEL_FILE_NAMES))}'
+            )})
+
+        # Тело без переводов строк не собирается в памяти целиком
+        first = b''
+        for chunk in chunks:
+            first += chunk
+            if b'\n' in first or len(first) >= MAX_HEADER_SIZE:
+                break
+        if b'\n' not in first and len(first) >= MAX_HEADER_SIZE:
+            raise ValidationError({'file': 'Нет строки заголовка'})
+        header = first.split(b'\n', 1)[0].decode('utf-8', 'replace')
+        if not header.strip():
+            raise ValidationError({'file': 'Пустой файл'})
+        missing = check_header([header], file_name)
+        if missing:
+            raise ValidationError({'file': (
+                f'Нет колонок: {", ".join(missing)}'
+            )})
+        job = save_upload(file_name, itertools.chain([first], chunks))
+        return Response(
+            self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED
+        )
+
+
+class JobViewSet(RetrieveModelMixin, ListModelMixin, GenericViewSet):
+    """Задачи фоновой очереди и её глубина для администраторов"""
+    serializer_class = JobSerializer
+    permission_classes = (IsAdminOrSuperuser,)
+    pagination_class = PageNumberPagination
+
+    def get_queryset(self):
+        queryset = Job.objects.order_by('-created')
+        for field in ('name', 'status'):
+            value = self.request.query_params.get(field)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        return queryset
+
+    @action(methods=['GET'], detail=False)
+    def stats(self, request):
+        return Response(jobs.stats(), status=status.HTTP_200_OK)
+
+
+class ProfilingSummaryAPI(APIView):
+    """Сводка профилирования запросов для администраторов"""
+    permission_classes = (IsAdminOrSuperuser,)
+
+    def get(self, request):
+        return Response(profiling.summary(), status=status.HTTP_200_OK)
+
+
+class MetricsAPI(APIView):
+    """Метрики API для Prometheus"""
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+    renderer_classes = (PrometheusRenderer,)
+
+    def get(self, request):
+        return Response(
+            metrics.render(metrics.collect()),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
@@ -1,7 +1,14 @@
 import os
 
-from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+
+from api_yamdb.asgi_handler import ThreadPoolASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+# Размер пула потоков, в котором выполняются view
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 16))
+
+application = ThreadPoolASGIHandler(
+    get_wsgi_application(), max_workers=ASGI_THREADS
+)
@@ -0,0 +1,143 @@
+"""ASGI-обёртка над WSGI-приложением Django с ограниченным пулом потоков.
+
+Django 2.2 не умеет асинхронные view, поэтому асинхронная часть — это
+ввод-вывод: тело запроса и ответ передаются медленным клиентам в
+событийном цикле, а поток из пула занят только на время работы view
+(ORM, сериализация, рендеринг). Так один процесс держит много медленных
+соединений, не блокируя обработчики.
+"""
+import asyncio
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Тело запроса больше этого размера сбрасывается на диск
+MAX_IN_MEMORY_BODY = 2 * 1024 * 1024
+
+
+class ThreadPoolASGIHandler:
+    """ASGI-приложение, выполняющее WSGI-приложение в пуле потоков."""
+
+    def __init__(self, wsgi_application, max_workers=16):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='asgi'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f'Неподдерживаемый тип: {scope["type"]}')
+
+        body = await self.read_body(receive)
+        if body is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        status, headers, chunks = await loop.run_in_executor(
+            self.executor, self.run_wsgi, scope, body
+        )
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers,
+        })
+        for chunk in chunks:
+            await send({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': True,
+            })
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                # Ожидание запросов в пуле не должно блокировать цикл
+                await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: self.executor.shutdown(wait=True)
+                )
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        """Читает тело запроса, не занимая поток из пула.
+
+        Возвращает None, если клиент отключился раньше времени.
+        """
+        body = tempfile.SpooledTemporaryFile(max_size=MAX_IN_MEMORY_BODY)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        body.seek(0)
+        return body
+
+    def run_wsgi(self, scope, body):
+        """Выполняет WSGI-приложение и собирает ответ целиком."""
+        response = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin1'), value.encode('latin1'))
+                for name, value in response_headers
+            ]
+
+        result = self.wsgi_application(
+            self.get_environ(scope, body), start_response
+        )
+        try:
+            chunks = [chunk for chunk in result if chunk]
+        finally:
+            # close() отправляет request_finished и закрывает соединения БД
+            if hasattr(result, 'close'):
+                result.close()
+            body.close()
+        return response['status'], response['headers'], chunks
+
+    def get_environ(self, scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        path = scope['path'].encode('utf-8').decode('latin1')
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': path,
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'REMOTE_ADDR': client[0],
+            'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for raw_name, raw_value in scope.get('headers', []):
+            name = raw_name.decode('latin1').upper().replace('-', '_')
+            value = raw_value.decode('latin1')
+            if name == 'CONTENT_TYPE' or name == 'CONTENT_LENGTH':
+                key = name
+            else:
+                key = f'HTTP_{name}'
+            if key in environ:
+                value = f'{environ[key]},{value}'
+            environ[key] = value
+        if 'CONTENT_LENGTH' not in environ:
+            # Тело уже прочитано, поэтому длина известна и для chunked
+            body.seek(0, 2)
+            environ['CONTENT_LENGTH'] = str(body.tell())
+            body.seek(0)
+        return environ
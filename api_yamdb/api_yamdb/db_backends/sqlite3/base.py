@@ -0,0 +1,21 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite-бэкенд, выполняющий PRAGMA из OPTIONS['pragmas'].
+
+    PRAGMA применяются к каждому новому соединению, поэтому вместе с
+    CONN_MAX_AGE они выполняются один раз на всё время жизни соединения.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragmas = self.settings_dict['OPTIONS'].get('pragmas', {})
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
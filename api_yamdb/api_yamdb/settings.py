@@ -1,6 +1,8 @@
 import os
 from datetime import timedelta
 
+from api_yamdb.databases import database_from_env, replicas_from_env
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -34,6 +36,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ProfilingMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -65,14 +70,39 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
+# Профиль задаётся переменными окружения, см. api_yamdb/databases.py
+
+DATABASE_REPLICAS_SETTINGS, DATABASE_REPLICAS = replicas_from_env()
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+    'default': database_from_env(os.path.join(BASE_DIR, 'db.sqlite3')),
+    **DATABASE_REPLICAS_SETTINGS,
 }
 
+# Чтение из API v1 уходит на реплики, запись — на основную БД
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
+# Пути, безопасные запросы к которым обслуживают реплики
+REPLICA_ROUTED_PATHS = ('/api/v1/',)
+
+# После записи чтение клиента идёт в основную БД столько секунд,
+# чтобы не увидеть устаревшие данные из отстающей реплики
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+# Кэш Django (api.cache, средняя оценка каталога). По умолчанию у
+# каждого процесса свой LocMemCache: при нескольких воркерах блокировки
+# пересчёта и сброс кэша списков действуют только в своём процессе,
+# поэтому для них задаётся общий memcached (адреса через запятую,
+# клиент python-memcached из requirements.txt)
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION')
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': CACHE_LOCATION.split(','),
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -123,8 +153,70 @@ REST_FRAMEWORK = {
         'rest_framework.pagination.LimitOffsetPagination'
     ],
     'PAGE_SIZE': 10,
+    # orjson используется, если установлен, иначе стандартный json
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Профилирование запросов: заголовок Server-Timing и сводка
+# для администраторов по адресу /api/v1/profiling/
+API_PROFILING = os.environ.get('API_PROFILING', '') == '1'
+
+# Сколько последних запросов учитывается в сводке профилирования
+API_PROFILING_HISTORY = 1000
+
+# Метрики в формате Prometheus по адресу /metrics
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+
+# Каталог для метрик воркеров при запуске в нескольких процессах
+# (gunicorn и т. п.); каталог нужно очищать перед стартом сервера
+METRICS_MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+# Как часто процесс сохраняет свои метрики в каталог, секунды
+METRICS_FLUSH_INTERVAL = 5
+
+# Вес априорной оценки в байесовском рейтинге: столько «средних»
+# отзывов добавляется к отзывам каждого произведения
+WEIGHTED_RATING_MIN_VOTES = 10
+
+# Как долго хранится средняя оценка каталога между пересчётами, секунды
+WEIGHTED_RATING_PRIOR_TTL = 60 * 60
+
+# На сколько строк-шардов разбит счётчик каждой оценки произведения
+# (reviews.counters): больше шардов — меньше ожидания блокировок при
+# потоке отзывов на одно произведение, но дольше чтение
+SCORE_COUNT_SHARDS = int(os.getenv('SCORE_COUNT_SHARDS', 8))
+
+# Сколько отзывов или комментариев модератор обрабатывает одним запросом
+MODERATION_BULK_LIMIT = 100
+
+# Кэш дорогих ответов API (api.cache): сколько секунд ответ актуален,
+# сколько ещё его можно отдавать во время пересчёта, склонность к
+# раннему обновлению и предельное время пересчёта
+API_CACHE_TTL = int(os.getenv('API_CACHE_TTL', 30))
+API_CACHE_STALE = int(os.getenv('API_CACHE_STALE', 60))
+API_CACHE_BETA = 1.0
+API_CACHE_LOCK_TIMEOUT = 10
+
+# Для скольких самых обсуждаемых произведений build_title_documents
+# хранит готовый JSON страницы (reviews.documents)
+TITLE_DOCUMENT_COUNT = 1000
+
+# Сколько отзывов принимает один запрос массовой загрузки
+REVIEW_BULK_LIMIT = 1000
+
+# Каталог для CSV-файлов, принятых через API, до их загрузки воркером
+IMPORT_UPLOAD_DIR = os.getenv(
+    'IMPORT_UPLOAD_DIR', os.path.join(BASE_DIR, 'imports')
+)
+
 # Настройка условий аунтификации API
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
@@ -142,3 +234,10 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 # E-mail отправки сообщений пользователям
 NO_REPLY_EMAIL = "no-reply@localhost"
+
+# Очередь фоновых задач (backend.jobs): сколько секунд задача числится за
+# воркером, прежде чем её выдадут снова, сколько раз она повторяется при
+# ошибке и задержка первого повтора (дальше она удваивается)
+JOB_VISIBILITY_TIMEOUT = int(os.getenv('JOB_VISIBILITY_TIMEOUT', 60))
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 10
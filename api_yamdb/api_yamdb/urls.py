@@ -4,11 +4,14 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api.views import MetricsAPI
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.jwt')),
     path('api/', include('api.urls')),
+    path('metrics', MetricsAPI.as_view(), name='metrics'),
     path(
         'redoc/',
         TemplateView.as_view(template_name='redoc.html'),
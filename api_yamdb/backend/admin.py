@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import DeletionTask, ImportJob, Job, User
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -11,3 +11,37 @@ class UserAdmin(admin.ModelAdmin):
 
 
 admin.site.register(User, UserAdmin)
+
+
+class DeletionTaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'model', 'object_id', 'status', 'stage', 'processed', 'updated'
+    )
+    list_filter = ('status', 'model')
+    readonly_fields = ('error',)
+
+
+admin.site.register(DeletionTask, DeletionTaskAdmin)
+
+
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'file_name', 'size', 'status', 'processed', 'updated'
+    )
+    list_filter = ('status', 'file_name')
+    readonly_fields = ('error',)
+
+
+admin.site.register(ImportJob, ImportJobAdmin)
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'name', 'priority', 'status', 'attempts', 'run_after',
+        'locked_until', 'worker', 'updated'
+    )
+    list_filter = ('status', 'name')
+    readonly_fields = ('error',)
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,173 @@
+"""Фоновое удаление произведений, категорий и жанров.
+
+Запрос на удаление только помечает объект удалённым и ставит задачу
+DeletionTask вместе с задачей очереди backend.jobs. Воркер обрабатывает
+зависимые записи пачками по первичному ключу, по одной транзакции на
+пачку, поэтому память и длительность блокировок не зависят от числа
+зависимых записей, а прерванную задачу можно продолжить с того же места.
+"""
+import time
+import traceback
+
+from django.db import transaction
+
+from api.cache import TITLES, invalidate
+from backend import jobs
+from backend.models import Category, DeletionTask, Genre, Title
+from reviews.models import Comment, LeaderboardEntry, Review, TitleDocument
+
+BATCH_SIZE = 1000
+
+# Имя задачи очереди backend.jobs
+DELETION = 'deletion'
+
+MODELS = {
+    DeletionTask.TITLE: Title,
+    DeletionTask.CATEGORY: Category,
+    DeletionTask.GENRE: Genre,
+}
+
+
+def next_batch(queryset, batch_size):
+    return list(
+        queryset.order_by('pk').values_list('pk', flat=True)[:batch_size]
+    )
+
+
+def delete_batch(queryset, batch_size):
+    pks = next_batch(queryset, batch_size)
+    if pks:
+        queryset.model.objects.filter(pk__in=pks).delete()
+    return len(pks)
+
+
+def update_batch(queryset, batch_size, **values):
+    pks = next_batch(queryset, batch_size)
+    if pks:
+        queryset.model.objects.filter(pk__in=pks).update(**values)
+    return len(pks)
+
+
+def delete_reviews_batch(queryset, batch_size):
+    pks = next_batch(queryset, batch_size)
+    if pks:
+        # Помеченные отзывы не трогают счётчики оценок при удалении:
+        # счётчики удалятся вместе с произведением
+        reviews = Review.objects.filter(pk__in=pks)
+        reviews.update(is_deleted=True)
+        reviews.delete()
+    return len(pks)
+
+
+# Этапы удаления: название и функция, обрабатывающая одну пачку
+# зависимых записей объекта. Этап завершён, когда пачка пуста.
+STAGES = {
+    DeletionTask.TITLE: (
+        ('comments', lambda pk, size: delete_batch(
+            Comment.objects.filter(review__title_id=pk), size
+        )),
+        ('reviews', lambda pk, size: delete_reviews_batch(
+            Review.objects.filter(title_id=pk), size
+        )),
+        ('genres', lambda pk, size: delete_batch(
+            Title.genre.through.objects.filter(title_id=pk), size
+        )),
+    ),
+    DeletionTask.CATEGORY: (
+        ('titles', lambda pk, size: update_batch(
+            Title.objects.filter(category_id=pk), size, category=None
+        )),
+        ('leaderboard', lambda pk, size: update_batch(
+            LeaderboardEntry.objects.filter(category_id=pk), size,
+            category=None
+        )),
+    ),
+    DeletionTask.GENRE: (
+        ('titles', lambda pk, size: delete_batch(
+            Title.genre.through.objects.filter(genre_id=pk), size
+        )),
+    ),
+}
+
+
+def schedule_deletion(instance):
+    """Помечает объект удалённым и ставит задачу на его удаление."""
+    model = next(
+        name for name, model in MODELS.items()
+        if isinstance(instance, model)
+    )
+    with transaction.atomic():
+        type(instance).objects.filter(pk=instance.pk).update(is_deleted=True)
+        if model == DeletionTask.TITLE:
+            # Записей не больше числа периодов, список лучших обновится сразу
+            LeaderboardEntry.objects.filter(title_id=instance.pk).delete()
+            TitleDocument.objects.filter(title_id=instance.pk).delete()
+        else:
+            # Воркер отвяжет произведения без сигналов: до следующего
+            # build_title_documents они отдаются живыми запросами
+            TitleDocument.objects.filter(**{
+                f'title__{model}': instance.pk
+            }).delete()
+        invalidate(TITLES)
+        task = DeletionTask.objects.create(
+            model=model, object_id=instance.pk
+        )
+        jobs.enqueue(
+            DELETION, {'task_id': task.pk}, key=f'deletion:{task.pk}'
+        )
+        return task
+
+
+def run_task(task, batch_size=BATCH_SIZE, pause=0, progress=None):
+    """Удаляет зависимые записи пачками, затем сам объект."""
+    for stage, process_batch in STAGES[task.model]:
+        task.stage = stage
+        while True:
+            with transaction.atomic():
+                count = process_batch(task.object_id, batch_size)
+            if not count:
+                break
+            task.processed += count
+            task.save(update_fields=['stage', 'processed', 'updated'])
+            if progress:
+                progress(task)
+            if pause:
+                time.sleep(pause)
+
+    MODELS[task.model].objects.filter(pk=task.object_id).delete()
+    # Этапы меняли произведения без сигналов
+    invalidate(TITLES)
+    task.stage = ''
+    task.status = DeletionTask.DONE
+    task.save(update_fields=['stage', 'status', 'updated'])
+    if progress:
+        progress(task)
+
+
+# Задача пакетная и продолжается с места сбоя, аренда — на час
+@jobs.handler(DELETION, timeout=60 * 60)
+def execute(task_id, batch_size=BATCH_SIZE, pause=0, progress=None):
+    """Выполняет задачу удаления; ошибка отдаётся очереди для повтора."""
+    task = DeletionTask.objects.get(pk=task_id)
+    if task.status == DeletionTask.DONE:
+        return
+    task.status = DeletionTask.RUNNING
+    task.error = ''
+    task.save(update_fields=['status', 'error', 'updated'])
+    try:
+        run_task(task, batch_size, pause, progress)
+    except Exception:
+        task.status = DeletionTask.FAILED
+        task.error = traceback.format_exc()
+        task.save(update_fields=['status', 'error', 'updated'])
+        if progress:
+            progress(task)
+        raise
+
+
+def process_deletions(batch_size=BATCH_SIZE, pause=0, progress=None):
+    """Выполняет задачи удаления из очереди, возвращает их число."""
+    return jobs.work(
+        names=[DELETION], batch_size=batch_size, pause=pause,
+        progress=progress
+    )
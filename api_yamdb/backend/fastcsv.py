@@ -0,0 +1,107 @@
+"""Параллельное чтение больших CSV-файлов для populatedb --fast.
+
+Файл отображается в память (mmap) и делится на куски по границам
+записей. Граница ищется по переводу строки вне кавычек: внутри
+текста отзыва перевод строки допустим, поэтому учитывается чётность
+числа кавычек от начала куска. Куски разбираются в пуле процессов:
+воркер декодирует свой кусок прямо из mmap, без чтения через буферы
+файла, и возвращает строки кортежами, а не словарями — они дешевле
+при создании и при передаче между процессами.
+
+Одновременно в работе не больше двух кусков на воркер, поэтому
+память не зависит от размера файла, даже если вставка в базу
+медленнее разбора.
+"""
+import csv
+import io
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+# Размер куска, который разбирает один воркер
+RANGE_SIZE = 8 * 1024 * 1024
+
+
+@contextmanager
+def mapped(path):
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def read_header(path):
+    """Колонки файла и позиция первой записи после заголовка."""
+    if not os.path.getsize(path):
+        return [], 0
+    with mapped(path) as mm:
+        end = mm.find(b'\n') + 1 or len(mm)
+        header = next(csv.reader([mm[:end].decode('utf-8')]), [])
+    # Как в importers.read_rows: в заголовках встречаются пробелы
+    return [name.strip() for name in header], end
+
+
+def split_ranges(mm, start, range_size=RANGE_SIZE):
+    """Делит mm[start:] на куски примерно по range_size байт.
+
+    Кусок заканчивается переводом строки, перед которым чётное число
+    кавычек от начала куска, то есть на границе записи.
+    """
+    size = len(mm)
+    while start < size:
+        end = min(start + range_size, size)
+        quotes = mm[start:end].count(b'"')
+        while end < size and (mm[end - 1] != ord('\n') or quotes % 2):
+            newline = mm.find(b'\n', end)
+            newline = size if newline == -1 else newline + 1
+            quotes += mm[end:newline].count(b'"')
+            end = newline
+        yield start, end
+        start = end
+
+
+def parse_range(path, start, end):
+    """Записи куска файла кортежами строк, пустые строки пропускаются."""
+    with mapped(path) as mm, memoryview(mm) as view:
+        text = str(view[start:end], 'utf-8')
+    return [
+        tuple(row) for row in csv.reader(io.StringIO(text, newline=''))
+        if row
+    ]
+
+
+def read_ranges(path, start, workers=None, range_size=RANGE_SIZE):
+    """Выдаёт по порядку конец куска и его записи, начиная с start.
+
+    Куски разбираются в workers процессах (по умолчанию по числу
+    процессоров), с одним воркером — в текущем процессе.
+    """
+    workers = workers or os.cpu_count()
+    if start >= os.path.getsize(path):
+        return
+    with mapped(path) as mm:
+        ranges = list(split_ranges(mm, start, range_size))
+    if workers == 1:
+        for start, end in ranges:
+            yield end, parse_range(path, start, end)
+        return
+
+    ranges = iter(ranges)
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+
+        def submit():
+            span = next(ranges, None)
+            if span:
+                pending.append(
+                    (span[1], pool.submit(parse_range, path, *span))
+                )
+
+        for _ in range(workers * 2):
+            submit()
+        while pending:
+            end, future = pending.popleft()
+            rows = future.result()
+            submit()
+            yield end, rows
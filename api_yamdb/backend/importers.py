@@ -0,0 +1,426 @@
+"""Загрузка CSV-файлов в формате populatedb пачками.
+
+Строки читаются по одной из любого источника строк текста и
+вставляются пачками через bulk_create, по транзакции на пачку, поэтому
+память не зависит от размера файла. Внешние ключи берутся из файла как
+есть, без запроса на каждую строку. bulk_create не вызывает сигналы:
+счётчики отзывов и комментариев обновляются после каждой пачки.
+
+Вместе с пачкой в ImportState сохраняется позиция в файле: прерванная
+загрузка продолжается с неё. Строки с уже загруженным id обновляются,
+поэтому повторная загрузка файла не создаёт дублей.
+
+Файлы, загруженные через API, сохраняются на диск как ImportJob и
+ставятся в очередь backend.jobs, а загружает их воркер.
+"""
+import csv
+import os
+import traceback
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from backend import fastcsv, jobs
+from backend.models import (Category, Genre, ImportJob, ImportState, Job,
+                            Title, User)
+from reviews.bulk import (count_created_comments, count_created_reviews,
+                          recount_reviews, recount_titles)
+from reviews.models import Comment, Review
+
+CATEGORY = 'category.csv'
+COMMENT = 'comments.csv'
+GENRES = 'genre.csv'
+GENRE_TITLE = 'genre_title.csv'
+REVIEW = 'review.csv'
+TITLES = 'titles.csv'
+USERS = 'users.csv'
+
+MODEL_FILE_NAMES = {
+    CATEGORY: Category,
+    COMMENT: Comment,
+    GENRES: Genre,
+    GENRE_TITLE: Title.genre.through,
+    REVIEW: Review,
+    TITLES: Title,
+    USERS: User
+}
+
+# Обязательные колонки каждого файла
+COLUMNS = {
+    CATEGORY: ('id', 'name', 'slug'),
+    COMMENT: ('id', 'review_id', 'text', 'author', 'pub_date'),
+    GENRES: ('id', 'name', 'slug'),
+    GENRE_TITLE: ('title_id', 'genre_id'),
+    REVIEW: ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    TITLES: ('id', 'name', 'year', 'category'),
+    USERS: ('id', 'username', 'email'),
+}
+
+# Имя задачи очереди backend.jobs
+IMPORT = 'import'
+
+BATCH_SIZE = 1000
+
+# Размер блока при сохранении загруженного файла на диск
+CHUNK_SIZE = 64 * 1024
+
+
+def build_user(row):
+    return User(
+        id=row['id'],
+        password=row.get('password', ''),
+        username=row['username'],
+        email=row['email'],
+        role=row.get('user_role') or 'user',
+        first_name=row.get('first_name', ''),
+        last_name=row.get('last_name', ''),
+        is_superuser=row.get('is_superuser') or False,
+        is_staff=row.get('is_staff') or False,
+        is_active=row.get('is_active') or True,
+        date_joined=row.get('date_joined') or timezone.now(),
+        bio=row.get('bio', ''),
+    )
+
+
+def build_title(row):
+    return Title(
+        id=row['id'],
+        name=row['name'],
+        year=row['year'] or None,
+        category_id=row['category'] or None,
+        description=row.get('description', ''),
+    )
+
+
+# Как загружать файл: строка -> объект модели, поля, которые
+# обновляются у уже загруженных строк (None — только вставка новых),
+# родитель для счётчиков, учёт новых строк и пересчёт родителей
+# изменённых строк
+Importer = namedtuple(
+    'Importer', ('build', 'fields', 'parent', 'created', 'recount')
+)
+
+IMPORTERS = {
+    USERS: Importer(
+        build_user,
+        ('username', 'email', 'role', 'first_name', 'last_name', 'bio'),
+        None, None, None,
+    ),
+    CATEGORY: Importer(
+        lambda row: Category(id=row['id'], name=row['name'], slug=row['slug']),
+        ('name', 'slug'), None, None, None,
+    ),
+    GENRES: Importer(
+        lambda row: Genre(id=row['id'], name=row['name'], slug=row['slug']),
+        ('name', 'slug'), None, None, None,
+    ),
+    TITLES: Importer(
+        build_title, ('name', 'year', 'category', 'description'),
+        None, None, None,
+    ),
+    GENRE_TITLE: Importer(
+        lambda row: Title.genre.through(
+            id=row.get('id') or None,
+            title_id=row['title_id'],
+            genre_id=row['genre_id'],
+        ),
+        None, None, None, None,
+    ),
+    REVIEW: Importer(
+        lambda row: Review(
+            id=row['id'], title_id=row['title_id'], text=row['text'],
+            author_id=row['author'], score=row['score'],
+            pub_date=row['pub_date'],
+        ),
+        ('title', 'text', 'author', 'score', 'pub_date'),
+        'title', count_created_reviews, recount_titles,
+    ),
+    COMMENT: Importer(
+        lambda row: Comment(
+            id=row['id'], review_id=row['review_id'], text=row['text'],
+            author_id=row['author'], pub_date=row['pub_date'],
+        ),
+        ('review', 'text', 'author', 'pub_date'),
+        'review', count_created_comments, recount_reviews,
+    ),
+}
+
+
+@contextmanager
+def explicit_pub_dates():
+    """Отключает auto_now_add, чтобы сохранить даты из файла."""
+    fields = [
+        Review._meta.get_field('pub_date'),
+        Comment._meta.get_field('pub_date'),
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def read_rows(lines):
+    """Строки CSV-файла в виде словарей."""
+    reader = csv.DictReader(lines)
+    # В заголовках файлов из static/data встречаются пробелы
+    reader.fieldnames = [name.strip() for name in reader.fieldnames or ()]
+    return reader
+
+
+def check_header(lines, file_name):
+    """Возвращает недостающие колонки файла file_name."""
+    header = read_rows(lines).fieldnames
+    return [column for column in COLUMNS[file_name] if column not in header]
+
+
+class LineReader:
+    """Строки файла, открытого в двоичном режиме, и позиция в байтах.
+
+    csv не читает строки наперёд, поэтому после каждой записи position
+    указывает на начало следующей и годится для продолжения загрузки.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.position = f.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.position += len(line)
+        return line.decode('utf-8')
+
+    def seek(self, position):
+        self.f.seek(position)
+        self.position = position
+
+
+def upsert_batch(batch, importer):
+    """Вставляет новые строки пачки и обновляет уже загруженные."""
+    model = type(batch[0])
+    if importer.fields is None:
+        model.objects.bulk_create(batch, ignore_conflicts=True)
+        return
+    to_python = model._meta.pk.to_python
+    # Повтор id внутри пачки: побеждает последняя строка
+    objs = {to_python(obj.pk): obj for obj in batch}
+    existing = model.objects.filter(pk__in=objs)
+    if importer.parent:
+        parent = model._meta.get_field(importer.parent)
+        existing = dict(existing.values_list('pk', parent.attname))
+    else:
+        existing = dict.fromkeys(existing.values_list('pk', flat=True))
+    created = [obj for pk, obj in objs.items() if pk not in existing]
+    updated = [obj for pk, obj in objs.items() if pk in existing]
+    model.objects.bulk_create(created)
+    model.objects.bulk_update(updated, importer.fields)
+    if importer.created:
+        importer.created(created)
+    if updated and importer.recount:
+        # Строка могла перейти к другому родителю: пересчитываются оба
+        importer.recount({existing[to_python(obj.pk)] for obj in updated} | {
+            parent.to_python(getattr(obj, parent.attname)) for obj in updated
+        })
+
+
+def insert_batch(batch, importer, total, checkpoint=None):
+    with transaction.atomic():
+        upsert_batch(batch, importer)
+        total += len(batch)
+        if checkpoint:
+            checkpoint(total)
+    batch.clear()
+    return total
+
+
+def import_rows(file_name, rows, batch_size=BATCH_SIZE, progress=None,
+                checkpoint=None, start=0):
+    """Загружает строки файла file_name пачками, возвращает их число.
+
+    checkpoint(total) вызывается в транзакции пачки, start — число
+    строк, загруженных до продолжения.
+    """
+    importer = IMPORTERS[file_name]
+    total = start
+    batch = []
+    with explicit_pub_dates():
+        for row in rows:
+            batch.append(importer.build(row))
+            if len(batch) < batch_size:
+                continue
+            total = insert_batch(batch, importer, total, checkpoint)
+            if progress:
+                progress(total)
+        if batch:
+            total = insert_batch(batch, importer, total, checkpoint)
+            if progress:
+                progress(total)
+    return total
+
+
+def import_ranges(file_name, header, ranges, batch_size=BATCH_SIZE,
+                  progress=None, checkpoint=None, start=0):
+    """Загружает куски файла из fastcsv.read_ranges.
+
+    checkpoint(total, position) сохраняется с последней пачкой куска:
+    конец куска — граница записи, с которой можно продолжить.
+    """
+    importer = IMPORTERS[file_name]
+    total = start
+    with explicit_pub_dates():
+        for position, rows in ranges:
+            for index in range(0, len(rows), batch_size):
+                batch = [
+                    importer.build(dict(zip(header, row)))
+                    for row in rows[index:index + batch_size]
+                ]
+                save = None
+                if checkpoint and index + batch_size >= len(rows):
+                    save = partial(checkpoint, position=position)
+                total = insert_batch(batch, importer, total, save)
+                if progress:
+                    progress(total)
+    return total
+
+
+def load_state(path, restart=False):
+    """Контрольная точка загрузки файла path.
+
+    Изменившийся файл или restart начинают загрузку с начала.
+    """
+    stat = os.stat(path)
+    fingerprint = f'{stat.st_size}:{stat.st_mtime_ns}'
+    state, _ = ImportState.objects.get_or_create(
+        source=os.path.abspath(path), defaults={'fingerprint': fingerprint}
+    )
+    if restart or state.fingerprint != fingerprint:
+        state.fingerprint = fingerprint
+        state.rows = state.position = 0
+        state.save()
+    return state
+
+
+def import_file(path, file_name=None, batch_size=BATCH_SIZE, progress=None,
+                state=None, fast=False, workers=None):
+    """Загружает CSV-файл, тип данных определяется по имени файла.
+
+    После сбоя повторный вызов продолжает с последней сохранённой пачки,
+    а уже загруженные строки обновляются, а не дублируются. fast
+    разбирает файл в workers процессах (backend.fastcsv).
+    """
+    file_name = file_name or os.path.basename(path)
+    state = state or load_state(path)
+
+    def checkpoint(total, position):
+        state.rows = total
+        state.position = position
+        state.save(update_fields=['rows', 'position', 'updated'])
+
+    if fast:
+        header, position = fastcsv.read_header(path)
+        total = import_ranges(
+            file_name, header,
+            fastcsv.read_ranges(path, state.position or position, workers),
+            batch_size, progress, checkpoint, state.rows
+        )
+    else:
+        with open(path, 'rb') as f:
+            lines = LineReader(f)
+            rows = read_rows(lines)
+            if state.position:
+                lines.seek(state.position)
+            total = import_rows(
+                file_name, rows, batch_size, progress,
+                lambda total: checkpoint(total, lines.position), state.rows
+            )
+    # Файл загружен целиком: повторный запуск применит его заново
+    state.delete()
+    return total
+
+
+def job_key(job):
+    return f'import:{job.pk}'
+
+
+def save_upload(file_name, chunks):
+    """Сохраняет загруженный файл блоками и ставит его в очередь."""
+    os.makedirs(settings.IMPORT_UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(settings.IMPORT_UPLOAD_DIR, f'{uuid.uuid4().hex}.csv')
+    size = 0
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            size += len(chunk)
+    with transaction.atomic():
+        job = ImportJob.objects.create(
+            file_name=file_name, path=path, size=size
+        )
+        jobs.enqueue(IMPORT, {'job_id': job.pk}, key=job_key(job))
+    return job
+
+
+def run_job(job, batch_size=BATCH_SIZE, progress=None):
+    def save_progress(total):
+        job.processed = total
+        job.save(update_fields=['processed', 'updated'])
+        if progress:
+            progress(job)
+
+    import_file(job.path, job.file_name, batch_size, save_progress)
+    os.remove(job.path)
+    job.status = ImportJob.DONE
+    job.save(update_fields=['status', 'updated'])
+    if progress:
+        progress(job)
+
+
+# Загрузка продолжается с контрольной точки, аренда — на час
+@jobs.handler(IMPORT, priority=jobs.LOW, timeout=60 * 60)
+def execute(job_id, batch_size=BATCH_SIZE, progress=None):
+    """Выполняет задачу загрузки; ошибка отдаётся очереди для повтора."""
+    job = ImportJob.objects.get(pk=job_id)
+    if job.status == ImportJob.DONE:
+        return
+    job.status = ImportJob.RUNNING
+    job.error = ''
+    job.save(update_fields=['status', 'error', 'updated'])
+    try:
+        run_job(job, batch_size, progress)
+    except Exception:
+        # Файл остаётся на диске для разбора ошибки
+        job.status = ImportJob.FAILED
+        job.error = traceback.format_exc()
+        job.save(update_fields=['status', 'error', 'updated'])
+        if progress:
+            progress(job)
+        raise
+
+
+def process_imports(batch_size=BATCH_SIZE, progress=None,
+                    retry_failed=False):
+    """Выполняет задачи загрузки из очереди, возвращает их число.
+
+    retry_failed возвращает в очередь упавшие задачи: они продолжаются
+    с контрольной точки.
+    """
+    if retry_failed:
+        failed = ImportJob.objects.filter(status=ImportJob.FAILED)
+        jobs.requeue(Job.objects.filter(
+            key__in=[job_key(job) for job in failed]
+        ))
+        failed.update(status=ImportJob.PENDING, error='')
+    return jobs.work(
+        names=[IMPORT], batch_size=batch_size, progress=progress
+    )
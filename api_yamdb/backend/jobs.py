@@ -0,0 +1,248 @@
+"""Очередь фоновых задач в базе данных без внешнего брокера.
+
+Задача Job ставится enqueue в той же транзакции, что и данные, для
+которых она нужна, а выполняет её воркер run_jobs в пуле потоков:
+
+- задачи выдаются по убыванию приоритета, затем по времени постановки;
+- воркер захватывает задачу условным UPDATE и берёт её в аренду на
+  timeout секунд: задачу упавшего воркера по истечении аренды выдадут
+  снова (visibility timeout), поэтому обработчики должны переносить
+  повторный запуск;
+- при ошибке задача повторяется с удваивающейся задержкой, пока не
+  кончатся попытки;
+- ключ key делает постановку идемпотентной.
+
+Обработчики регистрируются декоратором handler в модулях
+HANDLER_MODULES.
+"""
+import json
+import os
+import socket
+import traceback
+import uuid
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from backend.models import Job
+
+HIGH = 10
+NORMAL = 0
+LOW = -10
+
+# Модули, регистрирующие обработчики при импорте
+HANDLER_MODULES = ('backend.deletion', 'backend.importers', 'backend.mail')
+
+# Как часто пул потоков проверяет очередь, пока все задачи заняты, секунды
+POLL_INTERVAL = 1
+
+Handler = namedtuple('Handler', 'func priority max_attempts timeout')
+
+HANDLERS = {}
+
+
+def handler(name, priority=NORMAL, max_attempts=None, timeout=None):
+    """Регистрирует функцию как обработчик задач name.
+
+    Функция получает аргументы из payload задачи; timeout — срок аренды,
+    если задача может выполняться дольше JOB_VISIBILITY_TIMEOUT.
+    """
+    def decorator(func):
+        HANDLERS[name] = Handler(func, priority, max_attempts, timeout)
+        return func
+    return decorator
+
+
+def get_handler(name):
+    # Повторный импорт берёт модуль из sys.modules
+    for module in HANDLER_MODULES:
+        import_module(module)
+    return HANDLERS.get(name)
+
+
+def enqueue(name, payload=None, key=None, priority=None, delay=0):
+    """Ставит задачу name в очередь, возвращает её.
+
+    Если задача с ключом key уже есть, возвращается она.
+    """
+    registered = get_handler(name)
+    if registered is None:
+        raise LookupError(f'Нет обработчика задач {name}')
+    values = dict(
+        name=name,
+        payload=json.dumps(payload or {}),
+        priority=registered.priority if priority is None else priority,
+        max_attempts=registered.max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+    if key is None:
+        return Job.objects.create(**values)
+    try:
+        with transaction.atomic():
+            return Job.objects.create(key=key, **values)
+    except IntegrityError:
+        # Задачу с таким ключом уже поставили
+        return Job.objects.get(key=key)
+
+
+def requeue(jobs):
+    """Возвращает задачи в очередь с полным числом попыток."""
+    return jobs.update(
+        status=Job.PENDING, attempts=0, run_after=timezone.now(),
+        locked_until=None, error='', updated=timezone.now()
+    )
+
+
+def available(names=None, now=None):
+    """Задачи, которые можно выдать: готовые и с истёкшей арендой."""
+    now = now or timezone.now()
+    jobs = Job.objects.filter(
+        Q(status=Job.PENDING, run_after__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+    if names is not None:
+        jobs = jobs.filter(name__in=names)
+    return jobs
+
+
+def claim(worker, count=1, names=None):
+    """Захватывает до count задач, возвращает их.
+
+    Задачу, которую успел захватить другой воркер, условный UPDATE не
+    изменит, и она пропускается.
+    """
+    now = timezone.now()
+    claimed = []
+    candidates = available(names, now).order_by(
+        '-priority', 'run_after', 'pk'
+    )[:count * 2]
+    for job in candidates:
+        registered = get_handler(job.name)
+        timeout = (
+            registered and registered.timeout
+            or settings.JOB_VISIBILITY_TIMEOUT
+        )
+        lease = uuid.uuid4().hex
+        if not Job.objects.filter(
+            pk=job.pk, status=job.status, lease=job.lease
+        ).update(
+            status=Job.RUNNING, lease=lease, worker=worker,
+            locked_until=now + timedelta(seconds=timeout),
+            attempts=F('attempts') + 1, updated=now
+        ):
+            continue
+        job.status = Job.RUNNING
+        job.lease = lease
+        job.attempts += 1
+        claimed.append(job)
+        if len(claimed) == count:
+            break
+    return claimed
+
+
+def retry_delay(attempts):
+    return settings.JOB_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def finish(job, error=''):
+    """Сохраняет результат, если аренда задачи ещё не перешла другому."""
+    now = timezone.now()
+    values = {'status': Job.DONE, 'locked_until': None, 'error': error}
+    if error and job.attempts < job.max_attempts:
+        values.update(
+            status=Job.PENDING,
+            run_after=now + timedelta(seconds=retry_delay(job.attempts))
+        )
+    elif error:
+        values['status'] = Job.FAILED
+    Job.objects.filter(pk=job.pk, lease=job.lease).update(
+        updated=now, **values
+    )
+    job.status = values['status']
+
+
+def run(job, **options):
+    """Выполняет захваченную задачу, options дополняют её аргументы."""
+    registered = get_handler(job.name)
+    try:
+        if registered is None:
+            raise LookupError(f'Нет обработчика задач {job.name}')
+        if job.attempts > job.max_attempts:
+            # Воркеры падали, не успев сохранить результат
+            raise RuntimeError('Попытки выполнить задачу исчерпаны')
+        registered.func(**json.loads(job.payload), **options)
+    except Exception:
+        finish(job, traceback.format_exc())
+    else:
+        finish(job)
+    return job
+
+
+def run_in_thread(job, options):
+    try:
+        return run(job, **options)
+    finally:
+        connection.close()
+
+
+def work(workers=1, names=None, **options):
+    """Выполняет готовые задачи, пока они есть, в workers потоках.
+
+    names ограничивает очередь задачами с этими именами. Возвращает
+    число выполненных задач.
+    """
+    worker = f'{socket.gethostname()}:{os.getpid()}'
+    done = 0
+    if workers == 1:
+        while True:
+            jobs = claim(worker, 1, names)
+            if not jobs:
+                return done
+            run(jobs[0], **options)
+            done += 1
+
+    running = set()
+    with ThreadPoolExecutor(workers) as executor:
+        while True:
+            for job in claim(worker, workers - len(running), names):
+                running.add(executor.submit(run_in_thread, job, options))
+            if not running:
+                return done
+            finished, running = wait(
+                running, POLL_INTERVAL, return_when=FIRST_COMPLETED
+            )
+            done += len(finished)
+
+
+def stats():
+    """Глубина очереди и число задач каждого имени по статусам."""
+    now = timezone.now()
+    queues = {}
+    for name, status, count in Job.objects.values_list(
+            'name', 'status').annotate(count=Count('pk')).order_by():
+        queues.setdefault(
+            name, dict.fromkeys(dict(Job.STATUSES), 0)
+        )[status] = count
+    ready = Job.objects.filter(status=Job.PENDING, run_after__lte=now)
+    oldest = ready.aggregate(oldest=Min('run_after'))['oldest']
+    return {
+        'depth': ready.count(),
+        'delayed': Job.objects.filter(
+            status=Job.PENDING, run_after__gt=now
+        ).count(),
+        'running': Job.objects.filter(
+            status=Job.RUNNING, locked_until__gte=now
+        ).count(),
+        # Аренда истекла: воркер, скорее всего, упал
+        'expired': Job.objects.filter(
+            status=Job.RUNNING, locked_until__lt=now
+        ).count(),
+        'oldest_wait': (now - oldest).total_seconds() if oldest else None,
+        'queues': queues,
+    }
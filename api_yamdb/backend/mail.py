@@ -0,0 +1,30 @@
+"""Письма пользователям, которые отправляет воркер очереди backend.jobs."""
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import send_mail
+
+from backend import jobs
+from backend.models import User
+
+# Имя задачи очереди backend.jobs
+CONFIRMATION_CODE = 'confirmation_code'
+
+
+# Пользователь ждёт письмо, поэтому оно обгоняет пакетные задачи
+@jobs.handler(CONFIRMATION_CODE, priority=jobs.HIGH)
+def send_confirmation_code(user_id):
+    """Отправляет пользователю код подтверждения для получения токена.
+
+    Код создаётся при отправке и не хранится в очереди.
+    """
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    confirmation_code = default_token_generator.make_token(user)
+    send_mail(
+        'Your Confirmation Code',
+        f'Your Confirmation Code is {confirmation_code}',
+        settings.NO_REPLY_EMAIL,
+        [user.email],
+        fail_silently=False,
+    )
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews.documents import BATCH_SIZE, build_hot
+
+
+class Command(BaseCommand):
+    help = (
+        'Builds ready JSON documents for the most reviewed titles and '
+        'drops documents of the others'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count', type=int, default=settings.TITLE_DOCUMENT_COUNT,
+            help='Number of most reviewed titles to keep documents for'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Documents rebuilt per transaction'
+        )
+
+    def handle(self, *args, **options):
+        count = build_hot(
+            options['count'], options['batch_size'],
+            lambda done: self.stdout.write(f'{done} documents')
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully built {count} title documents')
+        )
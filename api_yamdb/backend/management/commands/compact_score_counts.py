@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from reviews.counters import BATCH_SIZE, compact_score_counts
+
+
+class Command(BaseCommand):
+    help = 'Merges sharded score counters into one row per title and score'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Titles compacted per transaction'
+        )
+
+    def handle(self, *args, **options):
+        removed = compact_score_counts(options['batch_size'])
+        self.stdout.write(f'{removed} counter rows removed')
+        self.stdout.write(
+            self.style.SUCCESS('Successfully compacted score counters')
+        )
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+
+from backend.synthetic import (BATCH_SIZE, SyntheticData, insert, next_ids,
+                               write_csv)
+from reviews.counters import rebuild_score_counts
+from reviews.leaderboard import refresh_leaderboard
+from reviews.ratings import recompute_ratings
+
+
+def end_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates deterministic synthetic users, titles, reviews and '
+        'comments with Zipf-distributed activity'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=50)
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument('--reviews', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=300000)
+        parser.add_argument(
+            '--exponent', type=float, default=1.1,
+            help='Zipf exponent of reviews per title and comments per review'
+        )
+        parser.add_argument(
+            '--end-date', type=end_date,
+            help='Latest publication date, YYYY-MM-DD (today by default)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write populatedb CSV files to this directory instead of '
+                 'inserting into the database'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Rows inserted per transaction'
+        )
+
+    def handle(self, *args, **options):
+        sizes = {
+            name: options[name] for name in (
+                'seed', 'users', 'categories', 'genres', 'titles',
+                'reviews', 'comments', 'exponent',
+            )
+        }
+        if options['output']:
+            data = SyntheticData(end=options['end_date'], **sizes)
+            progress = write_csv(data, options['output'])
+        else:
+            data = SyntheticData(
+                end=options['end_date'], first_ids=next_ids(), **sizes
+            )
+            progress = insert(data, options['batch_size'])
+        for file_name, count in progress:
+            self.stdout.write(f'{file_name}: {count} rows')
+
+        if not options['output']:
+            # bulk_create не вызывает сигналы, пересчитываем агрегаты
+            rebuild_score_counts()
+            recompute_ratings()
+            refresh_leaderboard()
+        self.stdout.write(
+            self.style.SUCCESS('Successfully generated synthetic data')
+        )
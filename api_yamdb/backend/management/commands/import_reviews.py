@@ -0,0 +1,64 @@
+import csv
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.bulk import BATCH_SIZE, ingest_reviews
+
+COLUMNS = ('title', 'author', 'text', 'score')
+
+
+def parse(row, line):
+    try:
+        return {
+            'title': int(row['title']),
+            'author': row['author'],
+            'text': row['text'],
+            'score': int(row['score']),
+        }
+    except (KeyError, TypeError, ValueError):
+        raise CommandError(f'Line {line}: expected columns {COLUMNS}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports partner reviews from a CSV file with title, author '
+        '(username), text and score columns'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file')
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Reviews inserted per transaction'
+        )
+
+    def handle(self, *args, **options):
+        created = 0
+        skipped = Counter()
+        with open(options['csv_file'], encoding='utf-8', newline='') as f:
+            batch = []
+            # Первая строка файла — заголовок
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                row = parse(row, line)
+                if not 1 <= row['score'] <= 10:
+                    raise CommandError(f'Line {line}: score must be 1-10')
+                batch.append(row)
+                if len(batch) >= options['batch_size']:
+                    created += self.ingest(batch, skipped)
+            created += self.ingest(batch, skipped)
+
+        self.stdout.write(f'created: {created}')
+        for reason, count in sorted(skipped.items()):
+            self.stdout.write(f'skipped ({reason}): {count}')
+        self.stdout.write(
+            self.style.SUCCESS('Successfully imported reviews')
+        )
+
+    def ingest(self, batch, skipped):
+        if not batch:
+            return 0
+        count, rows = ingest_reviews(batch)
+        skipped.update(row['reason'] for row in rows)
+        batch.clear()
+        return count
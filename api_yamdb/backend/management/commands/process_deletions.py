@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.deletion import BATCH_SIZE, process_deletions
+
+
+class Command(BaseCommand):
+    help = 'Deletes titles, categories and genres queued for deletion'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Dependent rows processed per transaction'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to sleep between batches'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting when it is empty'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds between queue polls with --loop'
+        )
+
+    def report(self, task):
+        stage = f' ({task.stage})' if task.stage else ''
+        self.stdout.write(
+            f'{task.model} {task.object_id}: {task.status}{stage}, '
+            f'{task.processed} dependent rows processed'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            done = process_deletions(
+                options['batch_size'], options['pause'], self.report
+            )
+            if not options['loop']:
+                break
+            if not done:
+                time.sleep(options['interval'])
+        self.stdout.write(
+            self.style.SUCCESS('Successfully processed deletion queue')
+        )
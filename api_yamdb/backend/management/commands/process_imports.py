@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.importers import BATCH_SIZE, process_imports
+
+
+class Command(BaseCommand):
+    help = 'Imports CSV files uploaded through the API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Rows inserted per transaction'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting when it is empty'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds between queue polls with --loop'
+        )
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Requeue failed jobs, resuming from their checkpoint'
+        )
+
+    def report(self, job):
+        self.stdout.write(
+            f'{job.file_name} #{job.pk}: {job.status}, '
+            f'{job.processed} rows imported'
+        )
+
+    def handle(self, *args, **options):
+        retry_failed = options['retry_failed']
+        while True:
+            done = process_imports(
+                options['batch_size'], self.report, retry_failed
+            )
+            retry_failed = False
+            if not options['loop']:
+                break
+            if not done:
+                time.sleep(options['interval'])
+        self.stdout.write(
+            self.style.SUCCESS('Successfully processed import queue')
+        )
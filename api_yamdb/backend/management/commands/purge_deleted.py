@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from reviews.purge import BATCH_SIZE, purge_deleted
+
+
+class Command(BaseCommand):
+    help = 'Hard-deletes soft-deleted reviews and comments in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Rows deleted per transaction'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to sleep between batches'
+        )
+
+    def handle(self, *args, **options):
+        for model, total in purge_deleted(
+                options['batch_size'], options['pause']):
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {total} deleted'
+            )
+        self.stdout.write(
+            self.style.SUCCESS('Successfully purged deleted rows')
+        )
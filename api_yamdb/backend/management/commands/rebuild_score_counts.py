@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from reviews.counters import rebuild_score_counts
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds per-title score counters from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--title', type=int, action='append', dest='titles',
+            help='Rebuild counters only for the given title id'
+        )
+
+    def handle(self, *args, **options):
+        rebuild_score_counts(options['titles'])
+        self.stdout.write(
+            self.style.SUCCESS('Successfully rebuilt score counters')
+        )
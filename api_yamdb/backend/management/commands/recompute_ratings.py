@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recomputes average and Bayesian weighted ratings of all titles'
+
+    def handle(self, *args, **options):
+        updated = recompute_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully updated {updated} titles')
+        )
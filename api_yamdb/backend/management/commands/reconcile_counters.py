@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from reviews.counters import BATCH_SIZE, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Fixes drifted review and comment counts in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Rows checked per query'
+        )
+
+    def handle(self, *args, **options):
+        for name, fixed in reconcile_counters(options['batch_size']).items():
+            self.stdout.write(f'{name}: {fixed} fixed')
+        self.stdout.write(
+            self.style.SUCCESS('Successfully reconciled counters')
+        )
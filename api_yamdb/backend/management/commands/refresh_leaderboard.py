@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboard import refresh_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the top titles leaderboard for all time windows'
+
+    def handle(self, *args, **options):
+        refresh_leaderboard()
+        self.stdout.write(
+            self.style.SUCCESS('Successfully refreshed leaderboard')
+        )
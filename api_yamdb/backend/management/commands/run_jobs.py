@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.jobs import stats, work
+
+
+class Command(BaseCommand):
+    help = 'Runs background jobs: mail, deletions and CSV imports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Jobs run in parallel threads'
+        )
+        parser.add_argument(
+            '--name', action='append', dest='names',
+            help='Run only jobs with this name, can be repeated'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting when it is empty'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Seconds between queue polls with --loop'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            done = work(options['workers'], options['names'])
+            total += done
+            if not options['loop']:
+                break
+            if not done:
+                time.sleep(options['interval'])
+        queue = stats()
+        self.stdout.write(
+            f'{total} jobs run, {queue["depth"]} ready, '
+            f'{queue["delayed"]} delayed'
+        )
+        self.stdout.write(
+            self.style.SUCCESS('Successfully processed job queue')
+        )
@@ -0,0 +1,60 @@
+# Generated by Django 2.2.16 on 2026-10-19 17:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'ordering': ['-id']},
+        ),
+        migrations.AlterModelOptions(
+            name='genre',
+            options={'ordering': ['-id']},
+        ),
+        migrations.AlterModelOptions(
+            name='title',
+            options={'ordering': ['-id']},
+        ),
+        migrations.AlterModelOptions(
+            name='user',
+            options={'ordering': ['username']},
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='slug',
+            field=models.CharField(db_index=True, max_length=50, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='genre',
+            name='slug',
+            field=models.CharField(db_index=True, max_length=50, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='name',
+            field=models.CharField(db_index=True, max_length=150),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(db_index=True, max_length=254, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('user', 'Аутентифицированный пользователь'), ('moderator', 'Модератор'), ('admin', 'Администратор')], db_index=True, default='user', max_length=16),
+        ),
+        migrations.DeleteModel(
+            name='Comment',
+        ),
+        migrations.DeleteModel(
+            name='Review',
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-19 17:24
+
+import api.validators
+from django.db import migrations, models
+from django.db.models import Avg, OuterRef, Subquery
+
+
+def fill_rating(apps, schema_editor):
+    # Раньше средняя оценка считалась в запросе, теперь хранится в Title
+    Title = apps.get_model('backend', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    average = Review.objects.filter(title=OuterRef('pk')).values(
+        'title'
+    ).annotate(average=Avg('score')).values('average')
+    Title.objects.update(
+        rating=Subquery(average[:1], output_field=models.FloatField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0003_title_weighted_rating'),
+        ('reviews', '0003_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.IntegerField(blank=True, db_index=True, null=True, validators=[api.validators.validate_year]),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'year'], name='title_category_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'rating'], name='title_category_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'name'], name='title_category_name_idx'),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+    ]
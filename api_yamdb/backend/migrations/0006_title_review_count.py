@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 17:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0005_deletion_tasks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-19 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_title_review_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(choices=[('users.csv', 'Пользователи'), ('category.csv', 'Категории'), ('genre.csv', 'Жанры'), ('titles.csv', 'Произведения'), ('genre_title.csv', 'Жанры произведений'), ('review.csv', 'Отзывы'), ('comments.csv', 'Комментарии')], max_length=32)),
+                ('path', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Выполнено'), ('failed', 'Ошибка')], default='pending', max_length=16)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['created'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='importjob',
+            index=models.Index(fields=['status', 'created'], name='import_status_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 2.2.16 on 2026-10-19 18:17
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def enqueue_unfinished(apps, schema_editor):
+    # Незавершённые удаления и загрузки теперь выполняет очередь задач
+    DeletionTask = apps.get_model('backend', 'DeletionTask')
+    ImportJob = apps.get_model('backend', 'ImportJob')
+    Job = apps.get_model('backend', 'Job')
+    unfinished = ('pending', 'running', 'failed')
+    Job.objects.bulk_create([
+        Job(name='deletion', payload=f'{{"task_id": {task.pk}}}',
+            key=f'deletion:{task.pk}')
+        for task in DeletionTask.objects.filter(status__in=unfinished)
+    ] + [
+        Job(name='import', payload=f'{{"job_id": {job.pk}}}',
+            key=f'import:{job.pk}', priority=-10)
+        for job in ImportJob.objects.filter(status__in=unfinished)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_import_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64)),
+                ('payload', models.TextField(default='{}')),
+                ('key', models.CharField(blank=True, max_length=255, null=True, unique=True)),
+                ('priority', models.SmallIntegerField(default=0)),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Выполнено'), ('failed', 'Ошибка')], default='pending', max_length=16)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('lease', models.CharField(blank=True, max_length=32)),
+                ('worker', models.CharField(blank=True, max_length=255)),
+                ('error', models.TextField(blank=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['created'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', '-priority', 'run_after'], name='job_queue_idx'),
+        ),
+        migrations.RunPython(enqueue_unfinished, migrations.RunPython.noop),
+    ]
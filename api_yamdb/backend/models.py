@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from api.validators import validate_year
 
@@ -45,9 +46,23 @@ class User(AbstractUser):
         return self.username
 
 
+class SoftDeleteQuerySet(models.QuerySet):
+    def alive(self):
+        """Записи, не помеченные как удалённые."""
+        return self.filter(is_deleted=False)
+
+    def deleted(self):
+        """Помеченные записи, которые ещё не удалены окончательно."""
+        return self.filter(is_deleted=True)
+
+
 class Category(models.Model):
     name = models.CharField(max_length=256)
     slug = models.CharField(max_length=50, unique=True, db_index=True)
+    # Удаление выполняет воркер очереди задач (backend.deletion)
+    is_deleted = models.BooleanField(default=False)
+
+    objects = SoftDeleteQuerySet.as_manager()
 
     class Meta:
         ordering = ['-id']
@@ -59,6 +74,9 @@ class Category(models.Model):
 class Genre(models.Model):
     name = models.CharField(max_length=50)
     slug = models.CharField(max_length=50, unique=True, db_index=True)
+    is_deleted = models.BooleanField(default=False)
+
+    objects = SoftDeleteQuerySet.as_manager()
 
     class Meta:
         ordering = ['-id']
@@ -72,7 +90,8 @@ class Title(models.Model):
     year = models.IntegerField(
         blank=True,
         null=True,
-        validators=(validate_year, ))
+        validators=(validate_year, ),
+        db_index=True)
     description = models.TextField()
     genre = models.ManyToManyField(
         Genre,
@@ -84,9 +103,194 @@ class Title(models.Model):
         related_name='titles',
         blank=True,
         null=True)
+    # Средняя и байесовская оценки, пересчитываются по счётчикам оценок
+    # отзывов (reviews.ratings)
+    rating = models.FloatField(
+        blank=True,
+        null=True,
+        db_index=True)
+    weighted_rating = models.FloatField(
+        blank=True,
+        null=True,
+        db_index=True)
+    # Число видимых отзывов, обновляется через F() (reviews.counters)
+    review_count = models.IntegerField(default=0)
+    is_deleted = models.BooleanField(default=False)
+
+    objects = SoftDeleteQuerySet.as_manager()
 
     class Meta:
         ordering = ['-id']
+        # Фильтр по категории вместе с сортировкой TitleFilter
+        indexes = [
+            models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'),
+            models.Index(
+                fields=['category', 'rating'],
+                name='title_category_rating_idx'),
+            models.Index(
+                fields=['category', 'name'], name='title_category_name_idx'),
+        ]
 
     def __str__(self):
         return f'{self.name} ({self.year})'
+
+    # Жанры и категория, помеченные удалёнными, скрыты сразу, хотя
+    # связи с ними воркер удаления снимет позже
+    @property
+    def alive_genres(self):
+        return [genre for genre in self.genre.all() if not genre.is_deleted]
+
+    @property
+    def alive_category(self):
+        category = self.category
+        if category is None or category.is_deleted:
+            return None
+        return category
+
+
+class DeletionTask(models.Model):
+    """Фоновое удаление объекта вместе с зависящими от него записями."""
+    TITLE = 'title'
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    MODELS = (
+        (TITLE, 'Произведение'),
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+    )
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    model = models.CharField(max_length=16, choices=MODELS)
+    object_id = models.PositiveIntegerField()
+    status = models.CharField(
+        max_length=16, choices=STATUSES, default=PENDING)
+    # Текущий этап и число обработанных зависимых записей
+    stage = models.CharField(max_length=32, blank=True)
+    processed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created']
+        indexes = [
+            models.Index(
+                fields=['status', 'created'],
+                name='deletion_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id}: {self.status}'
+
+
+class ImportJob(models.Model):
+    """Загрузка CSV-файла в формате populatedb, принятого через API."""
+    FILE_NAMES = (
+        ('users.csv', 'Пользователи'),
+        ('category.csv', 'Категории'),
+        ('genre.csv', 'Жанры'),
+        ('titles.csv', 'Произведения'),
+        ('genre_title.csv', 'Жанры произведений'),
+        ('review.csv', 'Отзывы'),
+        ('comments.csv', 'Комментарии'),
+    )
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = DeletionTask.STATUSES
+
+    file_name = models.CharField(max_length=32, choices=FILE_NAMES)
+    # Файл на диске сервера, удаляется после успешной загрузки
+    path = models.CharField(max_length=255)
+    size = models.BigIntegerField(default=0)
+    status = models.CharField(
+        max_length=16, choices=STATUSES, default=PENDING)
+    processed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created']
+        indexes = [
+            models.Index(
+                fields=['status', 'created'],
+                name='import_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.file_name} #{self.pk}: {self.status}'
+
+
+class ImportState(models.Model):
+    """Контрольная точка загрузки CSV-файла (backend.importers).
+
+    Сохраняется в одной транзакции с пачкой строк: после сбоя загрузка
+    продолжается с позиции position, а не с начала файла.
+    """
+    source = models.CharField(max_length=255, unique=True)
+    # Размер и время изменения файла: другой файл загружается с начала
+    fingerprint = models.CharField(max_length=64)
+    rows = models.PositiveIntegerField(default=0)
+    position = models.BigIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.source}: {self.rows}'
+
+
+class Job(models.Model):
+    """Задача фоновой очереди, которую выполняет воркер run_jobs.
+
+    Очередь и блокировки живут в этой таблице (backend.jobs), отдельный
+    брокер не нужен.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = DeletionTask.STATUSES
+
+    name = models.CharField(max_length=64)
+    # Аргументы обработчика в JSON
+    payload = models.TextField(default='{}')
+    # Повторная постановка с тем же ключом возвращает уже созданную задачу
+    key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    # Задачи с большим приоритетом выдаются раньше
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=16, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    # Раньше этого времени задача не выдаётся (отложенный повтор)
+    run_after = models.DateTimeField(default=timezone.now)
+    # Выполняющая задача принадлежит аренде lease до locked_until, после
+    # чего считается брошенной и выдаётся снова
+    locked_until = models.DateTimeField(null=True, blank=True)
+    lease = models.CharField(max_length=32, blank=True)
+    worker = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created']
+        indexes = [
+            models.Index(
+                fields=['status', '-priority', 'run_after'],
+                name='job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}: {self.status}'
@@ -0,0 +1,305 @@
+"""Детерминированный генератор синтетических данных YaMDb.
+
+Один и тот же seed даёт одни и те же строки. Число отзывов на
+произведение распределено по закону Ципфа: несколько популярных
+произведений собирают большую часть отзывов, у остальных их единицы.
+Так же распределены комментарии по отзывам, поэтому у популярных
+отзывов длинные ветки обсуждения. Строки выдаются генераторами в
+формате CSV-файлов команды populatedb и не копятся в памяти: хранятся
+только числа отзывов на произведение и комментариев на отзыв.
+"""
+import csv
+import os
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from backend.importers import explicit_pub_dates
+from backend.models import Category, Genre, Title, User
+from reviews.models import Comment, Review
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'автор', 'музыка',
+    'сцена', 'актёр', 'роль', 'история', 'глава', 'смысл', 'мир',
+    'жизнь', 'время', 'любовь', 'дорога', 'город', 'ночь', 'очень',
+    'совсем', 'немного', 'снова', 'лучший', 'скучный', 'яркий',
+    'странный', 'добрый', 'тёмный', 'смешной', 'долгий', 'новый',
+    'понравился', 'удивил', 'затянут', 'советую', 'пересмотрю',
+)
+
+# Оценки чаще высокие: распределение в форме буквы J
+SCORE_WEIGHTS = (4, 2, 2, 3, 4, 6, 10, 15, 16, 14)
+
+# Каждый тысячный пользователь — модератор
+MODERATOR_EVERY = 1000
+
+# Файлы в формате populatedb: имя, колонки, метод генератора
+TABLES = (
+    ('users.csv', (
+        'id', 'password', 'username', 'email', 'user_role', 'first_name',
+        'last_name', 'is_superuser', 'is_staff', 'is_active',
+        'date_joined', 'bio',
+    ), 'users'),
+    ('category.csv', ('id', 'name', 'slug'), 'categories'),
+    ('genre.csv', ('id', 'name', 'slug'), 'genres'),
+    ('titles.csv', ('id', 'name', 'year', 'category'), 'titles'),
+    ('genre_title.csv', ('id', 'title_id', 'genre_id'), 'genre_titles'),
+    ('review.csv', (
+        'id', 'title_id', 'text', 'author', 'score', 'pub_date',
+    ), 'reviews'),
+    ('comments.csv', (
+        'id', 'review_id', 'text', 'author', 'pub_date',
+    ), 'comments'),
+)
+
+BATCH_SIZE = 5000
+
+
+def zipf_counts(total, size, exponent):
+    """Делит total на size частей с весами 1 / rank ** exponent."""
+    harmonic = sum(1 / rank ** exponent for rank in range(1, size + 1))
+    cumulative, assigned = 0.0, 0
+    for rank in range(1, size + 1):
+        cumulative += 1 / rank ** exponent
+        count = round(total * cumulative / harmonic) - assigned
+        assigned += count
+        yield count
+
+
+class SyntheticData:
+    """Набор синтетических данных заданного размера."""
+
+    def __init__(self, seed=0, users=1000, categories=5, genres=20,
+                 titles=1000, reviews=10000, comments=30000, exponent=1.1,
+                 end=None, first_ids=None, days=3650):
+        self.seed = seed
+        self.size = {
+            'users': users, 'categories': categories, 'genres': genres,
+            'titles': titles,
+        }
+        self.exponent = exponent
+        # Даты отсчитываются назад от end, по умолчанию от начала суток
+        self.end = end or timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.days = days
+        self.first_ids = dict.fromkeys(
+            ('users', 'categories', 'genres', 'titles', 'genre_titles',
+             'reviews', 'comments'), 1
+        )
+        self.first_ids.update(first_ids or {})
+
+        # Автор оставляет не больше одного отзыва на произведение
+        rng = self.random('review_counts')
+        self.review_counts = [
+            min(count, users)
+            for count in zipf_counts(reviews, titles, exponent)
+        ]
+        rng.shuffle(self.review_counts)
+        rng = self.random('comment_counts')
+        self.comment_counts = list(
+            zipf_counts(comments, sum(self.review_counts), exponent)
+        )
+        rng.shuffle(self.comment_counts)
+
+    def random(self, table):
+        # Отдельный генератор на таблицу: строки таблицы не зависят от
+        # того, какие таблицы генерировались до неё
+        return random.Random(f'{self.seed}:{table}')
+
+    def ids(self, name, count):
+        return range(self.first_ids[name], self.first_ids[name] + count)
+
+    def text(self, rng, low, high):
+        words = rng.choices(WORDS, k=rng.randint(low, high))
+        return ' '.join(words).capitalize() + '.'
+
+    def date(self, rng):
+        return self.end - timedelta(seconds=rng.uniform(0, self.days * 86400))
+
+    def users(self):
+        rng = self.random('users')
+        for index, pk in enumerate(self.ids('users', self.size['users'])):
+            yield {
+                'id': pk,
+                # Вход по коду подтверждения, пароль не нужен
+                'password': '!',
+                'username': f'user{pk}',
+                'email': f'user{pk}@yamdb.fake',
+                'user_role': (
+                    'moderator' if index % MODERATOR_EVERY == 1 else 'user'
+                ),
+                'first_name': '',
+                'last_name': '',
+                'is_superuser': 0,
+                'is_staff': 0,
+                'is_active': 1,
+                'date_joined': self.date(rng),
+                'bio': '',
+            }
+
+    def categories(self):
+        for pk in self.ids('categories', self.size['categories']):
+            yield {'id': pk, 'name': f'Категория {pk}', 'slug': f'c{pk}'}
+
+    def genres(self):
+        for pk in self.ids('genres', self.size['genres']):
+            yield {'id': pk, 'name': f'Жанр {pk}', 'slug': f'g{pk}'}
+
+    def titles(self):
+        rng = self.random('titles')
+        categories = self.ids('categories', self.size['categories'])
+        for pk, review_count in zip(
+                self.ids('titles', self.size['titles']), self.review_counts):
+            yield {
+                'id': pk,
+                'name': self.text(rng, 1, 4)[:-1],
+                'year': rng.randint(1900, self.end.year),
+                'category': rng.choice(categories),
+                'review_count': review_count,
+            }
+
+    def genre_titles(self):
+        rng = self.random('genre_titles')
+        genres = self.ids('genres', self.size['genres'])
+        pk = self.first_ids['genre_titles']
+        for title_id in self.ids('titles', self.size['titles']):
+            for genre_id in sorted(rng.sample(
+                    genres, min(rng.randint(1, 3), len(genres)))):
+                yield {'id': pk, 'title_id': title_id, 'genre_id': genre_id}
+                pk += 1
+
+    def reviews(self):
+        rng = self.random('reviews')
+        users = self.ids('users', self.size['users'])
+        comment_counts = iter(self.comment_counts)
+        pk = self.first_ids['reviews']
+        for title_id, review_count in zip(
+                self.ids('titles', self.size['titles']), self.review_counts):
+            for author in rng.sample(users, review_count):
+                yield {
+                    'id': pk,
+                    'title_id': title_id,
+                    'text': self.text(rng, 5, 60),
+                    'author': author,
+                    'score': rng.choices(range(1, 11), SCORE_WEIGHTS)[0],
+                    'pub_date': self.date(rng),
+                    'comment_count': next(comment_counts),
+                }
+                pk += 1
+
+    def comments(self):
+        rng = self.random('comments')
+        users = self.ids('users', self.size['users'])
+        pk = self.first_ids['comments']
+        for review_id, comment_count in zip(
+                self.ids('reviews', len(self.comment_counts)),
+                self.comment_counts):
+            for _ in range(comment_count):
+                yield {
+                    'id': pk,
+                    'review_id': review_id,
+                    'text': self.text(rng, 3, 30),
+                    'author': rng.choice(users),
+                    'pub_date': self.date(rng),
+                }
+                pk += 1
+
+    def tables(self):
+        """Имя файла, колонки и строки каждой таблицы в порядке загрузки."""
+        for file_name, columns, method in TABLES:
+            yield file_name, columns, getattr(self, method)()
+
+
+def csv_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    return value
+
+
+def write_csv(data, directory):
+    """Пишет CSV-файлы для populatedb, выдаёт имя файла и число строк."""
+    os.makedirs(directory, exist_ok=True)
+    for file_name, columns, rows in data.tables():
+        count = 0
+        path = os.path.join(directory, file_name)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow([csv_value(row[column]) for column in columns])
+                count += 1
+        yield file_name, count
+
+
+# Строка таблицы -> объект модели для bulk_create
+INSTANCES = {
+    'users.csv': lambda row: User(
+        id=row['id'], password=row['password'], username=row['username'],
+        email=row['email'], role=row['user_role'],
+        is_superuser=row['is_superuser'], is_staff=row['is_staff'],
+        is_active=row['is_active'], date_joined=row['date_joined'],
+    ),
+    'category.csv': lambda row: Category(**row),
+    'genre.csv': lambda row: Genre(**row),
+    'titles.csv': lambda row: Title(
+        id=row['id'], name=row['name'], year=row['year'],
+        category_id=row['category'], description='',
+        review_count=row['review_count'],
+    ),
+    'genre_title.csv': lambda row: Title.genre.through(**row),
+    'review.csv': lambda row: Review(
+        id=row['id'], title_id=row['title_id'], text=row['text'],
+        author_id=row['author'], score=row['score'],
+        pub_date=row['pub_date'], comment_count=row['comment_count'],
+    ),
+    'comments.csv': lambda row: Comment(
+        id=row['id'], review_id=row['review_id'], text=row['text'],
+        author_id=row['author'], pub_date=row['pub_date'],
+    ),
+}
+
+
+def insert(data, batch_size=BATCH_SIZE):
+    """Загружает данные в БД через bulk_create, минуя сигналы.
+
+    Счётчики оценок, рейтинги и список лучших после загрузки нужно
+    пересчитать (команда generate_data делает это сама).
+    """
+    with explicit_pub_dates():
+        for file_name, _, rows in data.tables():
+            build = INSTANCES[file_name]
+            count = 0
+            batch = []
+            for row in rows:
+                batch.append(build(row))
+                if len(batch) >= batch_size:
+                    count += flush(batch)
+            count += flush(batch)
+            yield file_name, count
+
+
+def flush(batch):
+    count = len(batch)
+    if batch:
+        with transaction.atomic():
+            type(batch[0]).objects.bulk_create(batch)
+        batch.clear()
+    return count
+
+
+def next_ids():
+    """Первые свободные id, чтобы не пересекаться с данными в БД."""
+    models = {
+        'users': User, 'categories': Category, 'genres': Genre,
+        'titles': Title, 'genre_titles': Title.genre.through,
+        'reviews': Review, 'comments': Comment,
+    }
+    return {
+        name: (model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0) + 1
+        for name, model in models.items()
+    }
@@ -0,0 +1,112 @@
+"""Массовая загрузка отзывов от партнёров.
+
+Пачка отзывов по многим произведениям обрабатывается фиксированным
+числом запросов: произведения и авторы ищутся одним запросом каждые,
+уже существующие пары (произведение, автор) — одним запросом, отзывы
+вставляются через bulk_create. bulk_create не вызывает сигналы, поэтому
+счётчики оценок и число отзывов меняются сгруппированными дельтами, а
+рейтинги пересчитываются один раз на произведение.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+from backend.models import Title, User
+from reviews import documents
+from reviews.counters import (apply_comment_count_delta,
+                              apply_review_count_delta, apply_score_delta,
+                              count_subquery, rebuild_score_counts)
+from reviews.models import Comment, Review
+from reviews.signals import refresh_rating_aggregates
+
+BATCH_SIZE = 1000
+
+UNKNOWN_TITLE = 'unknown title'
+UNKNOWN_AUTHOR = 'unknown author'
+DUPLICATE = 'duplicate'
+
+
+def ingest_reviews(rows):
+    """Создаёт отзывы из rows: словарей с title, author, text и score.
+
+    author — имя пользователя. Возвращает число созданных отзывов и
+    список пропущенных строк: номер строки в пачке и причину.
+    """
+    title_ids = set(
+        Title.objects.alive().filter(
+            pk__in={row['title'] for row in rows}
+        ).values_list('pk', flat=True)
+    )
+    authors = dict(
+        User.objects.filter(
+            username__in={row['author'] for row in rows}
+        ).values_list('username', 'pk')
+    )
+    # Ограничение уникальности проверяется сразу для всей пачки
+    existing = set(
+        Review.objects.alive().filter(
+            title_id__in=title_ids, author_id__in=authors.values()
+        ).values_list('title_id', 'author_id')
+    )
+
+    reviews, skipped = [], []
+    for index, row in enumerate(rows):
+        author_id = authors.get(row['author'])
+        key = (row['title'], author_id)
+        if row['title'] not in title_ids:
+            skipped.append({'index': index, 'reason': UNKNOWN_TITLE})
+        elif author_id is None:
+            skipped.append({'index': index, 'reason': UNKNOWN_AUTHOR})
+        elif key in existing:
+            skipped.append({'index': index, 'reason': DUPLICATE})
+        else:
+            existing.add(key)
+            reviews.append(Review(
+                title_id=row['title'], author_id=author_id,
+                text=row['text'], score=row['score'],
+            ))
+
+    with transaction.atomic():
+        Review.objects.bulk_create(reviews)
+        count_created_reviews(reviews)
+    return len(reviews), skipped
+
+
+def count_created_reviews(reviews):
+    """Учитывает в счётчиках отзывы, вставленные через bulk_create."""
+    scores = Counter((review.title_id, review.score) for review in reviews)
+    for (title_id, score), count in scores.items():
+        apply_score_delta(title_id, score, count)
+    added = Counter(review.title_id for review in reviews)
+    for title_id, count in added.items():
+        apply_review_count_delta(title_id, count)
+    if added:
+        refresh_rating_aggregates(sorted(added))
+
+
+def count_created_comments(comments):
+    """Учитывает в comment_count комментарии из bulk_create."""
+    added = Counter(comment.review_id for comment in comments)
+    for review_id, count in added.items():
+        apply_comment_count_delta(review_id, count)
+    documents.refresh_reviews(list(added))
+
+
+def recount_titles(title_ids):
+    """Пересчитывает счётчики и рейтинги после изменения отзывов."""
+    rebuild_score_counts(title_ids)
+    Title.objects.filter(pk__in=title_ids).update(
+        review_count=count_subquery(Review.objects.visible(), 'title')
+    )
+    refresh_rating_aggregates(sorted(title_ids))
+
+
+def recount_reviews(review_ids):
+    """Пересчитывает comment_count после изменения комментариев."""
+    Review.objects.filter(pk__in=review_ids).update(
+        comment_count=count_subquery(
+            Comment.objects.filter(is_deleted=False, is_hidden=False),
+            'review'
+        )
+    )
+    documents.refresh_reviews(list(review_ids))
@@ -0,0 +1,224 @@
+"""Счётчики оценок произведений и денормализованные числа записей.
+
+TitleScoreCount хранит гистограмму оценок, разбитую на шарды,
+Title.review_count и Review.comment_count — число видимых отзывов и
+комментариев. Все счётчики изменяются атомарными UPDATE с F(), а
+команды rebuild_score_counts и reconcile_counters исправляют
+расхождения. compact_score_counts периодически сводит шарды.
+
+Внутри транзакции меняются только шарды, а строки произведений —
+после её фиксации (after_commit), поэтому транзакции, вставляющие
+отзывы на одно произведение, не ждут блокировки его строки.
+"""
+import random
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (Count, F, IntegerField, OuterRef, Subquery,
+                              Sum)
+from django.db.models.functions import Coalesce
+
+from backend.models import Title
+from reviews.models import Comment, Review, TitleScoreCount
+
+SCORES = range(1, 11)
+
+# Размер пачки при массовом пересчёте счётчиков
+BATCH_SIZE = 1000
+
+
+def apply_score_delta(title_id, score, delta):
+    """Атомарно изменяет счётчик оценки score произведения на delta.
+
+    Меняется случайный шард счётчика, а не общая для всех строка.
+    """
+    counters = TitleScoreCount.objects.filter(
+        title_id=title_id, score=score,
+        shard=random.randrange(settings.SCORE_COUNT_SHARDS)
+    )
+    if counters.update(count=F('count') + delta):
+        return
+    # Первое изменение после создания или сжатия: заводим сразу все
+    # шарды, строки, созданные параллельным запросом, пропускаются
+    TitleScoreCount.objects.bulk_create([
+        TitleScoreCount(title_id=title_id, score=score, shard=shard)
+        for shard in range(settings.SCORE_COUNT_SHARDS)
+    ], ignore_conflicts=True)
+    counters.update(count=F('count') + delta)
+
+
+def move_score(title_id, old_score, new_score):
+    """Переносит отзыв между счётчиками, None — отзыв не учитывается."""
+    if old_score == new_score:
+        return
+    if old_score is not None:
+        apply_score_delta(title_id, old_score, -1)
+    if new_score is not None:
+        apply_score_delta(title_id, new_score, 1)
+    if old_score is None or new_score is None:
+        apply_review_count_delta(title_id, 1 if old_score is None else -1)
+
+
+def after_commit(func):
+    """Вызывает func после фиксации текущей транзакции, вне неё — сразу."""
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(func)
+    else:
+        func()
+
+
+def apply_review_count_delta(title_id, delta):
+    after_commit(lambda: Title.objects.filter(pk=title_id).update(
+        review_count=F('review_count') + delta
+    ))
+
+
+def apply_comment_count_delta(review_id, delta):
+    Review.objects.filter(pk=review_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+def rebuild_score_counts(title_ids=None):
+    """Пересчитывает счётчики по отзывам, для всех или указанных titles."""
+    reviews = Review.objects.visible()
+    counters = TitleScoreCount.objects.all()
+    if title_ids is not None:
+        reviews = reviews.filter(title_id__in=title_ids)
+        counters = counters.filter(title_id__in=title_ids)
+
+    rows = reviews.values('title_id', 'score').annotate(
+        count=Count('id')
+    ).order_by()
+    with transaction.atomic():
+        counters.delete()
+        batch = []
+        for row in rows.iterator():
+            batch.append(TitleScoreCount(**row))
+            if len(batch) >= BATCH_SIZE:
+                TitleScoreCount.objects.bulk_create(batch)
+                batch = []
+        TitleScoreCount.objects.bulk_create(batch)
+
+
+def compact_score_counts(batch_size=BATCH_SIZE):
+    """Сводит шарды каждого счётчика в шард 0, возвращает число строк.
+
+    Произведения обрабатываются пачками, строки пачки блокируются, так
+    что параллельные изменения ждут конца транзакции и не теряются.
+    """
+    removed = 0
+    last_id = 0
+    while True:
+        title_ids = list(
+            TitleScoreCount.objects.filter(
+                shard__gt=0, title_id__gt=last_id
+            ).order_by('title_id').values_list(
+                'title_id', flat=True
+            ).distinct()[:batch_size]
+        )
+        if not title_ids:
+            return removed
+        last_id = title_ids[-1]
+        with transaction.atomic():
+            counters = TitleScoreCount.objects.select_for_update().filter(
+                title_id__in=title_ids
+            )
+            totals = Counter()
+            rows = 0
+            for title_id, score, count in counters.values_list(
+                    'title_id', 'score', 'count'):
+                totals[(title_id, score)] += count
+                rows += 1
+            counters.delete()
+            compacted = [
+                TitleScoreCount(title_id=title_id, score=score, count=count)
+                for (title_id, score), count in totals.items() if count
+            ]
+            TitleScoreCount.objects.bulk_create(compacted)
+        removed += rows - len(compacted)
+
+
+def get_distribution(title_id):
+    """Гистограмма оценок, число отзывов, среднее и медиана."""
+    counts = dict.fromkeys(SCORES, 0)
+    counts.update(
+        TitleScoreCount.objects.filter(title_id=title_id).values(
+            'score'
+        ).annotate(total=Sum('count')).filter(
+            total__gt=0
+        ).order_by().values_list('score', 'total')
+    )
+    total = sum(counts.values())
+    if not total:
+        return {
+            'count': 0, 'mean': None, 'median': None, 'distribution': counts
+        }
+
+    # Медиана — среднее двух центральных оценок упорядоченного ряда
+    middle = ((total - 1) // 2, total // 2)
+    central, seen = [], 0
+    for score in SCORES:
+        seen += counts[score]
+        while len(central) < 2 and middle[len(central)] < seen:
+            central.append(score)
+    return {
+        'count': total,
+        'mean': sum(score * count for score, count in counts.items()) / total,
+        'median': sum(central) / 2,
+        'distribution': counts,
+    }
+
+
+def count_subquery(queryset, field):
+    """Число записей queryset, связанных полем field с внешней строкой."""
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+        field
+    ).annotate(total=Count('pk')).values('total')
+    return Coalesce(
+        Subquery(counts[:1], output_field=IntegerField()), 0
+    )
+
+
+def reconcile(model, field, actual, batch_size=BATCH_SIZE):
+    """Исправляет счётчик field пачками по pk, возвращает число строк."""
+    fixed = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            model.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', flat=True
+            )[:batch_size]
+        )
+        if not pks:
+            return fixed
+        last_pk = pks[-1]
+        drifted = [
+            model(pk=pk, **{field: value})
+            for pk, value, stored in model.objects.filter(
+                pk__in=pks
+            ).annotate(actual=actual).values_list('pk', 'actual', field)
+            if value != stored
+        ]
+        model.objects.bulk_update(drifted, [field])
+        fixed += len(drifted)
+
+
+def reconcile_counters(batch_size=BATCH_SIZE):
+    """Пересчитывает review_count и comment_count, где они разошлись."""
+    return {
+        'titles': reconcile(
+            Title, 'review_count',
+            count_subquery(Review.objects.visible(), 'title'),
+            batch_size
+        ),
+        'reviews': reconcile(
+            Review, 'comment_count',
+            count_subquery(
+                Comment.objects.filter(is_deleted=False, is_hidden=False),
+                'review'
+            ),
+            batch_size
+        ),
+    }
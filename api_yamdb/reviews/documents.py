@@ -0,0 +1,112 @@
+"""Документы популярных произведений: готовый JSON страницы произведения.
+
+Документ хранит ответ titles/{id}/ и первую страницу отзывов
+titles/{id}/reviews/, поэтому такие запросы обходятся одним чтением по
+первичному ключу вместо запросов к произведению, жанрам, категории и
+отзывам. Документы заводятся только для самых обсуждаемых произведений
+командой build_title_documents, для остальных ответ строится как обычно.
+
+Существующий документ пересобирается при изменении произведения, его
+жанров и категории, отзывов и числа комментариев к ним (reviews.signals
+и массовые операции). Смена имени автора документы не обновляет: их
+пересоберёт следующий запуск build_title_documents.
+"""
+import json
+
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.utils.encoders import JSONEncoder
+
+from backend.models import Genre, Title
+from reviews.models import TitleDocument
+
+# Сколько документов пересобирается одной транзакцией
+BATCH_SIZE = 100
+
+
+def dumps(data):
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False)
+
+
+def render(title):
+    """Поля документа: те же данные, что отдают живые запросы."""
+    # api.serializers импортирует reviews.moderation, а та — сигналы
+    from api.serializers import ReviewSerializer, TitleReadSerializer
+
+    reviews = title.reviews.visible()
+    # Размер страницы тот же, что у ReviewViewSet
+    page = reviews.prefetch_related('author')[
+        :PageNumberPagination.page_size
+    ]
+    return {
+        'detail': dumps(TitleReadSerializer(title).data),
+        'reviews': dumps(ReviewSerializer(page, many=True).data),
+        'review_total': reviews.count(),
+    }
+
+
+def build(title_ids):
+    """Создаёт или пересобирает документы произведений title_ids."""
+    titles = Title.objects.alive().filter(pk__in=title_ids).select_related(
+        'category'
+    ).prefetch_related(Prefetch('genre', queryset=Genre.objects.alive()))
+    with transaction.atomic():
+        # Документы удалённых произведений просто исчезают
+        TitleDocument.objects.filter(title_id__in=title_ids).delete()
+        TitleDocument.objects.bulk_create([
+            TitleDocument(title=title, **render(title)) for title in titles
+        ])
+
+
+def refresh(title_ids=None, **lookups):
+    """Пересобирает существующие документы из title_ids или по lookups.
+
+    Например, refresh(title__genre=genre.pk) — документы произведений
+    жанра. Для произведений без документа это один запрос.
+    """
+    documents = TitleDocument.objects.filter(**lookups)
+    if title_ids is not None:
+        documents = documents.filter(title_id__in=title_ids)
+    stored = set(documents.values_list('title_id', flat=True))
+    if stored:
+        build(stored)
+
+
+def refresh_reviews(review_ids):
+    """Пересобирает документы после изменения числа комментариев."""
+    if review_ids:
+        refresh(title__reviews__in=review_ids)
+
+
+def load(title_id):
+    """Документ произведения или None, если документа нет."""
+    try:
+        return TitleDocument.objects.filter(title_id=title_id).first()
+    except ValueError:
+        # Нечисловой id: живой запрос сам ответит 404
+        return None
+
+
+def build_hot(count, batch_size=BATCH_SIZE, progress=None):
+    """Оставляет документы count произведений с наибольшим числом отзывов.
+
+    Возвращает число документов.
+    """
+    hot = list(
+        Title.objects.alive().order_by('-review_count', '-id').values_list(
+            'pk', flat=True
+        )[:count]
+    )
+    stale = sorted(set(
+        TitleDocument.objects.values_list('title_id', flat=True)
+    ) - set(hot))
+    for start in range(0, len(stale), batch_size):
+        TitleDocument.objects.filter(
+            title_id__in=stale[start:start + batch_size]
+        ).delete()
+    for start in range(0, len(hot), batch_size):
+        build(hot[start:start + batch_size])
+        if progress:
+            progress(min(start + batch_size, len(hot)))
+    return len(hot)
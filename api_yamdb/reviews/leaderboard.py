@@ -0,0 +1,93 @@
+"""Материализованный список лучших произведений по периодам.
+
+Записи обновляются для отдельного произведения при изменении его
+отзывов, а команда refresh_leaderboard периодически пересчитывает весь
+список, чтобы из окон 7 и 30 дней выпадали устаревшие отзывы.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Prefetch
+from django.utils import timezone
+
+from backend.models import Genre
+from reviews.models import LeaderboardEntry, Review
+
+WINDOW_DAYS = {
+    LeaderboardEntry.ALL_TIME: None,
+    LeaderboardEntry.LAST_7_DAYS: 7,
+    LeaderboardEntry.LAST_30_DAYS: 30,
+}
+
+# Размер пачки при полном пересчёте
+BATCH_SIZE = 1000
+
+
+def window_reviews(window, now=None):
+    reviews = Review.objects.visible().filter(title__is_deleted=False)
+    days = WINDOW_DAYS[window]
+    if days is not None:
+        now = now or timezone.now()
+        reviews = reviews.filter(pub_date__gte=now - timedelta(days=days))
+    return reviews
+
+
+def aggregate(reviews):
+    return reviews.values('title_id').annotate(
+        category_id=F('title__category_id'),
+        rating=Avg('score'),
+        review_count=Count('id'),
+    ).order_by()
+
+
+def refresh_titles(title_ids):
+    """Пересчитывает записи указанных произведений во всех периодах."""
+    now = timezone.now()
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(title_id__in=title_ids).delete()
+        LeaderboardEntry.objects.bulk_create([
+            LeaderboardEntry(window=window, **row)
+            for window in WINDOW_DAYS
+            for row in aggregate(
+                window_reviews(window, now).filter(title_id__in=title_ids)
+            )
+        ])
+
+
+def refresh_leaderboard():
+    """Полностью пересчитывает список лучших произведений."""
+    now = timezone.now()
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        for window in WINDOW_DAYS:
+            batch = []
+            for row in aggregate(window_reviews(window, now)).iterator():
+                batch.append(LeaderboardEntry(window=window, **row))
+                if len(batch) >= BATCH_SIZE:
+                    LeaderboardEntry.objects.bulk_create(batch)
+                    batch = []
+            LeaderboardEntry.objects.bulk_create(batch)
+
+
+def top_titles(window, limit, category=None, genre=None):
+    """Лучшие произведения периода, не более limit записей."""
+    entries = LeaderboardEntry.objects.filter(window=window)
+    if category:
+        entries = entries.filter(
+            category__slug=category, category__is_deleted=False
+        )
+    if genre:
+        entries = entries.filter(
+            title__genre__slug=genre, title__genre__is_deleted=False
+        )
+    return entries.select_related(
+        'title', 'title__category'
+    ).prefetch_related(
+        Prefetch('title__genre', queryset=Genre.objects.alive())
+    )[:limit]
+
+
+def update_title_category(title):
+    LeaderboardEntry.objects.filter(title=title).update(
+        category_id=title.category_id
+    )
@@ -0,0 +1,72 @@
+# Generated by Django 2.2.16 on 2026-10-19 17:17
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0002_sync_model_state'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ['pub_date'], 'verbose_name': 'comment to review', 'verbose_name_plural': 'comments to review'},
+        ),
+        migrations.AlterModelOptions(
+            name='review',
+            options={'ordering': ['pub_date'], 'verbose_name': 'review of a work', 'verbose_name_plural': 'reviews of a work'},
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to=settings.AUTH_USER_MODEL, verbose_name='comment author'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата публикации комментария'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='review',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='reviews.Review', verbose_name='review of a work'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='text',
+            field=models.TextField(verbose_name='comment text'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата публикации'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='score',
+            field=models.PositiveSmallIntegerField(db_index=True, default=1, validators=[django.core.validators.MinValueValidator(1, 'Значение должно быть от 1 до 10'), django.core.validators.MaxValueValidator(10, 'Значение должно быть от 1 до 10')]),
+        ),
+        migrations.CreateModel(
+            name='TitleScoreCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_counts', to='backend.Title')),
+            ],
+            options={
+                'verbose_name': 'score count',
+                'verbose_name_plural': 'score counts',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlescorecount',
+            constraint=models.UniqueConstraint(fields=('title', 'score'), name='one counter per title and score'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 2.2.16 on 2026-10-19 17:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0002_sync_model_state'),
+        ('reviews', '0002_title_score_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(choices=[('all', 'all time'), ('7d', 'last 7 days'), ('30d', 'last 30 days')], max_length=3)),
+                ('rating', models.FloatField()),
+                ('review_count', models.PositiveIntegerField()),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='backend.Category')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='backend.Title')),
+            ],
+            options={
+                'verbose_name': 'leaderboard entry',
+                'verbose_name_plural': 'leaderboard entries',
+                'ordering': ['-rating', '-review_count', 'title_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['window', '-rating', '-review_count', 'title'], name='leaderboard_window_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['window', 'category', '-rating', '-review_count', 'title'], name='leaderboard_category_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('window', 'title'), name='one leaderboard entry per title and window'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.16 on 2026-10-19 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_moderation_flags'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='review',
+            name='only 1 comment per author for title',
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='is_deleted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='is_deleted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(is_deleted=False), fields=['review', 'pub_date'], name='comment_alive_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(is_deleted=True), fields=['id'], name='comment_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(is_deleted=False), fields=['title', 'pub_date'], name='review_alive_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(is_deleted=True), fields=['id'], name='review_deleted_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(condition=models.Q(is_deleted=False), fields=('title', 'author'), name='only 1 comment per author for title'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-19 17:39
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset, field):
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+        field
+    ).annotate(total=Count('pk')).values('total')
+    return Coalesce(
+        Subquery(counts[:1], output_field=models.IntegerField()), 0
+    )
+
+
+def fill_counts(apps, schema_editor):
+    # Учитываются только опубликованные отзывы и комментарии
+    Title = apps.get_model('backend', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    Title.objects.update(review_count=count_subquery(
+        Review.objects.filter(is_deleted=False, is_hidden=False), 'title'
+    ))
+    Review.objects.update(comment_count=count_subquery(
+        Comment.objects.filter(is_deleted=False, is_hidden=False), 'review'
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_title_review_count'),
+        ('reviews', '0006_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
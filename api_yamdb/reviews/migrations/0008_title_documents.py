@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-19 18:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_import_state'),
+        ('reviews', '0007_denormalized_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleDocument',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='backend.Title')),
+                ('detail', models.TextField()),
+                ('reviews', models.TextField()),
+                ('review_total', models.PositiveIntegerField()),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
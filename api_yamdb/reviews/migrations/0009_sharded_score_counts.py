@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-19 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_documents'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='titlescorecount',
+            name='one counter per title and score',
+        ),
+        migrations.AddField(
+            model_name='titlescorecount',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='titlescorecount',
+            name='count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='titlescorecount',
+            constraint=models.UniqueConstraint(fields=('title', 'score', 'shard'), name='one counter per title, score and shard'),
+        ),
+    ]
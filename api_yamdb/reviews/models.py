@@ -1,7 +1,25 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
-from backend.models import Title, User
+from backend.models import Category, SoftDeleteQuerySet, Title, User
+
+
+class ModeratedQuerySet(SoftDeleteQuerySet):
+    def visible(self):
+        """Записи, не удалённые и не скрытые модератором."""
+        return self.filter(is_deleted=False, is_hidden=False)
+
+    def flagged(self):
+        """Очередь модерации: отмеченные пользователями и видимые."""
+        return self.visible().filter(is_flagged=True)
+
+
+class CommentQuerySet(ModeratedQuerySet):
+    def visible(self):
+        """Видимые комментарии к видимым отзывам."""
+        return super().visible().filter(
+            review__is_deleted=False, review__is_hidden=False
+        )
 
 
 class Review(models.Model):
@@ -20,13 +38,39 @@ class Review(models.Model):
                     MaxValueValidator(10, 'Значение должно быть от 1 до 10')],
         db_index=True,
     )
+    # Отметка пользователя для очереди модерации и скрытие модератором
+    is_flagged = models.BooleanField(default=False, db_index=True)
+    is_hidden = models.BooleanField(default=False)
+    # Мягкое удаление: строки удаляет команда purge_deleted
+    is_deleted = models.BooleanField(default=False)
+    # Число видимых комментариев, обновляется через F() (reviews.counters)
+    comment_count = models.IntegerField(default=0)
+
+    objects = ModeratedQuerySet.as_manager()
 
     class Meta:
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
+                condition=models.Q(is_deleted=False),
                 name='only 1 comment per author for title')
         ]
+        indexes = [
+            # История отзывов пользователя: users/{username}/reviews/
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='review_author_pub_date_idx'),
+            # Отзывы произведения без удалённых
+            models.Index(
+                fields=['title', 'pub_date'],
+                condition=models.Q(is_deleted=False),
+                name='review_alive_idx'),
+            # Очередь purge_deleted
+            models.Index(
+                fields=['id'],
+                condition=models.Q(is_deleted=True),
+                name='review_deleted_idx'),
+        ]
         ordering = ['pub_date']
         verbose_name = 'review of a work'
         verbose_name_plural = 'reviews of a work'
@@ -34,6 +78,21 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем учтённую в счётчиках оценку, чтобы при сохранении
+        # обновить счётчики без дополнительного запроса
+        instance.saved_rating_score = instance.rating_score
+        return instance
+
+    @property
+    def rating_score(self):
+        """Оценка, учитываемая в рейтинге произведения."""
+        if self.is_hidden or self.is_deleted:
+            return None
+        return self.score
+
 
 class Comment(models.Model):
     text = models.TextField(verbose_name='comment text')
@@ -49,11 +108,135 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments',
         verbose_name='comment author')
+    is_flagged = models.BooleanField(default=False, db_index=True)
+    is_hidden = models.BooleanField(default=False)
+    is_deleted = models.BooleanField(default=False)
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
+        indexes = [
+            # История комментариев пользователя: users/{username}/comments/
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='comment_author_pub_date_idx'),
+            # Комментарии к отзыву без удалённых
+            models.Index(
+                fields=['review', 'pub_date'],
+                condition=models.Q(is_deleted=False),
+                name='comment_alive_idx'),
+            # Очередь purge_deleted
+            models.Index(
+                fields=['id'],
+                condition=models.Q(is_deleted=True),
+                name='comment_deleted_idx'),
+        ]
         ordering = ['pub_date']
         verbose_name = 'comment to review'
         verbose_name_plural = 'comments to review'
 
     def __str__(self):
         return self.text
+
+
+class TitleScoreCount(models.Model):
+    """Количество отзывов с каждой оценкой для произведения.
+
+    Счётчик оценки разбит на шарды: запись меняет случайный шард, а
+    чтение суммирует их, поэтому отзывы на популярное произведение не
+    ждут блокировки одной строки. Отдельный шард может уйти в минус,
+    верна только сумма. Команда compact_score_counts сводит шарды в
+    один, rebuild_score_counts пересчитывает счётчики по отзывам.
+    """
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='score_counts'
+    )
+    score = models.PositiveSmallIntegerField()
+    shard = models.PositiveSmallIntegerField(default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score', 'shard'],
+                name='one counter per title, score and shard')
+        ]
+        verbose_name = 'score count'
+        verbose_name_plural = 'score counts'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} x {self.count}'
+
+
+class LeaderboardEntry(models.Model):
+    """Рейтинг произведения за период для списка лучших произведений.
+
+    Категория дублируется из произведения, чтобы выборка по категории
+    шла по индексу в порядке рейтинга.
+    """
+    ALL_TIME = 'all'
+    LAST_7_DAYS = '7d'
+    LAST_30_DAYS = '30d'
+    WINDOWS = (
+        (ALL_TIME, 'all time'),
+        (LAST_7_DAYS, 'last 7 days'),
+        (LAST_30_DAYS, 'last 30 days'),
+    )
+
+    window = models.CharField(max_length=3, choices=WINDOWS)
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='leaderboard_entries'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True)
+    rating = models.FloatField()
+    review_count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['window', 'title'],
+                name='one leaderboard entry per title and window')
+        ]
+        indexes = [
+            models.Index(
+                fields=['window', '-rating', '-review_count', 'title'],
+                name='leaderboard_window_idx'),
+            models.Index(
+                fields=[
+                    'window', 'category', '-rating', '-review_count', 'title'
+                ],
+                name='leaderboard_category_idx'),
+        ]
+        ordering = ['-rating', '-review_count', 'title_id']
+        verbose_name = 'leaderboard entry'
+        verbose_name_plural = 'leaderboard entries'
+
+    def __str__(self):
+        return f'{self.window}: {self.title_id} ({self.rating})'
+
+
+class TitleDocument(models.Model):
+    """Готовый JSON страницы популярного произведения.
+
+    Хранит ответы titles/{id}/ и первой страницы titles/{id}/reviews/,
+    чтобы отдавать их одним чтением по ключу. Документы создаёт команда
+    build_title_documents, а при изменении произведения, его жанров,
+    категории, отзывов и комментариев они пересобираются
+    (reviews.documents).
+    """
+    title = models.OneToOneField(
+        Title, on_delete=models.CASCADE, primary_key=True,
+        related_name='document'
+    )
+    detail = models.TextField()
+    reviews = models.TextField()
+    review_total = models.PositiveIntegerField()
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.title_id}: {self.updated}'
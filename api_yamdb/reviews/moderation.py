@@ -0,0 +1,106 @@
+"""Массовые действия модераторов над отзывами и комментариями.
+
+Каждое действие выполняется в одной транзакции, а рейтинги затронутых
+произведений пересчитываются один раз на произведение.
+"""
+from django.db import transaction
+from django.db.models import Count
+
+from reviews.counters import (apply_comment_count_delta,
+                              apply_review_count_delta, apply_score_delta)
+from reviews import documents
+from reviews.models import Comment, Review
+from reviews.signals import refresh_rating_aggregates
+
+HIDE = 'hide'
+DELETE = 'delete'
+APPROVE = 'approve'
+ACTIONS = (HIDE, DELETE, APPROVE)
+
+
+def withdraw_reviews(review_ids, **flags):
+    """Скрывает или мягко удаляет отзывы, убирая их оценки из счётчиков."""
+    with transaction.atomic():
+        pks = list(
+            Review.objects.select_for_update().filter(
+                pk__in=review_ids
+            ).exclude(**flags).values_list('pk', flat=True)
+        )
+        rows = list(
+            Review.objects.visible().filter(pk__in=pks).values(
+                'title_id', 'score'
+            ).annotate(count=Count('id')).order_by()
+        )
+        updated = Review.objects.filter(pk__in=pks).update(
+            is_flagged=False, **flags
+        )
+        removed = {}
+        for row in rows:
+            apply_score_delta(row['title_id'], row['score'], -row['count'])
+            removed[row['title_id']] = (
+                removed.get(row['title_id'], 0) + row['count']
+            )
+        for title_id, count in removed.items():
+            apply_review_count_delta(title_id, -count)
+        if removed:
+            refresh_rating_aggregates(sorted(removed))
+    return updated
+
+
+def hide_reviews(review_ids):
+    return withdraw_reviews(review_ids, is_hidden=True)
+
+
+def delete_reviews(review_ids):
+    """Мягко удаляет отзывы, строки удалит команда purge_deleted."""
+    return withdraw_reviews(review_ids, is_deleted=True)
+
+
+def withdraw_comments(comment_ids, **flags):
+    """Скрывает или мягко удаляет комментарии, обновляя comment_count."""
+    with transaction.atomic():
+        pks = list(
+            Comment.objects.select_for_update().filter(
+                pk__in=comment_ids
+            ).exclude(**flags).values_list('pk', flat=True)
+        )
+        rows = Comment.objects.filter(
+            pk__in=pks, is_hidden=False, is_deleted=False
+        ).values('review_id').annotate(count=Count('id')).order_by()
+        rows = list(rows)
+        for row in rows:
+            apply_comment_count_delta(row['review_id'], -row['count'])
+        updated = Comment.objects.filter(pk__in=pks).update(
+            is_flagged=False, **flags
+        )
+        documents.refresh_reviews([row['review_id'] for row in rows])
+    return updated
+
+
+def hide_comments(comment_ids):
+    return withdraw_comments(comment_ids, is_hidden=True)
+
+
+def delete_comments(comment_ids):
+    """Мягко удаляет комментарии, строки удалит команда purge_deleted."""
+    return withdraw_comments(comment_ids, is_deleted=True)
+
+
+def approve(model, ids):
+    """Снимает отметку: запись проверена и остаётся опубликованной."""
+    return model.objects.filter(pk__in=ids, is_flagged=True).update(
+        is_flagged=False
+    )
+
+
+def moderate(model, action, ids):
+    """Выполняет действие action над записями model, возвращает их число."""
+    if action == APPROVE:
+        return approve(model, ids)
+    handlers = {
+        (Review, HIDE): hide_reviews,
+        (Review, DELETE): delete_reviews,
+        (Comment, HIDE): hide_comments,
+        (Comment, DELETE): delete_comments,
+    }
+    return handlers[(model, action)](ids)
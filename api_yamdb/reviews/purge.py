@@ -0,0 +1,44 @@
+"""Окончательное удаление мягко удалённых отзывов и комментариев.
+
+Строки удаляются пачками по первичному ключу, каждая пачка в своей
+транзакции, поэтому блокировки короткие, а память не зависит от
+количества удалённых записей. Комментарии удалённых отзывов удаляются
+раньше самих отзывов, чтобы удаление отзыва не каскадировало на все его
+комментарии разом.
+"""
+import time
+
+from django.db import transaction
+
+from reviews.models import Comment, Review
+
+BATCH_SIZE = 1000
+
+
+def purge_batches(queryset, model, batch_size, pause=0):
+    """Удаляет строки queryset пачками, возвращает число удалённых."""
+    total = 0
+    while True:
+        pks = list(
+            queryset.order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return total
+        with transaction.atomic():
+            _, deleted = model.objects.filter(pk__in=pks).delete()
+        total += deleted.get(model._meta.label, 0)
+        yield total
+        if pause:
+            time.sleep(pause)
+
+
+def purge_deleted(batch_size=BATCH_SIZE, pause=0):
+    """Генератор прогресса: (модель, удалено строк) после каждой пачки."""
+    stages = (
+        (Comment, Comment.objects.deleted()),
+        (Comment, Comment.objects.filter(review__is_deleted=True)),
+        (Review, Review.objects.deleted()),
+    )
+    for model, queryset in stages:
+        for total in purge_batches(queryset, model, batch_size, pause):
+            yield model, total
@@ -0,0 +1,103 @@
+"""Рейтинги произведений, хранимые в Title для сортировки и фильтрации.
+
+rating — средняя оценка отзывов. Байесовская оценка
+weighted = (sum + m * C) / (count + m), где sum и count — сумма и
+количество оценок произведения, C — средняя оценка по всем отзывам,
+m — вес априорной оценки (WEIGHTED_RATING_MIN_VOTES). У произведения с
+одним отзывом оценка близка к средней по каталогу, а с ростом числа
+отзывов приближается к собственному среднему.
+
+Оба рейтинга считаются по сумме шардов счётчиков оценок
+TitleScoreCount. Для всех произведений они пересчитываются одним
+UPDATE, а при изменении отзыва — только для его произведения с
+сохранённым значением C.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (ExpressionWrapper, F, FloatField,
+                              IntegerField, OuterRef, Subquery, Sum, Value)
+
+from backend.models import Title
+from reviews.models import TitleScoreCount
+
+PRIOR_CACHE_KEY = 'weighted-rating-prior'
+
+
+def score_sum():
+    return Sum(ExpressionWrapper(
+        F('score') * F('count'), output_field=IntegerField()
+    ))
+
+
+def compute_prior():
+    """Средняя оценка по всем отзывам каталога."""
+    totals = TitleScoreCount.objects.aggregate(
+        score_sum=score_sum(), count=Sum('count')
+    )
+    if not totals['count']:
+        return None
+    prior = totals['score_sum'] / totals['count']
+    cache.set(PRIOR_CACHE_KEY, prior, settings.WEIGHTED_RATING_PRIOR_TTL)
+    return prior
+
+
+def get_prior():
+    prior = cache.get(PRIOR_CACHE_KEY)
+    if prior is None:
+        prior = compute_prior()
+    return prior
+
+
+def title_stats():
+    """Счётчики произведения из внешнего запроса, сгруппированные по нему.
+
+    Шарды счётчика могут быть отрицательными, поэтому отбрасываются
+    только произведения без отзывов в сумме.
+    """
+    return TitleScoreCount.objects.filter(
+        title=OuterRef('pk')
+    ).values('title').annotate(total=Sum('count')).filter(total__gt=0)
+
+
+def rating_expression():
+    """Подзапрос со средней оценкой для Title из внешнего запроса."""
+    stats = title_stats().annotate(
+        average=ExpressionWrapper(
+            score_sum() * Value(1.0) / Sum('count'),
+            output_field=FloatField()
+        )
+    ).values('average')
+    return Subquery(stats[:1], output_field=FloatField())
+
+
+def weighted_rating_expression(prior):
+    """Подзапрос со взвешенной оценкой для Title из внешнего запроса."""
+    weight = settings.WEIGHTED_RATING_MIN_VOTES
+    stats = title_stats().annotate(
+        weighted=ExpressionWrapper(
+            (score_sum() + Value(weight * prior))
+            / (Sum('count') + Value(float(weight))),
+            output_field=FloatField()
+        )
+    ).values('weighted')
+    return Subquery(stats[:1], output_field=FloatField())
+
+
+def update_title_ratings(title_ids=None, prior=None):
+    """Пересчитывает рейтинги всех или указанных произведений."""
+    prior = get_prior() if prior is None else prior
+    titles = Title.objects.all()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    if prior is None:
+        # Отзывов нет ни у одного произведения
+        return titles.update(rating=None, weighted_rating=None)
+    return titles.update(
+        rating=rating_expression(),
+        weighted_rating=weighted_rating_expression(prior),
+    )
+
+
+def recompute_ratings():
+    """Пакетный пересчёт: новое среднее C и рейтинги всех произведений."""
+    return update_title_ratings(prior=compute_prior())
@@ -0,0 +1,115 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from api.cache import TITLES, invalidate
+from backend.models import Category, Genre, Title
+from reviews import documents, leaderboard
+from reviews.counters import (after_commit, apply_comment_count_delta,
+                              move_score)
+from reviews.models import Comment, Review
+from reviews.ratings import update_title_ratings
+
+
+def refresh_rating_aggregates(title_ids):
+    """Обновляет рейтинги, зависящие от счётчиков оценок.
+
+    В транзакции пересчёт откладывается до её фиксации.
+    """
+    title_ids = list(title_ids)
+
+    def refresh():
+        leaderboard.refresh_titles(title_ids)
+        update_title_ratings(title_ids)
+        documents.refresh(title_ids)
+        invalidate(TITLES)
+
+    after_commit(refresh)
+
+
+@receiver(pre_save, sender=Review)
+def remember_saved_score(sender, instance, raw=False, **kwargs):
+    # Отзыв создан вручную с существующим pk: оценку берём из БД
+    if raw or instance.pk is None or hasattr(instance, 'saved_rating_score'):
+        return
+    saved = Review.objects.filter(pk=instance.pk).first()
+    instance.saved_rating_score = saved.rating_score if saved else None
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_score = None if created else getattr(
+        instance, 'saved_rating_score', None
+    )
+    move_score(instance.title_id, old_score, instance.rating_score)
+    if old_score != instance.rating_score:
+        refresh_rating_aggregates([instance.title_id])
+    else:
+        after_commit(lambda: documents.refresh([instance.title_id]))
+    instance.saved_rating_score = instance.rating_score
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    old_score = getattr(
+        instance, 'saved_rating_score', instance.rating_score
+    )
+    # Скрытые и мягко удалённые отзывы в рейтинге уже не учитываются
+    if old_score is None:
+        return
+    move_score(instance.title_id, old_score, None)
+    refresh_rating_aggregates([instance.title_id])
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count_on_create(sender, instance, created, raw=False,
+                                   **kwargs):
+    # Скрытие и удаление уменьшают счётчик в reviews.moderation, а
+    # окончательное удаление касается только уже удалённых комментариев
+    if created and not raw and not (instance.is_hidden or instance.is_deleted):
+        apply_comment_count_delta(instance.review_id, 1)
+        documents.refresh_reviews([instance.review_id])
+
+
+@receiver(post_save, sender=Title)
+def update_leaderboard_category(sender, instance, created, raw=False,
+                                **kwargs):
+    if not created and not raw:
+        leaderboard.update_title_category(instance)
+        documents.refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_documents_on_genres(sender, instance, action, reverse, pk_set,
+                                **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        documents.refresh([instance.pk])
+    elif pk_set:
+        # Изменены произведения жанра: pk_set — их id
+        documents.refresh(pk_set)
+
+
+@receiver(post_save, sender=Genre)
+def refresh_documents_on_genre(sender, instance, created, raw=False,
+                               **kwargs):
+    if not created and not raw:
+        documents.refresh(title__genre=instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def refresh_documents_on_category(sender, instance, created, raw=False,
+                                  **kwargs):
+    if not created and not raw:
+        documents.refresh(title__category=instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Title)
+@receiver([post_save, post_delete], sender=Genre)
+@receiver([post_save, post_delete], sender=Category)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_titles_cache(sender, **kwargs):
+    invalidate(TITLES)
@@ -0,0 +1,112 @@
+"""Нагрузочный тест: задержка запросов при множестве медленных клиентов.
+
+Скрипт открывает --slow соединений, которые передают запрос по одному
+байту с паузой, и параллельно шлёт обычные GET-запросы, замеряя их
+задержку. Запустите сервер и укажите его адрес, например:
+
+    gunicorn -w 4 -b 127.0.0.1:8000 api_yamdb.wsgi
+    uvicorn --workers 1 --port 8001 api_yamdb.asgi:application
+
+    python benchmarks/asgi_latency.py --port 8000
+    python benchmarks/asgi_latency.py --port 8001
+"""
+import argparse
+import asyncio
+import time
+
+from common import percentile
+
+PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/1/reviews/',
+    '/api/v1/titles/1/reviews/1/comments/',
+)
+
+
+def build_request(host, path):
+    return (
+        f'GET {path} HTTP/1.1\r\n'
+        f'Host: {host}\r\n'
+        'Connection: close\r\n\r\n'
+    ).encode()
+
+
+async def slow_client(host, port, delay, deadline):
+    """Передаёт запрос по байту, удерживая соединение до deadline."""
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            await asyncio.sleep(delay)
+            continue
+        try:
+            for byte in build_request(host, PATHS[0]):
+                if time.monotonic() >= deadline:
+                    break
+                writer.write(bytes([byte]))
+                await writer.drain()
+                await asyncio.sleep(delay)
+            await reader.read()
+        except OSError:
+            pass
+        finally:
+            writer.close()
+
+
+async def probe_client(host, port, deadline, latencies, errors):
+    """Последовательно шлёт обычные запросы и замеряет задержку."""
+    index = 0
+    while time.monotonic() < deadline:
+        path = PATHS[index % len(PATHS)]
+        index += 1
+        started = time.monotonic()
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(build_request(host, path))
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+        except OSError:
+            errors.append(path)
+            continue
+        if not response.startswith(b'HTTP/1.1 2'):
+            errors.append(path)
+        latencies.append((time.monotonic() - started) * 1000)
+
+
+async def run(args):
+    deadline = time.monotonic() + args.duration
+    latencies, errors = [], []
+    tasks = [
+        slow_client(args.host, args.port, args.delay, deadline)
+        for _ in range(args.slow)
+    ] + [
+        probe_client(args.host, args.port, deadline, latencies, errors)
+        for _ in range(args.probes)
+    ]
+    await asyncio.gather(*tasks)
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--slow', type=int, default=100,
+                        help='число медленных клиентов')
+    parser.add_argument('--probes', type=int, default=10,
+                        help='число клиентов, замеряющих задержку')
+    parser.add_argument('--delay', type=float, default=0.5,
+                        help='пауза между байтами медленного клиента, с')
+    parser.add_argument('--duration', type=float, default=30)
+    args = parser.parse_args()
+
+    latencies, errors = asyncio.run(run(args))
+    print(f'запросов: {len(latencies)}, ошибок: {len(errors)}, '
+          f'rps: {len(latencies) / args.duration:.1f}')
+    for percent in (50, 95, 99):
+        print(f'p{percent}: {percentile(latencies, percent):.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
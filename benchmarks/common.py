@@ -0,0 +1,37 @@
+"""Общие функции для скриптов замеров производительности."""
+import os
+import statistics
+import sys
+import timeit
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(BASE_DIR, 'api_yamdb')
+
+
+def add_project_to_path():
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+
+
+def setup_django(settings_module='api_yamdb.settings'):
+    """Подключает проект и инициализирует Django."""
+    add_project_to_path()
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+
+    import django
+    django.setup()
+
+
+def measure(func, repeat=5, number=10):
+    """Возвращает медиану времени одного вызова func в миллисекундах."""
+    timings = timeit.repeat(func, repeat=repeat, number=number)
+    return statistics.median(timings) / number * 1000
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = max(0, int(round(percent / 100 * len(ordered))) - 1)
+    return ordered[index]
@@ -0,0 +1,70 @@
+"""Замеры pytest-benchmark: сериализаторы, фильтры, рейтинги, импорт.
+
+Замеры не входят в функциональные тесты и запускаются отдельно на
+локальной тестовой SQLite-базе, заполненной генератором generate_data.
+Сохраните базовый прогон, а затем сравнивайте с ним: прогон падает,
+если среднее время любого замера выросло больше чем на
+--regression-threshold процентов (BENCHMARK_REGRESSION_THRESHOLD):
+
+    pytest benchmarks --benchmark-save=baseline
+    pytest benchmarks --benchmark-compare --regression-threshold=15
+"""
+import os
+from datetime import datetime, timezone
+
+import pytest
+from pytest_benchmark.utils import parse_compare_fail
+
+from common import BASE_DIR, add_project_to_path
+
+add_project_to_path()
+
+STORAGE = 'file://' + os.path.join(BASE_DIR, 'benchmarks', '.benchmarks')
+
+# Размер данных: тысячи произведений и десятки тысяч отзывов
+SIZES = {
+    'users': 1000, 'categories': 10, 'genres': 50, 'titles': 3000,
+    'reviews': 30000, 'comments': 30000,
+}
+END = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--regression-threshold', type=int,
+        default=int(os.getenv('BENCHMARK_REGRESSION_THRESHOLD', 10)),
+        help='допустимый рост среднего времени при --benchmark-compare, %%'
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Выполняется до настройки pytest-benchmark
+    option = config.option
+    if option.benchmark_storage == 'file://./.benchmarks':
+        option.benchmark_storage = STORAGE
+    if option.benchmark_compare and not option.benchmark_compare_fail:
+        option.benchmark_compare_fail = [
+            parse_compare_fail(f'mean:{option.regression_threshold}%')
+        ]
+
+
+@pytest.fixture(scope='session')
+def synthetic_data(django_db_setup, django_db_blocker):
+    """Синтетические данные, общие для всех замеров сессии."""
+    from backend.synthetic import SyntheticData, insert
+    from reviews.counters import rebuild_score_counts
+    from reviews.ratings import recompute_ratings
+
+    data = SyntheticData(seed=0, end=END, **SIZES)
+    with django_db_blocker.unblock():
+        for _ in insert(data):
+            pass
+        rebuild_score_counts()
+        recompute_ratings()
+    return data
+
+
+@pytest.fixture
+def db_data(synthetic_data, db):
+    return synthetic_data
@@ -0,0 +1,84 @@
+"""Скорость чтения review.csv: csv.DictReader и fastcsv по процессам.
+
+Файл генерируется generate_data-совместимым генератором, замеряется
+только разбор строк, без вставки в базу (её замеряет
+test_populatedb.py). Запуск:
+
+    python benchmarks/csv_reader.py --reviews 1000000 --workers 1 2 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import setup_django
+
+
+def best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--reviews', type=int, default=500000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from backend import fastcsv
+    from backend.importers import LineReader, read_rows
+    from backend.synthetic import SyntheticData, write_csv
+
+    with tempfile.TemporaryDirectory() as directory:
+        data = SyntheticData(
+            users=1000, titles=10000, reviews=args.reviews, comments=0
+        )
+        for _ in write_csv(data, directory):
+            pass
+        path = os.path.join(directory, 'review.csv')
+        size = os.path.getsize(path) / 1024 / 1024
+        print(f'review.csv: {args.reviews} rows, {size:.0f} MB')
+
+        def dict_reader():
+            with open(path, encoding='utf-8', newline='') as f:
+                return sum(1 for _ in read_rows(f))
+
+        def line_reader():
+            with open(path, 'rb') as f:
+                return sum(1 for _ in read_rows(LineReader(f)))
+
+        def fast_reader(workers):
+            _, start = fastcsv.read_header(path)
+            return sum(
+                len(rows)
+                for _, rows in fastcsv.read_ranges(path, start, workers)
+            )
+
+        readers = [
+            ('DictReader', dict_reader),
+            ('DictReader + offsets', line_reader),
+        ] + [
+            (f'fastcsv, {workers} proc', lambda workers=workers: (
+                fast_reader(workers)
+            ))
+            for workers in args.workers
+        ]
+        baseline = None
+        for label, reader in readers:
+            seconds = best_time(reader, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f'{label:<22} {seconds:7.2f} s  '
+                f'{args.reviews / seconds:10,.0f} rows/s  '
+                f'x{baseline / seconds:.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""Нагрузочный тест API v1 смешанной нагрузкой чтения и записи.
+
+Воркеры в отдельных потоках по keep-alive соединению шлют запросы,
+выбирая операцию по весам --mix. Произведения для чтения выбираются
+по закону Ципфа: популярные запрашиваются чаще. Отзывы для чтения
+комментариев и для новых комментариев берутся из уже прочитанных
+списков отзывов. Для записи нужны JWT-токены: они передаются через
+--token или выпускаются для --writers пользователей прямо из БД
+проекта (те же настройки окружения, что у сервера).
+
+Подготовка данных и запуск, например:
+
+    python api_yamdb/manage.py generate_data --titles 100000 \\
+        --users 50000 --reviews 2000000 --comments 5000000
+    gunicorn -w 4 -b 127.0.0.1:8000 api_yamdb.wsgi
+
+    python benchmarks/loadtest.py --titles 100000 --duration 60
+"""
+import argparse
+import http.client
+import itertools
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+
+from common import percentile, setup_django
+
+# Операция и её вес в нагрузке по умолчанию
+DEFAULT_MIX = (
+    'titles=35,title=20,reviews=20,comments=15,'
+    'review_create=5,comment_create=5'
+)
+WRITES = ('review_create', 'comment_create')
+
+TITLE_FILTERS = (
+    '', '?ordering=-rating', '?year_min=2000', '?genre=g1,g2',
+    '?category=c1&ordering=-year', '?rating_min=7',
+)
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, weight = item.split('=')
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def mint_tokens(count):
+    """Выпускает токены доступа для первых count пользователей."""
+    setup_django()
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from backend.models import User
+
+    return [
+        str(RefreshToken.for_user(user).access_token)
+        for user in User.objects.filter(role='user').order_by('pk')[:count]
+    ]
+
+
+class Workload:
+    """Общее состояние воркеров: веса, токены, найденные отзывы."""
+
+    def __init__(self, args, tokens):
+        self.args = args
+        self.tokens = tokens
+        self.mix = {
+            name: weight for name, weight in parse_mix(args.mix).items()
+            if tokens or name not in WRITES
+        }
+        self.titles = range(1, args.titles + 1)
+        self.title_weights = list(itertools.accumulate(
+            1 / rank ** args.exponent for rank in self.titles
+        ))
+        self.reviews = []
+        self.lock = threading.Lock()
+        self.results = defaultdict(list)
+
+    def title(self, rng):
+        return rng.choices(self.titles, cum_weights=self.title_weights)[0]
+
+    def review(self, rng):
+        with self.lock:
+            return rng.choice(self.reviews) if self.reviews else None
+
+    def remember(self, title_id, body):
+        try:
+            results = json.loads(body)['results']
+        except (ValueError, KeyError, TypeError):
+            return
+        with self.lock:
+            for review in results[:3]:
+                self.reviews.append((title_id, review['id']))
+            # Храним только последние отзывы
+            del self.reviews[:-10000]
+
+    def record(self, operation, latency, status):
+        with self.lock:
+            self.results[operation].append((latency, status))
+
+
+def request(connection, method, path, token=None, data=None):
+    headers = {}
+    body = None
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    if data is not None:
+        body = json.dumps(data)
+        headers['Content-Type'] = 'application/json'
+    connection.request(method, path, body=body, headers=headers)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+def operation(workload, name, rng, connection):
+    """Выполняет операцию name, возвращает статус ответа."""
+    prefix = '/api/v1/titles/'
+    if name == 'titles':
+        return request(
+            connection, 'GET', prefix + rng.choice(TITLE_FILTERS)
+        )[0]
+    if name == 'title':
+        return request(connection, 'GET', f'{prefix}{workload.title(rng)}/')[0]
+    if name == 'reviews':
+        title_id = workload.title(rng)
+        status, body = request(
+            connection, 'GET', f'{prefix}{title_id}/reviews/'
+        )
+        if status == 200:
+            workload.remember(title_id, body)
+        return status
+    token = rng.choice(workload.tokens) if workload.tokens else None
+    if name == 'review_create':
+        return request(
+            connection, 'POST', f'{prefix}{workload.title(rng)}/reviews/',
+            token, {'text': 'Нагрузочный тест', 'score': rng.randint(1, 10)}
+        )[0]
+    review = workload.review(rng)
+    if review is None:
+        return None
+    url = f'{prefix}{review[0]}/reviews/{review[1]}/comments/'
+    if name == 'comments':
+        return request(connection, 'GET', url)[0]
+    return request(
+        connection, 'POST', url, token, {'text': 'Нагрузочный тест'}
+    )[0]
+
+
+def worker(workload, index, deadline):
+    args = workload.args
+    rng = random.Random(f'{args.seed}:{index}')
+    names = list(workload.mix)
+    weights = list(workload.mix.values())
+    connection = http.client.HTTPConnection(args.host, args.port, timeout=30)
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        started = time.monotonic()
+        try:
+            status = operation(workload, name, rng, connection)
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection(
+                args.host, args.port, timeout=30
+            )
+            status = 0
+        if status is not None:
+            workload.record(
+                name, (time.monotonic() - started) * 1000, status
+            )
+    connection.close()
+
+
+def report(results, duration):
+    print(f'{"операция":<16}{"запросов":>9}{"rps":>9}{"4xx":>6}'
+          f'{"ошибок":>8}{"p50":>9}{"p95":>9}{"p99":>9}')
+    everything = []
+    for name, rows in sorted(results.items()):
+        everything.extend(rows)
+        print_row(name, rows, duration)
+    print_row('всего', everything, duration)
+
+
+def print_row(name, rows, duration):
+    latencies = [latency for latency, _ in rows]
+    rejected = sum(1 for _, status in rows if 400 <= status < 500)
+    errors = sum(1 for _, status in rows if not status or status >= 500)
+    print(f'{name:<16}{len(rows):>9}{len(rows) / duration:>9.1f}'
+          f'{rejected:>6}{errors:>8}'
+          + ''.join(
+              f'{percentile(latencies, percent):>9.1f}'
+              for percent in (50, 95, 99)
+          ))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=16,
+                        help='число параллельных клиентов')
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--titles', type=int, default=10000,
+                        help='id произведений для чтения: от 1 до --titles')
+    parser.add_argument('--exponent', type=float, default=1.1,
+                        help='показатель Ципфа популярности произведений')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help='веса операций: имя=вес через запятую')
+    parser.add_argument('--token', action='append', default=[],
+                        help='JWT-токен для записи, можно несколько')
+    parser.add_argument('--writers', type=int, default=20,
+                        help='выпустить токены для стольких пользователей')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tokens = args.token or (mint_tokens(args.writers) if args.writers else [])
+    workload = Workload(args, tokens)
+    if not tokens:
+        print('токенов нет, операции записи пропущены')
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(workload, index, deadline))
+        for index in range(args.workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report(workload.results, args.duration)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Сравнение времени рендеринга страницы из 1000 произведений.
+
+Запуск: python benchmarks/render_json.py [--titles 1000]
+"""
+import argparse
+from collections import OrderedDict
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from common import measure, setup_django
+
+
+def build_page(size):
+    """Страница в формате ответа TitleViewSet.list."""
+    genres = [
+        OrderedDict(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(20)
+    ]
+    results = [
+        OrderedDict(
+            id=pk,
+            genre=genres[pk % 20:pk % 20 + 3],
+            category=OrderedDict(name='Фильм', slug='films'),
+            rating=pk % 10 + 1,
+            name=f'Произведение №{pk}',
+            year=1900 + pk % 120,
+            description='Описание произведения ' * 5,
+        )
+        for pk in range(size, 0, -1)
+    ]
+    return OrderedDict(
+        count=size, next=None, previous=None, results=results
+    )
+
+
+def build_raw_page(size):
+    """Страница с «сырыми» datetime и Decimal без сериализатора."""
+    moment = datetime(2021, 8, 16, 18, 56, tzinfo=timezone.utc)
+    return [
+        {'id': pk, 'pub_date': moment, 'score': Decimal('7.5')}
+        for pk in range(size)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from api.renderers import ORJSONRenderer, orjson
+
+    if orjson is None:
+        print('orjson не установлен: ORJSONRenderer использует json')
+
+    for label, data in (
+        ('titles page', build_page(args.titles)),
+        ('datetime/Decimal', build_raw_page(args.titles)),
+    ):
+        stdlib = measure(lambda: JSONRenderer().render(data))
+        fast = measure(lambda: ORJSONRenderer().render(data))
+        print(
+            f'{label:<18} json: {stdlib:8.3f} ms  '
+            f'orjson: {fast:8.3f} ms  x{stdlib / fast:.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
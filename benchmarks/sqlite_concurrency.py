@@ -0,0 +1,117 @@
+"""Пропускная способность SQLite при параллельных чтении и записи.
+
+Сравнивает настройки по умолчанию (rollback journal) и профиль
+production из api_yamdb/databases.py (WAL, synchronous=NORMAL, mmap).
+
+Запуск: python benchmarks/sqlite_concurrency.py [--readers 8]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from common import add_project_to_path
+
+
+def prepare(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        'CREATE TABLE review (id INTEGER PRIMARY KEY, title_id INTEGER, '
+        'score INTEGER, text TEXT)'
+    )
+    conn.execute('CREATE INDEX review_title ON review (title_id)')
+    conn.executemany(
+        'INSERT INTO review (title_id, score, text) VALUES (?, ?, ?)',
+        ((i % 1000, i % 10 + 1, 'text' * 20) for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def connect(path, pragmas, timeout):
+    conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+    for name, value in pragmas.items():
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
+
+
+def reader(path, pragmas, deadline, counters):
+    conn = connect(path, pragmas, timeout=5)
+    title_id = 0
+    while time.monotonic() < deadline:
+        title_id = (title_id + 7) % 1000
+        try:
+            conn.execute(
+                'SELECT AVG(score) FROM review WHERE title_id = ?',
+                (title_id,)
+            ).fetchone()
+            counters['reads'] += 1
+        except sqlite3.OperationalError:
+            counters['errors'] += 1
+    conn.close()
+
+
+def writer(path, pragmas, deadline, counters):
+    conn = connect(path, pragmas, timeout=5)
+    while time.monotonic() < deadline:
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT INTO review (title_id, score, text) '
+                    'VALUES (?, ?, ?)', (counters['writes'] % 1000, 5, 'new')
+                )
+            counters['writes'] += 1
+        except sqlite3.OperationalError:
+            counters['errors'] += 1
+    conn.close()
+
+
+def run(pragmas, args):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.sqlite3')
+        prepare(path, args.rows)
+        counters = {'reads': 0, 'writes': 0, 'errors': 0}
+        deadline = time.monotonic() + args.duration
+        threads = [
+            threading.Thread(
+                target=reader, args=(path, pragmas, deadline, counters)
+            ) for _ in range(args.readers)
+        ] + [
+            threading.Thread(
+                target=writer, args=(path, pragmas, deadline, counters)
+            ) for _ in range(args.writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return counters
+
+
+def main():
+    add_project_to_path()
+    from api_yamdb.databases import SQLITE_PRODUCTION_PRAGMAS
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--duration', type=float, default=10)
+    args = parser.parse_args()
+
+    for label, pragmas in (
+        ('default', {}),
+        ('production', SQLITE_PRODUCTION_PRAGMAS),
+    ):
+        counters = run(pragmas, args)
+        print(
+            f'{label:<11} reads/s: {counters["reads"] / args.duration:9.1f}  '
+            f'writes/s: {counters["writes"] / args.duration:8.1f}  '
+            f'errors: {counters["errors"]}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Импорт CSV-файлов командой populatedb."""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+# Небольшой набор: populatedb создаёт строки по одной
+SIZES = {
+    'users': 100, 'categories': 5, 'genres': 10, 'titles': 100,
+    'reviews': 500, 'comments': 500,
+}
+
+
+class Importer:
+    """CSV-файлы с id после синтетических данных и их загрузка."""
+
+    def __init__(self, directory):
+        from backend.synthetic import SyntheticData, next_ids, write_csv
+
+        from conftest import END
+
+        self.directory = directory
+        self.first_ids = next_ids()
+        self.data = SyntheticData(
+            seed=1, end=END, first_ids=self.first_ids, **SIZES
+        )
+        self.files = [file_name for file_name, _ in write_csv(
+            self.data, directory
+        )]
+
+    def load(self, file_name, fast=False):
+        call_command(
+            'populatedb', str(self.directory / file_name), fast=fast,
+            stdout=StringIO()
+        )
+
+    def clean(self):
+        from backend.models import Category, Genre, Title, User
+        from reviews.models import Comment, Review
+
+        for model, name in (
+            (Comment, 'comments'), (Review, 'reviews'),
+            (Title.genre.through, 'genre_titles'), (Title, 'titles'),
+            (Genre, 'genres'), (Category, 'categories'), (User, 'users'),
+        ):
+            model.objects.filter(pk__gte=self.first_ids[name]).delete()
+
+
+@pytest.fixture
+def importer(db_data, tmp_path):
+    return Importer(tmp_path)
+
+
+@pytest.mark.parametrize('file_name', [
+    'users.csv', 'category.csv', 'genre.csv', 'titles.csv',
+    'genre_title.csv', 'review.csv', 'comments.csv',
+])
+@pytest.mark.parametrize('fast', [False, True], ids=['csv', 'fast'])
+def test_populatedb(benchmark, importer, file_name, fast):
+    position = importer.files.index(file_name)
+
+    def setup():
+        # Не замеряется: чистая база и загруженные зависимости файла
+        importer.clean()
+        for name in importer.files[:position]:
+            importer.load(name)
+
+    benchmark.pedantic(
+        importer.load, args=(file_name, fast), setup=setup, rounds=3
+    )
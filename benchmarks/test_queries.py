@@ -0,0 +1,60 @@
+"""Запросы списка произведений с фильтрами и пересчёт рейтингов."""
+import pytest
+
+PAGE = 10
+
+FILTERS = {
+    'none': {},
+    'category': {'category': 'c1'},
+    'genre_or': {'genre': 'g1,g2'},
+    'genre_and': {'genre': 'g1,g2', 'genre_mode': 'and'},
+    'year_range': {'year_min': 2000, 'year_max': 2010},
+    'rating_min': {'rating_min': 7},
+    'category_rating': {'category': 'c1', 'ordering': '-rating'},
+    'weighted_rating': {'ordering': '-weighted_rating'},
+    'name': {'name': 'фильм'},
+}
+
+
+@pytest.mark.parametrize('params', FILTERS.values(), ids=list(FILTERS))
+def test_title_filter(benchmark, db_data, params):
+    from api.filters import TitleFilter
+    from backend.models import Title
+
+    def run():
+        queryset = TitleFilter(
+            params, queryset=Title.objects.alive().order_by('-id')
+        ).qs
+        return list(queryset[:PAGE])
+
+    assert len(benchmark(run)) <= PAGE
+
+
+def test_rating_annotation(benchmark, db_data):
+    """Средняя оценка, вычисляемая в запросе, для страницы произведений.
+
+    Раньше TitleViewSet считал её аннотацией на каждый запрос, теперь
+    рейтинг хранится в Title; замер показывает цену живого расчёта.
+    """
+    from backend.models import Title
+    from reviews.ratings import rating_expression
+
+    page = benchmark(lambda: list(
+        Title.objects.alive().annotate(
+            live_rating=rating_expression()
+        ).values_list('pk', 'live_rating')[:PAGE]
+    ))
+    assert len(page) == PAGE
+
+
+def test_update_title_ratings(benchmark, db_data):
+    from reviews.ratings import update_title_ratings
+
+    title_id = db_data.review_counts.index(max(db_data.review_counts)) + 1
+    assert benchmark(update_title_ratings, [title_id]) == 1
+
+
+def test_recompute_ratings(benchmark, db_data):
+    from reviews.ratings import recompute_ratings
+
+    assert benchmark(recompute_ratings) == len(db_data.review_counts)
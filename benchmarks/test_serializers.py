@@ -0,0 +1,44 @@
+"""Сериализация страницы произведений и проверка нового отзыва."""
+from types import SimpleNamespace
+
+import pytest
+
+PAGE_SIZES = (100, 1000)
+
+
+@pytest.mark.parametrize('size', PAGE_SIZES)
+def test_title_read_serializer(benchmark, db_data, size):
+    from api.serializers import TitleReadSerializer
+    from backend.models import Title
+
+    # Страница загружена заранее: замеряется только сериализатор
+    page = list(
+        Title.objects.alive().select_related('category').prefetch_related(
+            'genre'
+        )[:size]
+    )
+    data = benchmark(lambda: TitleReadSerializer(page, many=True).data)
+    assert len(data) == size
+
+
+@pytest.mark.parametrize('size', PAGE_SIZES)
+def test_title_list_view(benchmark, db_data, client, size):
+    response = benchmark(client.get, f'/api/v1/titles/?limit={size}')
+    assert response.status_code == 200
+    assert len(response.json()['results']) == size
+
+
+def test_review_serializer_validate(benchmark, db_data, rf):
+    from api.serializers import ReviewSerializer
+    from backend.models import User
+
+    request = rf.post('/')
+    request.user = User.objects.create(username='bench', email='b@b.fake')
+    # Самое популярное произведение: больше всего строк для exists()
+    title_id = db_data.review_counts.index(max(db_data.review_counts)) + 1
+    serializer = ReviewSerializer(context={
+        'request': request,
+        'view': SimpleNamespace(kwargs={'title_id': title_id}),
+    })
+    attrs = {'text': 'Замер', 'score': 7}
+    assert benchmark(serializer.validate, attrs) == attrs
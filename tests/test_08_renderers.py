@@ -0,0 +1,54 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+
+class Test08Renderers:
+
+    def test_01_orjson_renderer_matches_stdlib(self):
+        from rest_framework.renderers import JSONRenderer
+
+        from api.renderers import ORJSONRenderer
+
+        data = {
+            'results': [{'name': 'Поворот туда', 'rating': None}],
+            'score': Decimal('7.5'),
+            'text': 'line break',
+        }
+        fast = ORJSONRenderer().render(data)
+        assert json.loads(fast) == json.loads(JSONRenderer().render(data)), (
+            'Проверьте, что ORJSONRenderer возвращает тот же JSON, '
+            'что и стандартный JSONRenderer'
+        )
+        assert b'\\u2028' in fast, (
+            'Проверьте, что ORJSONRenderer экранирует символ U+2028'
+        )
+
+    def test_02_orjson_renderer_datetime(self):
+        from api.renderers import ORJSONRenderer
+
+        moment = datetime(2021, 8, 16, 18, 56, tzinfo=timezone.utc)
+        assert ORJSONRenderer().render({'pub_date': moment}) == (
+            b'{"pub_date":"2021-08-16T18:56:00Z"}'
+        ), 'Проверьте, что ORJSONRenderer сериализует datetime в UTC c `Z`'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_json_body_parsed(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/',
+            data=json.dumps({'name': 'Фильм', 'slug': 'films'}),
+            content_type='application/json'
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что POST запрос с JSON-телом обрабатывается'
+        )
+        response = admin_client.post(
+            '/api/v1/categories/',
+            data='{"name": ',
+            content_type='application/json'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что некорректный JSON возвращает статус 400'
+        )
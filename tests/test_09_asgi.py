@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+from .common import create_titles
+
+
+def call_asgi(path, method='GET', body=b'', headers=()):
+    from api_yamdb.asgi import application
+
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': b'',
+        'headers': [(name.encode(), value.encode()) for name, value in headers],
+    }
+    chunks = [body[:3], body[3:]]
+    messages = []
+
+    async def receive():
+        chunk = chunks.pop(0)
+        return {'type': 'http.request', 'body': chunk, 'more_body': bool(chunks)}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    status = messages[0]['status']
+    content = b''.join(m.get('body', b'') for m in messages[1:])
+    return status, content
+
+
+class Test09ASGI:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_asgi_list(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        status, content = call_asgi('/api/v1/titles/')
+        assert status == 200, (
+            'Проверьте, что GET запрос `/api/v1/titles/` через ASGI возвращает статус 200'
+        )
+        assert json.loads(content)['count'] == len(titles), (
+            'Проверьте, что через ASGI возвращается список произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_asgi_post_chunked_body(self, token_admin):
+        body = json.dumps({'name': 'Фильм', 'slug': 'films'}).encode()
+        status, _ = call_asgi(
+            '/api/v1/categories/', method='POST', body=body,
+            headers=(
+                ('content-type', 'application/json'),
+                ('authorization', f'Bearer {token_admin["access"]}'),
+            )
+        )
+        assert status == 201, (
+            'Проверьте, что тело запроса, переданное частями без '
+            'Content-Length, доходит до view через ASGI'
+        )
+
+    def test_03_lifespan_shutdown(self):
+        import time
+
+        from api_yamdb.asgi_handler import ThreadPoolASGIHandler
+
+        handler = ThreadPoolASGIHandler(lambda environ, start: [], 1)
+        handler.executor.submit(time.sleep, 0.3)
+        messages = [{'type': 'lifespan.startup'},
+                    {'type': 'lifespan.shutdown'}]
+        sent = []
+        ticks = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        async def tick():
+            while 'lifespan.shutdown.complete' not in sent:
+                ticks.append(1)
+                await asyncio.sleep(0.05)
+
+        async def main():
+            await asyncio.gather(
+                handler({'type': 'lifespan'}, receive, send), tick()
+            )
+
+        asyncio.run(main())
+        assert sent == [
+            'lifespan.startup.complete', 'lifespan.shutdown.complete'
+        ]
+        assert len(ticks) > 2, (
+            'Проверьте, что остановка пула не блокирует событийный цикл'
+        )
@@ -0,0 +1,81 @@
+from django.test import RequestFactory
+
+REPLICAS = {'replica_1': 1}
+
+
+def run_middleware(request, write=False):
+    from api.middleware import ReplicaRoutingMiddleware
+    from api.routers import ReplicaRouter
+
+    router = ReplicaRouter()
+    used = []
+
+    def get_response(request):
+        used.append(router.db_for_read(None))
+        if write:
+            router.db_for_write(None)
+            used.append(router.db_for_read(None))
+        return None
+
+    ReplicaRoutingMiddleware(get_response)(request)
+    return used
+
+
+class Test11Replicas:
+
+    def test_01_safe_requests_use_replicas(self, settings):
+        settings.DATABASE_REPLICAS = REPLICAS
+        request = RequestFactory().get('/api/v1/titles/')
+        assert run_middleware(request) == ['replica_1'], (
+            'Проверьте, что GET запрос к API v1 читает из реплики'
+        )
+        request = RequestFactory().get('/admin/')
+        assert run_middleware(request) == ['default'], (
+            'Проверьте, что запросы вне API v1 читают из основной БД'
+        )
+
+    def test_02_reads_after_write_use_primary(self, settings):
+        from django.core.cache import cache
+
+        settings.DATABASE_REPLICAS = REPLICAS
+
+        cache.clear()
+        factory = RequestFactory(HTTP_AUTHORIZATION='Bearer writer')
+        used = run_middleware(factory.post('/api/v1/titles/'), write=True)
+        assert used == ['default', 'default'], (
+            'Проверьте, что небезопасные запросы и чтение после записи '
+            'выполняются в основной БД'
+        )
+        assert run_middleware(factory.get('/api/v1/titles/')) == ['default'], (
+            'Проверьте, что после записи чтение клиента остаётся в основной БД'
+        )
+        other = RequestFactory(HTTP_AUTHORIZATION='Bearer reader')
+        assert run_middleware(other.get('/api/v1/titles/')) == ['replica_1'], (
+            'Проверьте, что окно «липкости» действует только для автора записи'
+        )
+
+    def test_03_replica_weights(self, settings):
+        from api.routers import ReplicaRouter, replica_reads
+
+        settings.DATABASE_REPLICAS = {'replica_1': 1, 'replica_2': 0}
+        router = ReplicaRouter()
+        used = set()
+        for _ in range(50):
+            with replica_reads(True):
+                used.add(router.db_for_read(None))
+        assert used == {'replica_1'}, (
+            'Проверьте, что реплики выбираются с учётом весов'
+        )
+
+    def test_04_one_replica_per_request(self, settings):
+        from api.routers import ReplicaRouter, replica_reads
+
+        settings.DATABASE_REPLICAS = {'replica_1': 1, 'replica_2': 1}
+        router = ReplicaRouter()
+        for _ in range(20):
+            with replica_reads(True):
+                used = {router.db_for_read(None) for _ in range(20)}
+            assert len(used) == 1, (
+                'Проверьте, что все чтения одного запроса идут в одну '
+                'реплику'
+            )
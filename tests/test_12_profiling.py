@@ -0,0 +1,41 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test12Profiling:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_disabled_by_default(self, client):
+        response = client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что без API_PROFILING заголовок Server-Timing не выставляется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_server_timing(self, settings, admin_client, user_client):
+        settings.API_PROFILING = True
+        create_titles(admin_client)
+        response = admin_client.get('/api/v1/titles/')
+        timing = response['Server-Timing']
+        for metric in ('sql;dur=', 'serializer;dur=', 'render;dur=',
+                       'filter;dur=', 'total;dur='):
+            assert metric in timing, (
+                f'Проверьте, что заголовок Server-Timing содержит `{metric}`'
+            )
+
+        response = admin_client.get('/api/v1/profiling/')
+        assert response.status_code == 200, (
+            'Проверьте, что сводка профилирования доступна администратору'
+        )
+        views = {view['view']: view for view in response.json()['views']}
+        assert views['title-list']['avg_queries'] > 0, (
+            'Проверьте, что сводка учитывает SQL-запросы по view'
+        )
+        assert response.json()['slowest_queries'][0]['origin'], (
+            'Проверьте, что для медленных запросов указано место вызова'
+        )
+        response = user_client.get('/api/v1/profiling/')
+        assert response.status_code == 403, (
+            'Проверьте, что сводка профилирования недоступна пользователю'
+        )
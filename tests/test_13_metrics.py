@@ -0,0 +1,90 @@
+import re
+
+import pytest
+
+from .common import create_titles
+
+
+def get_metric(text, name, **labels):
+    for line in text.splitlines():
+        if not line.startswith(name + '{'):
+            continue
+        if all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+class Test13Metrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_metrics_endpoint(self, client, admin_client):
+        create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        response = client.get('/metrics')
+        assert response.status_code == 200, (
+            'Проверьте, что `/metrics` доступен без авторизации'
+        )
+        assert response['Content-Type'].startswith('text/plain'), (
+            'Проверьте, что `/metrics` отдаёт текстовый формат Prometheus'
+        )
+        text = response.content.decode()
+        assert get_metric(
+            text, 'yamdb_http_requests_total',
+            view='TitleViewSet', action='list', status='200'
+        ) >= 1, 'Проверьте, что считаются запросы к TitleViewSet.list'
+        assert get_metric(
+            text, 'yamdb_http_requests_total',
+            view='TitleViewSet', action='create', method='POST'
+        ) >= 2, 'Проверьте, что считаются запросы к TitleViewSet.create'
+        assert get_metric(
+            text, 'yamdb_db_queries_total',
+            view='TitleViewSet', action='list'
+        ) >= 1, 'Проверьте, что считаются SQL-запросы по действиям'
+        assert re.search(
+            r'yamdb_http_request_duration_seconds_bucket\{view="TitleViewSet",'
+            r'action="list",le="\+Inf"\} \d+', text
+        ), 'Проверьте, что задержка выводится гистограммой'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_multiprocess_mode(self, client, settings, tmpdir):
+        settings.METRICS_MULTIPROC_DIR = str(tmpdir)
+        client.get('/api/v1/categories/')
+        tmpdir.join('metrics-1.json').write(
+            '[{"view": "ForkedWorkerViewSet", "action": "list", '
+            '"responses": [["GET", 200, 5]], "buckets": [5, 0, 0, 0, 0, 0, '
+            '0, 0, 0, 0, 0, 0], "duration_sum": 0.01, "queries": 5, '
+            '"query_duration": 0.001, "errors": 0}]'
+        )
+        text = client.get('/metrics').content.decode()
+        assert get_metric(
+            text, 'yamdb_http_requests_total',
+            view='ForkedWorkerViewSet', action='list'
+        ) == 5, 'Проверьте, что /metrics суммирует метрики всех процессов'
+        assert get_metric(
+            text, 'yamdb_http_requests_total', view='CategoryViewSet'
+        ) >= 1, 'Проверьте, что процесс сохраняет свои метрики в каталог'
+
+    def test_03_finished_threads(self):
+        import threading
+
+        from api import metrics
+
+        def request():
+            metrics.observe('ThreadViewSet', 'list', 'GET', 200, 0.01, 1,
+                            0.001)
+
+        before = metrics.collect().get(('ThreadViewSet', 'list'))
+        count = before['responses'][('GET', 200)] if before else 0
+        for _ in range(20):
+            thread = threading.Thread(target=request)
+            thread.start()
+            thread.join()
+        snapshot = metrics.collect()
+        assert snapshot[('ThreadViewSet', 'list')]['responses'][
+            ('GET', 200)
+        ] == count + 20, (
+            'Проверьте, что метрики завершившихся потоков сохраняются'
+        )
+        assert not any(
+            not thread.is_alive() for thread in metrics._stores
+        ), 'Проверьте, что хранилища завершившихся потоков не копятся'
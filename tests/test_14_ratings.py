@@ -0,0 +1,57 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+class Test14Ratings:
+
+    def get_ratings(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/ratings/')
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/titles/{title_id}/ratings/` '
+            'без токена авторизации возвращает статус 200'
+        )
+        return response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_ratings(self, client, admin_client, admin):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        data = self.get_ratings(client, titles[0]['id'])
+        assert data['count'] == 3
+        assert data['mean'] == 4 and data['median'] == 4, (
+            'Проверьте, что возвращаются среднее и медиана оценок'
+        )
+        assert data['distribution'] == {
+            '1': 0, '2': 0, '3': 1, '4': 1, '5': 1,
+            '6': 0, '7': 0, '8': 0, '9': 0, '10': 0
+        }, 'Проверьте, что возвращается количество отзывов по каждой оценке'
+        assert self.get_ratings(client, titles[1]['id'])['median'] is None
+
+        auth_client(user).patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'score': 10}
+        )
+        admin_client.delete(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        data = self.get_ratings(client, titles[0]['id'])
+        assert data['count'] == 2 and data['median'] == 7, (
+            'Проверьте, что счётчики обновляются при изменении и удалении отзывов'
+        )
+        assert data['distribution']['3'] == 0
+        assert data['distribution']['10'] == 1
+
+        response = client.get('/api/v1/titles/100500/ratings/')
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_command(self, client, admin_client, admin):
+        from reviews.models import TitleScoreCount
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        TitleScoreCount.objects.all().delete()
+        call_command('rebuild_score_counts')
+        assert self.get_ratings(client, titles[0]['id'])['count'] == 3, (
+            'Проверьте, что команда rebuild_score_counts восстанавливает счётчики'
+        )
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from .common import create_reviews
+
+
+class Test15TopTitles:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_top_titles(self, client, admin_client, admin):
+        from reviews.models import Review
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Review.objects.create(
+            title_id=titles[1]['id'], author=admin, text='Отлично', score=9
+        )
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/titles/top/` '
+            'без токена авторизации возвращает статус 200'
+        )
+        results = response.json()['results']
+        assert [item['title']['id'] for item in results] == [
+            titles[1]['id'], titles[0]['id']
+        ], 'Проверьте, что произведения упорядочены по рейтингу'
+        assert results[1]['rating'] == 4 and results[1]['review_count'] == 3
+
+        response = client.get('/api/v1/titles/top/?category=films&limit=5')
+        assert [item['title']['id'] for item in response.json()['results']] == [
+            titles[0]['id']
+        ], 'Проверьте фильтрацию списка лучших произведений по категории'
+        response = client.get('/api/v1/titles/top/?genre=drama')
+        assert [item['title']['id'] for item in response.json()['results']] == [
+            titles[1]['id']
+        ], 'Проверьте фильтрацию списка лучших произведений по жанру'
+        response = client.get('/api/v1/titles/top/?window=1y')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_time_windows(self, client, admin_client, admin):
+        from reviews.models import Review
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Review.objects.filter(title_id=titles[0]['id']).update(
+            pub_date=timezone.now() - timedelta(days=10)
+        )
+        call_command('refresh_leaderboard')
+        response = client.get('/api/v1/titles/top/?window=7d')
+        assert response.json()['results'] == [], (
+            'Проверьте, что в окно 7 дней не попадают старые отзывы'
+        )
+        response = client.get('/api/v1/titles/top/?window=30d')
+        assert len(response.json()['results']) == 1
@@ -0,0 +1,56 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from .common import create_reviews
+
+
+class Test16WeightedRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_weighted_rating(self, client, admin_client, admin, settings):
+        from reviews.models import Review
+
+        settings.WEIGHTED_RATING_MIN_VOTES = 2
+        cache.clear()
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        review = Review.objects.create(
+            title_id=titles[1]['id'], author=admin, text='Шедевр', score=10
+        )
+        call_command('recompute_ratings')
+
+        # Средняя по каталогу (5 + 3 + 4 + 10) / 4 = 5.5
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['weighted_rating'] == pytest.approx(
+            (12 + 2 * 5.5) / (3 + 2)
+        ), 'Проверьте, что возвращается байесовская оценка произведения'
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.json()['weighted_rating'] == pytest.approx(
+            (10 + 2 * 5.5) / (1 + 2)
+        )
+
+        response = client.get('/api/v1/titles/?ordering=-weighted_rating')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id'], titles[0]['id']
+        ], 'Проверьте сортировку произведений по байесовской оценке'
+        response = client.get('/api/v1/titles/?weighted_rating_min=5')
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id']
+        ], 'Проверьте фильтрацию произведений по байесовской оценке'
+
+        review.delete()
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.json()['weighted_rating'] is None, (
+            'Проверьте, что оценка обновляется при изменении отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_weighted_rating_read_only(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            data={'weighted_rating': 10}
+        )
+        assert response.json()['weighted_rating'] != 10, (
+            'Проверьте, что байесовскую оценку нельзя изменить через API'
+        )
@@ -0,0 +1,146 @@
+import re
+
+import pytest
+from django.http import QueryDict
+
+from .common import create_reviews
+
+# Полный просмотр таблицы произведений без индекса
+FULL_SCAN = re.compile(r'SCAN (TABLE )?backend_title(?! USING)')
+
+# Комбинации параметров, которые должны обслуживаться индексами.
+# Поиск по подстроке названия (name) индекс B-tree не ускоряет, поэтому
+# он проверяется только вместе с другими условиями.
+FILTER_COMBINATIONS = (
+    'year=2000',
+    'year_min=2020',
+    'year_max=1910',
+    'year_min=1990&year_max=2000',
+    'rating_min=9.5',
+    'rating_max=1.5',
+    'rating_min=3&rating_max=3.5',
+    'weighted_rating_min=9.5',
+    'category=films',
+    'genre=drama',
+    'genre=horror,comedy',
+    'genre=horror,comedy&genre_mode=and',
+    'ordering=year',
+    'ordering=-year',
+    'ordering=name',
+    'ordering=-rating',
+    'ordering=-weighted_rating',
+    'category=films&year_min=1990',
+    'category=films&rating_min=5',
+    'category=films&ordering=-year',
+    'category=films&ordering=-rating',
+    'category=films&ordering=name',
+    'genre=drama&ordering=-rating',
+    'genre=horror,comedy&genre_mode=and&ordering=year',
+    'year_min=2020&rating_min=9.5',
+    'year_min=1990&ordering=-rating',
+    'rating_min=5&ordering=name',
+    'name=про&year_min=2020',
+    'name=про&category=films',
+    'name=про&ordering=name',
+    'category=films&genre=drama&year_min=1990&rating_min=5&ordering=-year',
+)
+
+
+class Test17TitleFilters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_filters(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        first, second = titles[0]['id'], titles[1]['id']
+
+        def ids(query):
+            response = client.get(f'/api/v1/titles/?{query}')
+            assert response.status_code == 200, (
+                f'Проверьте, что `/api/v1/titles/?{query}` '
+                'возвращает статус 200'
+            )
+            return [title['id'] for title in response.json()['results']]
+
+        assert ids('year_min=2010') == [second], (
+            'Проверьте фильтрацию произведений по `year_min`'
+        )
+        assert ids('year_max=2010') == [first], (
+            'Проверьте фильтрацию произведений по `year_max`'
+        )
+        assert ids('year_min=1990&year_max=2030') == [second, first]
+        assert ids('rating_min=4') == [first], (
+            'Проверьте фильтрацию произведений по `rating_min`'
+        )
+        assert ids('rating_max=3') == [], (
+            'Проверьте фильтрацию произведений по `rating_max`'
+        )
+        assert ids('genre=horror,drama') == [second, first], (
+            'Проверьте, что несколько жанров по умолчанию объединяются по ИЛИ'
+        )
+        assert ids('genre=horror,comedy&genre_mode=and') == [first], (
+            'Проверьте, что `genre_mode=and` оставляет произведения '
+            'со всеми указанными жанрами'
+        )
+        assert ids('genre=horror,drama&genre_mode=and') == []
+        assert ids('genre=drama') == [second]
+        assert ids('ordering=year') == [first, second], (
+            'Проверьте сортировку произведений по году'
+        )
+        assert ids('ordering=-year') == [second, first]
+        assert ids('ordering=name') == [first, second], (
+            'Проверьте сортировку произведений по названию'
+        )
+        assert ids('ordering=-rating') == [first, second], (
+            'Проверьте сортировку произведений по рейтингу'
+        )
+
+        response = client.get(f'/api/v1/titles/{first}/')
+        assert response.json()['rating'] == 4, (
+            'Проверьте, что возвращается средняя оценка произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_filters_use_indexes(self):
+        from django.db import connection
+
+        from api.filters import TitleFilter
+        from backend.models import Category, Genre, Title
+
+        # Планировщик выбирает индекс по статистике ANALYZE, поэтому
+        # каталог заполняется данными с правдоподобным распределением
+        categories = [
+            Category.objects.create(name='Фильм', slug='films'),
+            Category.objects.create(name='Книги', slug='books'),
+        ]
+        genres = [
+            Genre.objects.create(name=name, slug=slug)
+            for name, slug in (
+                ('Ужасы', 'horror'), ('Комедия', 'comedy'), ('Драма', 'drama')
+            )
+        ]
+        Title.objects.bulk_create(
+            Title(
+                name=f'Произведение {index}',
+                year=1900 + index % 125,
+                category=categories[index % 2],
+                rating=1 + index % 91 / 10,
+                weighted_rating=1 + index % 89 / 10,
+            )
+            for index in range(3000)
+        )
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title_id, genre=genres[title_id % 3])
+            for title_id in Title.objects.values_list('id', flat=True)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        titles = Title.objects.alive().order_by('-id')
+        for query in FILTER_COMBINATIONS:
+            filterset = TitleFilter(QueryDict(query), queryset=titles)
+            assert filterset.is_valid(), query
+            plan = filterset.qs.explain()
+            assert not FULL_SCAN.search(plan), (
+                f'Проверьте, что фильтр `{query}` выполняется по индексу, '
+                f'а не полным просмотром таблицы:\n{plan}'
+            )
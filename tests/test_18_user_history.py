@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_comments
+
+
+class Test18UserHistory:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_user_reviews(self, client, admin_client, admin):
+        from reviews.models import Review
+
+        _, reviews, titles, user, _ = create_comments(admin_client, admin)
+        Review.objects.create(
+            title_id=titles[1]['id'], author=user, text='Вторая', score=8
+        )
+        url = f'/api/v1/users/{user.username}/reviews/'
+        response = client.get(url)
+        assert response.status_code == 401, (
+            f'Проверьте, что `{url}` недоступен без токена авторизации'
+        )
+
+        user_client = auth_client(user)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что `{url}` возвращает статус 200'
+        )
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if 'reviews_review' in query['sql']
+        ]
+        assert len(queries) == 1, (
+            'Проверьте, что страница истории отзывов читается одним запросом'
+        )
+        data = response.json()
+        assert [item['text'] for item in data['results']] == [
+            'Вторая', 'qwerty123'
+        ], 'Проверьте, что отзывы пользователя отсортированы от новых'
+        assert data['results'][0]['title'] == {
+            'id': titles[1]['id'], 'name': titles[1]['name']
+        }, 'Проверьте, что у отзыва в истории указано произведение'
+        assert data['previous'] is None and data['next'] is None
+        assert 'count' not in data, (
+            'Проверьте, что история использует пагинацию по курсору'
+        )
+
+        response = user_client.get('/api/v1/users/unknown/reviews/')
+        assert response.status_code == 404, (
+            'Проверьте, что для несуществующего пользователя '
+            'возвращается статус 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_user_comments(self, admin_client, admin, monkeypatch):
+        from api.pagination import HistoryPagination
+        from reviews.models import Comment
+
+        monkeypatch.setattr(HistoryPagination, 'page_size', 1)
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        Comment.objects.create(
+            review_id=reviews[1]['id'], author=moderator, text='Ещё'
+        )
+        url = f'/api/v1/users/{moderator.username}/comments/'
+        user_client = auth_client(user)
+        response = user_client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert [item['text'] for item in data['results']] == ['Ещё']
+        assert data['results'][0]['review'] == reviews[1]['id']
+        assert data['results'][0]['title'] == {
+            'id': titles[0]['id'], 'name': titles[0]['name']
+        }, 'Проверьте, что у комментария в истории указано произведение'
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(data['next'])
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if 'reviews_comment' in query['sql']
+        ]
+        assert len(queries) == 1, (
+            'Проверьте, что страница истории комментариев читается '
+            'одним запросом'
+        )
+        assert [item['text'] for item in response.json()['results']] == [
+            'qwerty321'
+        ], 'Проверьте переход на следующую страницу по курсору'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_history_uses_index(self):
+        from reviews.models import Comment, Review
+
+        for queryset in (
+            Review.objects.filter(author__username='user'),
+            Comment.objects.filter(author__username='user'),
+        ):
+            plan = queryset.order_by('-pub_date').explain()
+            assert 'author_pub_date_idx' in plan, (
+                'Проверьте, что история пользователя читается по индексу '
+                f'(author, pub_date):\n{plan}'
+            )
+            assert 'TEMP B-TREE' not in plan, plan
@@ -0,0 +1,156 @@
+import pytest
+
+from .common import auth_client, create_comments
+
+
+class Test19Moderation:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_flag_and_queue(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        user_client = auth_client(user)
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comment_url = f'{review_url}{reviews[0]["id"]}/comments/'
+
+        response = client.post(f'{review_url}{reviews[0]["id"]}/flag/')
+        assert response.status_code == 401, (
+            'Проверьте, что отметить отзыв может только '
+            'авторизованный пользователь'
+        )
+        response = user_client.post(f'{review_url}{reviews[0]["id"]}/flag/')
+        assert response.status_code == 204, (
+            'Проверьте, что POST запрос `.../reviews/{review_id}/flag/` '
+            'возвращает статус 204'
+        )
+        user_client.post(f'{comment_url}{comments[2]["id"]}/flag/')
+
+        response = user_client.get('/api/v1/moderation/reviews/')
+        assert response.status_code == 403, (
+            'Проверьте, что очередь модерации недоступна пользователю'
+        )
+        moderator_client = auth_client(moderator)
+        response = moderator_client.get('/api/v1/moderation/reviews/')
+        assert response.status_code == 200
+        assert [item['id'] for item in response.json()['results']] == [
+            reviews[0]['id']
+        ], 'Проверьте, что в очереди модерации отмеченные отзывы'
+        response = moderator_client.get('/api/v1/moderation/comments/')
+        assert [item['id'] for item in response.json()['results']] == [
+            comments[2]['id']
+        ], 'Проверьте, что в очереди модерации отмеченные комментарии'
+
+        response = moderator_client.post(
+            '/api/v1/moderation/comments/bulk/',
+            data={'action': 'approve', 'ids': [comments[2]['id']]},
+            format='json'
+        )
+        assert response.json() == {'action': 'approve', 'processed': 1}
+        response = moderator_client.get('/api/v1/moderation/comments/')
+        assert response.json()['results'] == [], (
+            'Проверьте, что одобренный комментарий уходит из очереди'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_hide(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        moderator_client = auth_client(moderator)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        moderator_client.post(
+            '/api/v1/moderation/comments/bulk/',
+            data={'action': 'hide', 'ids': [comments[0]['id']]},
+            format='json'
+        )
+        response = client.get(
+            f'{title_url}reviews/{reviews[0]["id"]}/comments/'
+        )
+        assert [item['id'] for item in response.json()['results']] == [
+            comments[1]['id'], comments[2]['id']
+        ], 'Проверьте, что скрытый комментарий не выводится в списке'
+
+        response = moderator_client.post(
+            '/api/v1/moderation/reviews/bulk/',
+            data={'action': 'hide', 'ids': [reviews[0]['id']]},
+            format='json'
+        )
+        assert response.status_code == 200
+        assert response.json()['processed'] == 1
+
+        response = client.get(f'{title_url}reviews/')
+        assert reviews[0]['id'] not in [
+            item['id'] for item in response.json()['results']
+        ], 'Проверьте, что скрытый отзыв не выводится в списке отзывов'
+        response = client.get(f'{title_url}reviews/{reviews[0]["id"]}/')
+        assert response.status_code == 404
+        response = client.get(f'{title_url}ratings/')
+        assert response.json()['count'] == 2, (
+            'Проверьте, что оценка скрытого отзыва не учитывается в рейтинге'
+        )
+        response = client.get(title_url)
+        assert response.json()['rating'] == int((3 + 4) / 2)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_bulk_delete(self, client, admin_client, admin, monkeypatch):
+        from reviews import signals
+        from reviews.models import Comment, Review
+
+        _, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        calls = []
+        update_title_ratings = signals.update_title_ratings
+
+        def counting_update(title_ids):
+            calls.append(list(title_ids))
+            return update_title_ratings(title_ids)
+
+        monkeypatch.setattr(signals, 'update_title_ratings', counting_update)
+        response = auth_client(moderator).post(
+            '/api/v1/moderation/reviews/bulk/',
+            data={'action': 'delete', 'ids': [
+                review['id'] for review in reviews
+            ]},
+            format='json'
+        )
+        assert response.json() == {'action': 'delete', 'processed': 3}
+        assert not Review.objects.alive().exists()
+        assert not Comment.objects.visible().exists()
+        assert calls == [[titles[0]['id']]], (
+            'Проверьте, что рейтинг произведения пересчитывается один раз '
+            'на произведение, а не на каждый удалённый отзыв'
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_bulk_validation(self, admin_client, admin, settings):
+        _, reviews, _, user, _ = create_comments(admin_client, admin)
+        settings.MODERATION_BULK_LIMIT = 2
+        response = admin_client.post(
+            '/api/v1/moderation/reviews/bulk/',
+            data={'action': 'hide', 'ids': [
+                review['id'] for review in reviews
+            ]},
+            format='json'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что число записей в запросе ограничено '
+            '`MODERATION_BULK_LIMIT`'
+        )
+        response = admin_client.post(
+            '/api/v1/moderation/reviews/bulk/',
+            data={'action': 'publish', 'ids': [reviews[0]['id']]},
+            format='json'
+        )
+        assert response.status_code == 400
+        response = auth_client(user).post(
+            '/api/v1/moderation/reviews/bulk/',
+            data={'action': 'delete', 'ids': [reviews[0]['id']]},
+            format='json'
+        )
+        assert response.status_code == 403, (
+            'Проверьте, что массовые действия доступны только модераторам'
+        )
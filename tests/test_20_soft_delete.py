@@ -0,0 +1,109 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_comments
+
+
+class Test20SoftDelete:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_soft_delete_review(self, client, admin_client, admin):
+        from reviews.models import Comment, Review
+
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        response = admin_client.delete(review_url)
+        assert response.status_code == 204
+        assert Review.objects.filter(
+            pk=reviews[0]['id'], is_deleted=True
+        ).exists(), 'Проверьте, что отзыв удаляется мягко, без DELETE'
+        assert Comment.objects.count() == len(comments), (
+            'Проверьте, что комментарии удалённого отзыва не удаляются '
+            'в запросе пользователя'
+        )
+
+        response = client.get(f'{title_url}reviews/')
+        assert [item['id'] for item in response.json()['results']] == [
+            reviews[1]['id'], reviews[2]['id']
+        ], 'Проверьте, что удалённый отзыв не выводится в списке'
+        assert client.get(review_url).status_code == 404
+        assert client.get(f'{review_url}comments/').status_code == 404, (
+            'Проверьте, что комментарии удалённого отзыва недоступны'
+        )
+        assert client.get(title_url).json()['rating'] == int((3 + 4) / 2)
+
+        response = admin_client.post(
+            f'{title_url}reviews/', data={'text': 'Снова', 'score': 9}
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что после удаления отзыва автор может оставить новый'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_soft_delete_comment(self, client, admin_client, admin):
+        from reviews.models import Comment
+
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        response = auth_client(user).delete(f'{url}{comments[1]["id"]}/')
+        assert response.status_code == 204
+        assert Comment.objects.filter(
+            pk=comments[1]['id'], is_deleted=True
+        ).exists()
+        response = client.get(url)
+        assert [item['id'] for item in response.json()['results']] == [
+            comments[0]['id'], comments[2]['id']
+        ], 'Проверьте, что удалённый комментарий не выводится в списке'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_purge_deleted(self, admin_client, admin):
+        from reviews.models import Comment, Review
+
+        comments, reviews, titles, _, _ = create_comments(
+            admin_client, admin
+        )
+        Comment.objects.filter(pk=comments[0]['id']).update(is_deleted=True)
+        Review.objects.filter(pk=reviews[1]['id']).update(is_deleted=True)
+        Review.objects.filter(pk=reviews[0]['id']).update(is_deleted=True)
+
+        out = StringIO()
+        call_command('purge_deleted', batch_size=1, stdout=out)
+        assert not Comment.objects.exists(), (
+            'Проверьте, что purge_deleted удаляет комментарии удалённых '
+            'отзывов'
+        )
+        assert list(Review.objects.values_list('pk', flat=True)) == [
+            reviews[2]['id']
+        ], 'Проверьте, что purge_deleted удаляет только удалённые отзывы'
+        assert 'reviews of a work: 2 deleted' in out.getvalue(), (
+            'Проверьте, что purge_deleted сообщает о ходе удаления'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_partial_indexes(self):
+        from reviews.models import Comment, Review
+
+        for queryset, index in (
+            (Review.objects.deleted().order_by('pk'), 'review_deleted_idx'),
+            (Comment.objects.deleted().order_by('pk'),
+             'comment_deleted_idx'),
+            (Review.objects.alive().filter(title_id=1).order_by('pub_date'),
+             'review_alive_idx'),
+            (Comment.objects.alive().filter(review_id=1).order_by('pub_date'),
+             'comment_alive_idx'),
+        ):
+            plan = queryset.values('pk').explain()
+            assert index in plan, (
+                f'Проверьте, что запрос использует частичный индекс {index}:'
+                f'\n{plan}'
+            )
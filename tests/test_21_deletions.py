@@ -0,0 +1,118 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_comments, create_titles
+
+
+class Test21Deletions:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_deletion(self, client, admin_client, admin):
+        from backend.models import DeletionTask, Title
+        from reviews.models import Comment, LeaderboardEntry, Review
+
+        comments, reviews, titles, _, _ = create_comments(
+            admin_client, admin
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = admin_client.delete(url)
+        assert response.status_code == 204
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что удалённое произведение сразу недоступно'
+        )
+        assert client.get(f'{url}reviews/').status_code == 404
+        assert not LeaderboardEntry.objects.filter(
+            title_id=titles[0]['id']
+        ).exists(), 'Проверьте, что произведение сразу уходит из рейтинга'
+        assert Review.objects.count() == len(reviews), (
+            'Проверьте, что отзывы удаляются в фоне, а не в запросе'
+        )
+        task = DeletionTask.objects.get()
+        assert task.status == DeletionTask.PENDING
+
+        out = StringIO()
+        call_command('process_deletions', batch_size=2, stdout=out)
+        task.refresh_from_db()
+        assert task.status == DeletionTask.DONE, task.error
+        # 3 комментария, 3 отзыва и 2 жанра
+        assert task.processed == 8, (
+            'Проверьте, что задача учитывает число обработанных записей'
+        )
+        assert not Title.objects.filter(pk=titles[0]['id']).exists()
+        assert not Review.objects.exists() and not Comment.objects.exists()
+        lines = out.getvalue().splitlines()
+        assert (
+            f'title {titles[0]["id"]}: running (comments), '
+            '2 dependent rows processed'
+        ) in lines, 'Проверьте, что воркер сообщает о ходе удаления'
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_category_and_genre_deletion(self, client, admin_client):
+        from backend.models import Category, Genre, Title
+
+        titles, categories, genres = create_titles(admin_client)
+        response = admin_client.delete(
+            f'/api/v1/categories/{categories[0]["slug"]}/'
+        )
+        assert response.status_code == 204
+        response = admin_client.delete(f'/api/v1/genres/{genres[0]["slug"]}/')
+        assert response.status_code == 204
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Новое', 'year': 2001, 'description': 'Описание',
+            'genre': [genres[0]['slug']], 'category': categories[0]['slug'],
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что удалённые категорию и жанр нельзя указать '
+            'у произведения'
+        )
+        title = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        assert title['category'] is None
+        assert [genre['slug'] for genre in title['genre']] == [
+            genres[1]['slug']
+        ], (
+            'Проверьте, что удалённые категория и жанр сразу скрыты в '
+            'ответах о произведениях'
+        )
+        for query in (f'category={categories[0]["slug"]}',
+                      f'genre={genres[0]["slug"]}'):
+            response = client.get(f'/api/v1/titles/?{query}')
+            assert response.json()['count'] == 0, (
+                f'Проверьте, что фильтр `{query}` не находит произведений '
+                'удалённых категории и жанра'
+            )
+
+        call_command('process_deletions', stdout=StringIO())
+        assert not Category.objects.filter(slug=categories[0]['slug']).exists()
+        assert not Genre.objects.filter(slug=genres[0]['slug']).exists()
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.category is None, (
+            'Проверьте, что у произведений удалённой категории она сброшена'
+        )
+        assert [genre.slug for genre in title.genre.all()] == [
+            genres[1]['slug']
+        ]
+        response = client.get('/api/v1/categories/')
+        assert len(response.json()['results']) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_failed_task(self, admin_client, monkeypatch):
+        from backend import deletion
+        from backend.models import DeletionTask
+
+        titles, _, _ = create_titles(admin_client)
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+
+        def broken_batch(queryset, batch_size):
+            raise RuntimeError('сбой')
+
+        monkeypatch.setattr(deletion, 'delete_batch', broken_batch)
+        assert deletion.process_deletions() == 1
+        task = DeletionTask.objects.get()
+        assert task.status == DeletionTask.FAILED
+        assert 'сбой' in task.error, (
+            'Проверьте, что ошибка задачи сохраняется'
+        )
@@ -0,0 +1,98 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_comments
+
+
+class Test22Counters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_counts_in_lists(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/')
+        counts = {
+            item['id']: item['review_count']
+            for item in response.json()['results']
+        }
+        assert counts == {titles[0]['id']: 3, titles[1]['id']: 0}, (
+            'Проверьте, что в списке произведений есть поле `review_count`'
+        )
+        assert not [
+            query for query in context.captured_queries
+            if 'reviews_review' in query['sql']
+        ], 'Проверьте, что число отзывов не считается запросом к отзывам'
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        counts = {
+            item['id']: item['comment_count']
+            for item in response.json()['results']
+        }
+        assert counts == {
+            reviews[0]['id']: 3, reviews[1]['id']: 0, reviews[2]['id']: 0
+        }, 'Проверьте, что в списке отзывов есть поле `comment_count`'
+        assert not [
+            query for query in context.captured_queries
+            if 'reviews_comment' in query['sql']
+        ], 'Проверьте, что число комментариев не считается запросом'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_counts_follow_changes(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        auth_client(user).delete(f'{review_url}comments/{comments[1]["id"]}/')
+        auth_client(moderator).post(
+            '/api/v1/moderation/comments/bulk/',
+            data={'action': 'hide', 'ids': [
+                comments[0]['id'], comments[1]['id']
+            ]},
+            format='json'
+        )
+        assert client.get(review_url).json()['comment_count'] == 1, (
+            'Проверьте, что удалённые и скрытые комментарии '
+            'не учитываются в `comment_count`'
+        )
+
+        admin_client.delete(review_url)
+        auth_client(moderator).post(
+            '/api/v1/moderation/reviews/bulk/',
+            data={'action': 'hide', 'ids': [reviews[1]['id']]},
+            format='json'
+        )
+        assert client.get(title_url).json()['review_count'] == 1, (
+            'Проверьте, что удалённые и скрытые отзывы '
+            'не учитываются в `review_count`'
+        )
+        admin_client.post(
+            f'{title_url}reviews/', data={'text': 'Снова', 'score': 9}
+        )
+        assert client.get(title_url).json()['review_count'] == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_reconcile_counters(self, admin_client, admin):
+        from backend.models import Title
+        from reviews.models import Review
+
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        Title.objects.update(review_count=10)
+        Review.objects.filter(pk=reviews[0]['id']).update(comment_count=0)
+
+        out = StringIO()
+        call_command('reconcile_counters', batch_size=1, stdout=out)
+        assert dict(Title.objects.values_list('pk', 'review_count')) == {
+            titles[0]['id']: 3, titles[1]['id']: 0
+        }, 'Проверьте, что reconcile_counters исправляет `review_count`'
+        assert Review.objects.get(pk=reviews[0]['id']).comment_count == 3, (
+            'Проверьте, что reconcile_counters исправляет `comment_count`'
+        )
+        assert 'titles: 2 fixed' in out.getvalue()
+        assert 'reviews: 1 fixed' in out.getvalue()
@@ -0,0 +1,79 @@
+import os
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+SIZES = [
+    '--users', '50', '--titles', '40', '--reviews', '400',
+    '--comments', '600', '--end-date', '2026-01-01',
+]
+
+
+class Test23SyntheticData:
+
+    def test_01_deterministic_csv(self, tmp_path):
+        for name in ('first', 'second'):
+            call_command(
+                'generate_data', *SIZES, '--output', str(tmp_path / name),
+                stdout=StringIO()
+            )
+        files = sorted(os.listdir(tmp_path / 'first'))
+        assert files == [
+            'category.csv', 'comments.csv', 'genre.csv', 'genre_title.csv',
+            'review.csv', 'titles.csv', 'users.csv',
+        ], 'Проверьте, что generate_data пишет файлы в формате populatedb'
+        for file_name in files:
+            first = (tmp_path / 'first' / file_name).read_text('utf-8')
+            second = (tmp_path / 'second' / file_name).read_text('utf-8')
+            assert first == second, (
+                f'Проверьте, что {file_name} не меняется при том же seed'
+            )
+        header = (tmp_path / 'first' / 'review.csv').read_text('utf-8')
+        assert header.startswith(
+            'id,title_id,text,author,score,pub_date\n'
+        )
+
+    def test_02_zipf_skew(self):
+        from backend.synthetic import SyntheticData, zipf_counts
+
+        assert sum(zipf_counts(1000, 30, 1.1)) == 1000
+        data = SyntheticData(
+            users=1000, titles=100, reviews=5000, comments=0,
+            end=datetime(2026, 1, 1, tzinfo=timezone.utc)
+        )
+        counts = sorted(data.review_counts, reverse=True)
+        assert counts[0] > 10 * counts[50], (
+            'Проверьте, что отзывы распределены по произведениям '
+            'неравномерно, по закону Ципфа'
+        )
+        pairs = [(row['title_id'], row['author']) for row in data.reviews()]
+        assert len(pairs) == len(set(pairs)) == sum(counts), (
+            'Проверьте, что автор оставляет один отзыв на произведение'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_insert(self):
+        from backend.models import Title
+        from reviews.models import Comment, Review, TitleScoreCount
+
+        out = StringIO()
+        call_command('generate_data', *SIZES, stdout=out)
+        assert Title.objects.count() == 40
+        assert Comment.objects.count() == 600
+        assert Review.objects.filter(
+            pub_date__lt=datetime(2026, 1, 1, tzinfo=timezone.utc)
+        ).count() == Review.objects.count(), (
+            'Проверьте, что сохраняются сгенерированные даты публикации'
+        )
+        assert TitleScoreCount.objects.exists(), (
+            'Проверьте, что после загрузки пересчитываются счётчики оценок'
+        )
+        assert Title.objects.filter(rating__isnull=False).exists()
+
+        call_command('reconcile_counters', stdout=out)
+        assert 'titles: 0 fixed' in out.getvalue()
+        assert 'reviews: 0 fixed' in out.getvalue(), (
+            'Проверьте, что review_count и comment_count заполнены верно'
+        )
@@ -0,0 +1,133 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_reviews, create_titles
+
+URL = '/api/v1/reviews/bulk/'
+
+
+def create_authors(count):
+    from backend.models import User
+
+    return [
+        User.objects.create(username=f'partner{i}', email=f'p{i}@yamdb.fake')
+        for i in range(count)
+    ]
+
+
+class Test24BulkReviews:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_ingest(self, client, admin_client, admin):
+        from django.db.models import Sum
+
+        from reviews.models import TitleScoreCount
+
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        first, second = titles[0]['id'], titles[1]['id']
+        data = {'reviews': [
+            {'title': first, 'author': user.username, 'text': 'Повтор',
+             'score': 1},
+            {'title': second, 'author': user.username, 'text': 'Новый',
+             'score': 8},
+            {'title': second, 'author': user.username, 'text': 'Дубль',
+             'score': 2},
+            {'title': 999, 'author': user.username, 'text': 'Нет',
+             'score': 2},
+            {'title': second, 'author': 'nobody', 'text': 'Нет', 'score': 2},
+            {'title': second, 'author': admin.username, 'text': 'Новый',
+             'score': 10},
+        ]}
+        response = auth_client(user).post(URL, data=data, format='json')
+        assert response.status_code == 403, (
+            'Проверьте, что массовая загрузка доступна только администратору'
+        )
+
+        response = admin_client.post(URL, data=data, format='json')
+        assert response.status_code == 200
+        assert response.json() == {'created': 2, 'skipped': [
+            {'index': 0, 'reason': 'duplicate'},
+            {'index': 2, 'reason': 'duplicate'},
+            {'index': 3, 'reason': 'unknown title'},
+            {'index': 4, 'reason': 'unknown author'},
+        ]}, (
+            'Проверьте, что повторы, неизвестные произведения и авторы '
+            'пропускаются с указанием причины'
+        )
+        response = client.get(f'/api/v1/titles/{second}/')
+        assert response.json()['rating'] == 9
+        assert response.json()['review_count'] == 2, (
+            'Проверьте, что массовая загрузка обновляет число отзывов'
+        )
+        assert dict(TitleScoreCount.objects.filter(
+            title_id=second
+        ).values('score').annotate(total=Sum('count')).filter(
+            total__gt=0
+        ).values_list('score', 'total')) == {8: 1, 10: 1}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_constant_queries(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        authors = create_authors(20)
+
+        def ingest(authors):
+            data = {'reviews': [
+                {'title': title['id'], 'author': author.username,
+                 'text': 'Отзыв', 'score': 5}
+                for title in titles for author in authors
+            ]}
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(URL, data=data, format='json')
+            assert response.json()['created'] == len(data['reviews'])
+            return len(context.captured_queries)
+
+        # Первая пачка создаёт счётчики оценок
+        ingest(authors[:1])
+        assert ingest(authors[1:3]) == ingest(authors[3:]), (
+            'Проверьте, что число запросов не зависит от размера пачки'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_validation(self, admin_client, settings):
+        titles, _, _ = create_titles(admin_client)
+        settings.REVIEW_BULK_LIMIT = 1
+        row = {'title': titles[0]['id'], 'author': 'user', 'text': 'Отзыв',
+               'score': 5}
+        response = admin_client.post(
+            URL, data={'reviews': [row, row]}, format='json'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что размер пачки ограничен `REVIEW_BULK_LIMIT`'
+        )
+        response = admin_client.post(
+            URL, data={'reviews': [dict(row, score=11)]}, format='json'
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_import_command(self, admin_client, tmp_path):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        authors = create_authors(3)
+        path = tmp_path / 'reviews.csv'
+        path.write_text(
+            'title,author,text,score\n'
+            + ''.join(
+                f'{titles[0]["id"]},{author.username},"Текст, с запятой",7\n'
+                for author in authors
+            )
+            + f'{titles[0]["id"]},{authors[0].username},Повтор,7\n',
+            encoding='utf-8'
+        )
+        out = StringIO()
+        call_command('import_reviews', str(path), batch_size=2, stdout=out)
+        assert Review.objects.filter(title_id=titles[0]['id']).count() == 3
+        assert 'created: 3' in out.getvalue()
+        assert 'skipped (duplicate): 1' in out.getvalue(), (
+            'Проверьте, что import_reviews сообщает о пропущенных отзывах'
+        )
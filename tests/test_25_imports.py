@@ -0,0 +1,186 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from .common import auth_client, create_users_api
+
+URL = '/api/v1/imports/'
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'api_yamdb', 'static', 'data'
+)
+
+
+class Test25Imports:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_raw_upload(self, admin_client, settings, tmp_path,
+                           monkeypatch):
+        from api import views
+        from backend.models import Category, ImportJob, Title
+
+        settings.IMPORT_UPLOAD_DIR = str(tmp_path)
+        # Тело запроса читается маленькими блоками
+        monkeypatch.setattr(views, 'CHUNK_SIZE', 16)
+        body = 'id,name,slug\n1,Фильм,movie\n2,Книга,book\n'.encode()
+        response = admin_client.post(
+            f'{URL}?file_name=category.csv', data=body,
+            content_type='text/csv'
+        )
+        assert response.status_code == 202, (
+            'Проверьте, что загрузка файла возвращает статус 202'
+        )
+        job = response.json()
+        assert job['status'] == 'pending'
+        assert job['size'] == len(body)
+        assert not Category.objects.exists(), (
+            'Проверьте, что строки вставляет воркер, а не запрос'
+        )
+        with open(ImportJob.objects.get(pk=job['id']).path, 'rb') as f:
+            assert f.read() == body
+
+        admin_client.post(
+            f'{URL}?file_name=titles.csv',
+            data='id,name,year,category\n5,Фильм,2000,1\n6,Книга,,2\n',
+            content_type='text/csv'
+        )
+        out = StringIO()
+        call_command('process_imports', batch_size=1, stdout=out)
+        assert 'titles.csv #2: done, 2 rows imported' in out.getvalue()
+        assert list(Title.objects.values_list('pk', 'category__slug')) == [
+            (6, 'book'), (5, 'movie')
+        ]
+        response = admin_client.get(f'{URL}{job["id"]}/')
+        assert response.json()['status'] == 'done'
+        assert response.json()['processed'] == 2, (
+            'Проверьте, что по id задачи видно число загруженных строк'
+        )
+        assert os.listdir(tmp_path) == [], (
+            'Проверьте, что загруженный файл удаляется после импорта'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_multipart_reviews(self, client, admin_client, settings,
+                                  tmp_path):
+        settings.IMPORT_UPLOAD_DIR = str(tmp_path)
+        for file_name in ('users.csv', 'category.csv', 'titles.csv',
+                          'review.csv'):
+            with open(os.path.join(DATA_DIR, file_name), 'rb') as f:
+                response = admin_client.post(URL, {
+                    'file': SimpleUploadedFile(file_name, f.read())
+                }, format='multipart')
+            assert response.status_code == 202
+            assert response.json()['file_name'] == file_name
+        call_command('process_imports', stdout=StringIO())
+
+        response = admin_client.get(URL)
+        assert [job['status'] for job in response.json()['results']] == [
+            'done'
+        ] * 4
+        data = client.get('/api/v1/titles/1/').json()
+        assert data['review_count'] > 0 and data['rating'] is not None, (
+            'Проверьте, что импорт отзывов обновляет число отзывов и рейтинг'
+        )
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        assert 'titles: 0 fixed' in out.getvalue()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_validation(self, admin_client, settings, tmp_path):
+        settings.IMPORT_UPLOAD_DIR = str(tmp_path)
+        user, _ = create_users_api(admin_client)
+        response = auth_client(user).post(
+            f'{URL}?file_name=genre.csv', data='id,name,slug\n',
+            content_type='text/csv'
+        )
+        assert response.status_code == 403, (
+            'Проверьте, что загрузка доступна только администратору'
+        )
+        response = admin_client.post(
+            f'{URL}?file_name=other.csv', data='id,name,slug\n',
+            content_type='text/csv'
+        )
+        assert response.status_code == 400
+        response = admin_client.post(
+            f'{URL}?file_name=genre.csv', data='id,name\n1,Драма\n',
+            content_type='text/csv'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что файл без нужных колонок не принимается'
+        )
+        assert os.listdir(tmp_path) == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_failed_import(self, admin_client, settings, tmp_path):
+        settings.IMPORT_UPLOAD_DIR = str(tmp_path)
+        body = 'id,name,slug\n1,Драма,drama\n2,Комедия,drama\n'
+        response = admin_client.post(
+            f'{URL}?file_name=genre.csv', data=body, content_type='text/csv'
+        )
+        call_command('process_imports', stdout=StringIO())
+        data = admin_client.get(f'{URL}{response.json()["id"]}/').json()
+        assert data['status'] == 'failed'
+        assert 'IntegrityError' in data['error'], (
+            'Проверьте, что ошибка импорта сохраняется в задаче'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_populatedb(self):
+        from reviews.models import Comment, Review
+
+        out = StringIO()
+        for file_name in ('users.csv', 'category.csv', 'genre.csv',
+                          'titles.csv', 'genre_title.csv', 'review.csv',
+                          'comments.csv'):
+            call_command(
+                'populatedb', os.path.join(DATA_DIR, file_name), stdout=out
+            )
+        assert Review.objects.exists() and Comment.objects.exists(), (
+            'Проверьте, что populatedb загружает отзывы и комментарии'
+        )
+        call_command('reconcile_counters', stdout=out)
+        assert 'reviews: 0 fixed' in out.getvalue()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_chunked_body(self, admin, settings, tmp_path, monkeypatch):
+        from io import BytesIO
+
+        from rest_framework.test import APIRequestFactory, force_authenticate
+
+        from api import views
+        from backend.models import ImportJob
+
+        settings.IMPORT_UPLOAD_DIR = str(tmp_path)
+        monkeypatch.setattr(views, 'CHUNK_SIZE', 16)
+        monkeypatch.setattr(views, 'MAX_HEADER_SIZE', 64)
+        view = views.ImportViewSet.as_view({'post': 'create'})
+
+        def post(body):
+            request = APIRequestFactory().post(
+                f'{URL}?file_name=genre.csv', data=body,
+                content_type='text/csv'
+            )
+            # Chunked-запрос через WSGI приходит без Content-Length
+            del request.META['CONTENT_LENGTH']
+            request.META['HTTP_TRANSFER_ENCODING'] = 'chunked'
+            request.META['wsgi.input'] = BytesIO(body)
+            force_authenticate(request, admin)
+            return view(request)
+
+        body = 'id,name,slug\n1,Драма,drama\n'.encode()
+        response = post(body)
+        assert response.status_code == 202, (
+            'Проверьте, что принимается chunked-тело без Content-Length'
+        )
+        with open(ImportJob.objects.get().path, 'rb') as f:
+            assert f.read() == body
+
+        response = post(b'x' * 1000)
+        assert response.status_code == 400
+        assert response.data == {'file': 'Нет строки заголовка'}, (
+            'Проверьте, что строка заголовка ищется не дальше одного блока'
+        )
+        assert ImportJob.objects.count() == 1
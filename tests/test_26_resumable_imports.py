@@ -0,0 +1,134 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_titles
+
+REVIEWS = (
+    'id,title_id,text,author,score,pub_date\n'
+    '1,{first},Первый,{user},4,2020-01-01T00:00:00Z\n'
+    '2,{first},Второй,{admin},6,2020-01-02T00:00:00Z\n'
+    '3,{second},Третий,{user},8,2020-01-03T00:00:00Z\n'
+)
+
+
+def write_reviews(path, titles, users, body=REVIEWS):
+    path.write_text(body.format(
+        first=titles[0]['id'], second=titles[1]['id'],
+        user=users[0].pk, admin=users[1].pk
+    ), encoding='utf-8')
+    return str(path)
+
+
+class Test26ResumableImports:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_resume(self, admin_client, admin, tmp_path, monkeypatch):
+        from backend import importers
+        from backend.models import ImportState, User
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        user = User.objects.create(username='reader', email='r@yamdb.fake')
+        path = write_reviews(tmp_path / 'review.csv', titles, [user, admin])
+
+        build = importers.IMPORTERS[importers.REVIEW].build
+
+        def fail_on_third(row):
+            if row['id'] == '3':
+                raise RuntimeError('Сбой загрузки')
+            return build(row)
+
+        monkeypatch.setitem(
+            importers.IMPORTERS, importers.REVIEW,
+            importers.IMPORTERS[importers.REVIEW]._replace(
+                build=fail_on_third
+            )
+        )
+        with pytest.raises(RuntimeError):
+            importers.import_file(path, batch_size=1)
+        state = ImportState.objects.get()
+        assert state.rows == 2, (
+            'Проверьте, что после каждой пачки сохраняется контрольная точка'
+        )
+        monkeypatch.undo()
+
+        out = StringIO()
+        call_command('populatedb', path, batch_size=1, stdout=out)
+        assert 'review.csv: resuming from row 2' in out.getvalue()
+        assert 'review.csv: 3 rows' in out.getvalue(), (
+            'Проверьте, что загрузка продолжается с контрольной точки'
+        )
+        assert sorted(Review.objects.values_list('pk', flat=True)) == [
+            1, 2, 3
+        ]
+        assert not ImportState.objects.exists(), (
+            'Проверьте, что после загрузки контрольная точка удаляется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reimport_updates(self, client, admin_client, admin,
+                                 tmp_path):
+        from backend.importers import import_file
+        from backend.models import User
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        user = User.objects.create(username='reader', email='r@yamdb.fake')
+        path = write_reviews(tmp_path / 'review.csv', titles, [user, admin])
+        import_file(path)
+        assert import_file(path) == 3
+        assert Review.objects.count() == 3, (
+            'Проверьте, что повторная загрузка файла не создаёт дублей'
+        )
+
+        # Отзыв 2 переехал ко второму произведению и сменил оценку
+        path = write_reviews(
+            tmp_path / 'review.csv', titles, [user, admin],
+            REVIEWS.replace('2,{first},Второй,{admin},6', '2,{second},'
+                            'Второй,{admin},10')
+        )
+        import_file(path)
+        first = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        second = client.get(f'/api/v1/titles/{titles[1]["id"]}/').json()
+        assert (first['review_count'], first['rating']) == (1, 4)
+        assert (second['review_count'], second['rating']) == (2, 9), (
+            'Проверьте, что обновление отзывов пересчитывает счётчики и '
+            'рейтинг прежнего и нового произведения'
+        )
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        assert 'titles: 0 fixed' in out.getvalue()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_retry_failed_job(self, admin_client, settings, tmp_path):
+        from backend.models import Genre, ImportJob
+
+        settings.IMPORT_UPLOAD_DIR = str(tmp_path)
+        admin_client.post(
+            '/api/v1/imports/?file_name=genre.csv',
+            data='id,name,slug\n1,Драма,drama\n2,Комедия,drama\n',
+            content_type='text/csv'
+        )
+        call_command('process_imports', batch_size=1, stdout=StringIO())
+        job = ImportJob.objects.get()
+        assert job.status == ImportJob.FAILED and job.processed == 1
+
+        # Исправленный файл подкладывается на место упавшего
+        with open(job.path, 'r+', encoding='utf-8') as f:
+            f.write('id,name,slug\n1,Драма,drama\n2,Комедия,comed\n')
+        os.utime(job.path, ns=(0, 0))
+        out = StringIO()
+        call_command(
+            'process_imports', batch_size=1, retry_failed=True, stdout=out
+        )
+        assert f'genre.csv #{job.pk}: done, 2 rows imported' in (
+            out.getvalue()
+        ), (
+            'Проверьте, что --retry-failed возвращает задачу в очередь'
+        )
+        assert sorted(Genre.objects.values_list('slug', flat=True)) == [
+            'comed', 'drama'
+        ]
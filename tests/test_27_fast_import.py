@@ -0,0 +1,88 @@
+import csv
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'api_yamdb', 'static', 'data'
+)
+FILE_NAMES = (
+    'users.csv', 'category.csv', 'genre.csv', 'titles.csv',
+    'genre_title.csv', 'review.csv', 'comments.csv'
+)
+
+
+class Test27FastImport:
+
+    @pytest.mark.parametrize('range_size', [1, 100, 10 ** 6])
+    def test_01_ranges(self, range_size):
+        from backend import fastcsv
+
+        # В текстах отзывов есть переводы строк внутри кавычек
+        path = os.path.join(DATA_DIR, 'review.csv')
+        with open(path, encoding='utf-8', newline='') as f:
+            expected = [tuple(row) for row in csv.reader(f)]
+        header, start = fastcsv.read_header(path)
+        assert header == list(expected[0])
+        chunks = list(fastcsv.read_ranges(path, start, 1, range_size))
+        assert [row for _, rows in chunks for row in rows] == expected[1:], (
+            'Проверьте, что файл делится на куски по границам записей'
+        )
+        assert chunks[-1][0] == os.path.getsize(path)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_populatedb_fast(self):
+        from reviews.models import Comment, Review
+
+        out = StringIO()
+        for file_name in FILE_NAMES:
+            call_command(
+                'populatedb', os.path.join(DATA_DIR, file_name),
+                fast=True, workers=2, batch_size=7, stdout=out
+            )
+        with open(os.path.join(DATA_DIR, 'review.csv'), encoding='utf-8',
+                  newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert f'review.csv: {len(rows)} rows' in out.getvalue()
+        texts = dict(Review.objects.values_list('pk', 'text'))
+        assert texts == {int(row['id']): row['text'] for row in rows}, (
+            'Проверьте, что populatedb --fast загружает те же строки'
+        )
+        assert Comment.objects.exists()
+        call_command('reconcile_counters', stdout=out)
+        assert 'titles: 0 fixed' in out.getvalue()
+        assert 'reviews: 0 fixed' in out.getvalue()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_fast_resume(self, tmp_path, monkeypatch):
+        from backend import fastcsv, importers
+        from backend.models import Category, ImportState
+
+        path = tmp_path / 'category.csv'
+        path.write_text(
+            'id,name,slug\n'
+            + ''.join(f'{i},Категория {i},c{i}\n' for i in range(1, 21)),
+            encoding='utf-8'
+        )
+        monkeypatch.setattr(fastcsv, 'RANGE_SIZE', 64)
+        read_ranges = fastcsv.read_ranges
+
+        def fail_after_two(*args):
+            ranges = read_ranges(*args, range_size=64)
+            yield next(ranges)
+            yield next(ranges)
+            raise RuntimeError('Сбой загрузки')
+
+        monkeypatch.setattr(fastcsv, 'read_ranges', fail_after_two)
+        with pytest.raises(RuntimeError):
+            importers.import_file(str(path), fast=True, workers=1)
+        state = ImportState.objects.get()
+        assert state.rows == Category.objects.count() > 0, (
+            'Проверьте, что после куска сохраняется контрольная точка'
+        )
+        monkeypatch.setattr(fastcsv, 'read_ranges', read_ranges)
+        assert importers.import_file(str(path), fast=True, workers=1) == 20
+        assert Category.objects.count() == 20
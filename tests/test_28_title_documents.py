@@ -0,0 +1,167 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_comments
+
+
+def assert_served(client, title_id):
+    """Ответы из документа совпадают с живыми и читают одну строку."""
+    for path in (f'/api/v1/titles/{title_id}/',
+                 f'/api/v1/titles/{title_id}/reviews/'):
+        with CaptureQueriesContext(connection) as context:
+            document = client.get(path).json()
+        assert len(context.captured_queries) == 1, (
+            f'Проверьте, что {path} отдаётся из документа одним запросом'
+        )
+        # С параметром запроса ответ строится живыми запросами
+        live = client.get(f'{path}?format=json').json()
+        if live.get('next'):
+            live['next'] = live['next'].replace('format=json&', '')
+        assert document == live, (
+            'Проверьте, что документ совпадает с ответом живых запросов'
+        )
+    return document
+
+
+class Test28TitleDocuments:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_build_and_serve(self, client, admin_client, admin,
+                                monkeypatch):
+        from rest_framework.pagination import PageNumberPagination
+
+        from reviews.models import TitleDocument
+
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        first, second = titles[0]['id'], titles[1]['id']
+        out = StringIO()
+        call_command('build_title_documents', count=1, stdout=out)
+        assert 'Successfully built 1 title documents' in out.getvalue()
+        assert list(
+            TitleDocument.objects.values_list('title_id', flat=True)
+        ) == [first], (
+            'Проверьте, что документы строятся для самых обсуждаемых '
+            'произведений'
+        )
+        data = assert_served(client, first)
+        assert data['count'] == 3
+        assert data['results'][0]['comment_count'] == 3
+
+        monkeypatch.setattr(PageNumberPagination, 'page_size', 2)
+        call_command('build_title_documents', count=1, stdout=out)
+        data = assert_served(client, first)
+        assert data['next'].endswith(
+            f'/api/v1/titles/{first}/reviews/?page=2'
+        )
+        response = client.get(f'/api/v1/titles/{second}/')
+        assert response.json()['name'] == titles[1]['name'], (
+            'Проверьте, что без документа ответ строится живыми запросами'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_incremental_rebuild(self, client, admin_client, admin):
+        from reviews.documents import build
+
+        comments, reviews, titles, user, moderator = create_comments(
+            admin_client, admin
+        )
+        title_id = titles[0]['id']
+        build([title_id])
+        url = f'/api/v1/titles/{title_id}/'
+
+        admin_client.patch(
+            url, data={'name': 'Новое имя', 'genre': ['drama']}
+        )
+        assert_served(client, title_id)
+        data = client.get(url).json()
+        assert data['name'] == 'Новое имя'
+        assert [genre['slug'] for genre in data['genre']] == ['drama']
+
+        auth_client(user).patch(
+            f'{url}reviews/{reviews[1]["id"]}/', data={'score': 10}
+        )
+        assert client.get(url).json()['rating'] == 6, (
+            'Проверьте, что изменение отзыва пересобирает документ'
+        )
+        auth_client(user).patch(
+            f'{url}reviews/{reviews[1]["id"]}/', data={'text': 'Правка'}
+        )
+        data = assert_served(client, title_id)
+        assert 'Правка' in [review['text'] for review in data['results']]
+
+        auth_client(moderator).post(
+            '/api/v1/moderation/comments/bulk/',
+            data={'action': 'hide', 'ids': [comments[0]['id']]},
+            format='json'
+        )
+        data = assert_served(client, title_id)
+        assert data['results'][0]['comment_count'] == 2, (
+            'Проверьте, что скрытие комментария пересобирает документ'
+        )
+        admin_client.post(
+            f'{url}reviews/{reviews[0]["id"]}/comments/',
+            data={'text': 'Ещё'}
+        )
+        assert client.get(f'{url}reviews/').json()['results'][0][
+            'comment_count'
+        ] == 3
+
+        from backend.models import Category, Genre
+
+        genre = Genre.objects.get(slug='drama')
+        genre.name = 'Трагедия'
+        genre.save()
+        category = Category.objects.get(slug='films')
+        category.name = 'Кино'
+        category.save()
+        assert_served(client, title_id)
+        data = client.get(url).json()
+        assert data['genre'][0]['name'] == 'Трагедия'
+        assert data['category']['name'] == 'Кино', (
+            'Проверьте, что переименование жанра и категории пересобирает '
+            'документы их произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_deleted_title(self, client, admin_client, admin):
+        from reviews.documents import build
+        from reviews.models import TitleDocument
+
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        build([title['id'] for title in titles])
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == 404, (
+            'Проверьте, что документ удалённого произведения не отдаётся'
+        )
+        admin_client.delete('/api/v1/categories/books/')
+        assert not TitleDocument.objects.exists()
+        assert client.get('/api/v1/titles/abc/').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_stored_json(self, client, admin_client, admin):
+        from reviews.documents import build
+        from reviews.models import TitleDocument
+
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        title_id = titles[0]['id']
+        build([title_id])
+        document = TitleDocument.objects.get(title_id=title_id)
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response['Content-Type'] == 'application/json'
+        assert response.content == document.detail.encode(), (
+            'Проверьте, что документ отдаётся без повторной сериализации'
+        )
+        response = client.get(f'/api/v1/titles/{title_id}/reviews/')
+        assert document.reviews.encode() in response.content
+        response = client.get(
+            f'/api/v1/titles/{title_id}/', HTTP_ACCEPT='text/html'
+        )
+        assert response.status_code == 200
+        assert titles[0]['name'] in response.content.decode(), (
+            'Проверьте, что браузерный API показывает документ'
+        )
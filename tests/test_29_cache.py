@@ -0,0 +1,197 @@
+import threading
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews, create_titles
+
+THREADS = 10
+
+
+def run_concurrently(func, count=THREADS):
+    """Запускает func в count потоках одновременно, возвращает результаты."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def target(index):
+        barrier.wait()
+        results[index] = func()
+
+    threads = [
+        threading.Thread(target=target, args=(index,))
+        for index in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def call_safely(func):
+    """Результат func или её исключение RuntimeError."""
+    try:
+        return func()
+    except RuntimeError as e:
+        return e
+
+
+class SlowCompute:
+    """Медленный пересчёт, считающий свои вызовы."""
+
+    def __init__(self, value, seconds=0.2):
+        self.value = value
+        self.seconds = seconds
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.seconds)
+        return self.value
+
+
+class Test29Cache:
+
+    def test_01_single_flight(self):
+        from django.core.cache import cache
+
+        from api.cache import get_or_compute
+
+        cache.clear()
+        compute = SlowCompute('список')
+        results = run_concurrently(
+            lambda: get_or_compute('test:cold', compute, ttl=60, beta=0)
+        )
+        assert results == ['список'] * THREADS
+        assert compute.calls == 1, (
+            'Проверьте, что одновременные промахи пересчитывают значение '
+            'один раз'
+        )
+
+    def test_02_stale_while_revalidate(self):
+        from django.core.cache import cache
+
+        from api.cache import get_or_compute, invalidate
+
+        cache.clear()
+        get_or_compute('test:stale', lambda: 'старое', 'test', ttl=60)
+        invalidate('test')
+        compute = SlowCompute('новое', seconds=0.5)
+
+        started = time.monotonic()
+        results = run_concurrently(
+            lambda: (
+                get_or_compute('test:stale', compute, 'test', ttl=60),
+                time.monotonic() - started,
+            )
+        )
+        assert compute.calls == 1
+        assert sorted(value for value, _ in results) == (
+            ['новое'] + ['старое'] * (THREADS - 1)
+        )
+        assert all(
+            elapsed < compute.seconds
+            for value, elapsed in results if value == 'старое'
+        ), 'Проверьте, что во время пересчёта отдаётся устаревшее значение'
+        assert get_or_compute('test:stale', compute, 'test') == 'новое'
+
+    def test_03_early_refresh(self, monkeypatch):
+        from django.core.cache import cache
+
+        from api import cache as api_cache
+
+        cache.clear()
+        compute = SlowCompute('значение', seconds=0.1)
+        api_cache.get_or_compute('test:early', compute, ttl=1)
+        # 1 - random() == 1: раннего обновления нет
+        monkeypatch.setattr(api_cache.random, 'random', lambda: 0.0)
+        api_cache.get_or_compute('test:early', compute, ttl=1)
+        assert compute.calls == 1
+        # Срок не наступил, но -0.1 * ln(1e-6) ≈ 1.4 с больше остатка
+        monkeypatch.setattr(api_cache.random, 'random', lambda: 1 - 1e-6)
+        api_cache.get_or_compute('test:early', compute, ttl=1)
+        assert compute.calls == 2, (
+            'Проверьте, что значение обновляется заранее с вероятностью, '
+            'растущей со временем пересчёта'
+        )
+
+    def test_04_failed_compute(self):
+        from django.core.cache import cache
+
+        from api.cache import get_or_compute
+
+        cache.clear()
+        calls = []
+
+        def fail_once():
+            calls.append(1)
+            time.sleep(0.1)
+            if len(calls) == 1:
+                raise RuntimeError('Сбой пересчёта')
+            return 'значение'
+
+        results = run_concurrently(
+            lambda: call_safely(
+                lambda: get_or_compute('test:failed', fail_once, ttl=60)
+            ),
+            count=3
+        )
+        assert sorted(map(str, results)) == [
+            'Сбой пересчёта', 'значение', 'значение'
+        ], 'Проверьте, что после сбоя пересчёт выполняет ждущий запрос'
+        assert len(calls) == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_cached_title_list(self, client, admin_client, admin):
+        from django.core.cache import cache
+
+        cache.clear()
+        create_titles(admin_client)
+        assert client.get('/api/v1/titles/').json()['count'] == 2
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == 2
+        assert not context.captured_queries, (
+            'Проверьте, что повторный запрос списка берётся из кэша'
+        )
+
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        data = client.get('/api/v1/titles/?ordering=-rating').json()
+        assert data['results'][0]['rating'] == 4, (
+            'Проверьте, что изменение рейтинга сбрасывает кэш списка'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert client.get('/api/v1/titles/').json()['count'] == 3
+        response = client.get('/api/v1/titles/?year_min=abc')
+        assert response.status_code == 400
+        assert client.get('/api/v1/titles/top/').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_invalidate_on_commit(self):
+        from django.core.cache import cache
+        from django.db import transaction
+
+        from api.cache import invalidate, version_key
+
+        cache.clear()
+        invalidate('test')
+        version = cache.get(version_key('test'))
+        with transaction.atomic():
+            invalidate('test')
+            assert cache.get(version_key('test')) == version, (
+                'Проверьте, что кэш сбрасывается только после фиксации '
+                'транзакции'
+            )
+        version = cache.get(version_key('test'))
+        assert version is not None
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                invalidate('test')
+                raise RuntimeError
+        assert cache.get(version_key('test')) == version, (
+            'Проверьте, что откат транзакции не сбрасывает кэш'
+        )
@@ -0,0 +1,103 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews
+
+
+class Test30ShardedCounters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_shards(self, client, admin_client, admin, settings,
+                       monkeypatch):
+        from reviews import counters
+        from reviews.models import TitleScoreCount
+        from reviews.ratings import recompute_ratings
+
+        settings.SCORE_COUNT_SHARDS = 4
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        recompute_ratings()
+        expected = client.get(f'/api/v1/titles/{title_id}/').json()
+        distribution = counters.get_distribution(title_id)
+
+        shards = iter([1, 2, 3, 1])
+        monkeypatch.setattr(
+            counters.random, 'randrange', lambda stop: next(shards)
+        )
+        counters.apply_score_delta(title_id, 7, 1)
+        counters.apply_score_delta(title_id, 7, 1)
+        counters.apply_score_delta(title_id, 7, -1)
+        counters.apply_score_delta(title_id, 7, -1)
+        rows = TitleScoreCount.objects.filter(title_id=title_id, score=7)
+        assert sorted(rows.values_list('shard', 'count')) == [
+            (0, 0), (1, 0), (2, 1), (3, -1)
+        ], 'Проверьте, что изменение счётчика попадает в выбранный шард'
+        assert counters.get_distribution(title_id) == distribution, (
+            'Проверьте, что чтение суммирует шарды, в том числе '
+            'отрицательные'
+        )
+        recompute_ratings()
+        assert client.get(
+            f'/api/v1/titles/{title_id}/?format=json'
+        ).json() == expected
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_compact(self, client, admin_client, admin, settings):
+        from reviews.counters import get_distribution
+        from reviews.models import TitleScoreCount
+
+        settings.SCORE_COUNT_SHARDS = 4
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        distributions = {
+            title['id']: get_distribution(title['id']) for title in titles
+        }
+        rows = TitleScoreCount.objects.count()
+        out = StringIO()
+        call_command('compact_score_counts', batch_size=1, stdout=out)
+        assert TitleScoreCount.objects.filter(shard__gt=0).count() == 0
+        remaining = TitleScoreCount.objects.count()
+        assert f'{rows - remaining} counter rows removed' in out.getvalue()
+        assert 'Successfully compacted score counters' in out.getvalue()
+        assert remaining == sum(
+            1 for distribution in distributions.values()
+            for count in distribution['distribution'].values() if count
+        ), 'Проверьте, что после сжатия у оценки остаётся одна строка'
+        assert {
+            title_id: get_distribution(title_id) for title_id in distributions
+        } == distributions
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_title_rows_after_commit(self, client, admin_client, admin):
+        from backend.models import Title
+        from reviews.models import Review
+
+        _, titles, user, _ = create_reviews(admin_client, admin)
+        title_id = titles[1]['id']
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as context:
+                Review.objects.create(
+                    title_id=title_id, author=user, text='Шедевр', score=10
+                )
+            writes = [
+                query['sql'] for query in context.captured_queries
+                if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+            ]
+            # Имя таблицы — первое имя в кавычках
+            assert {sql.split('"')[1] for sql in writes} == {
+                'reviews_review', 'reviews_titlescorecount'
+            }, (
+                'Проверьте, что в транзакции отзыв меняет только шарды '
+                f'счётчика, а не строки произведения:\n{writes}'
+            )
+            assert Title.objects.get(pk=title_id).review_count == 0
+        data = client.get(f'/api/v1/titles/{title_id}/').json()
+        assert (data['review_count'], data['rating']) == (1, 10), (
+            'Проверьте, что число отзывов и рейтинг обновляются после '
+            'фиксации транзакции'
+        )
+        response = client.get('/api/v1/titles/top/')
+        assert response.json()['results'][0]['title']['id'] == title_id
@@ -0,0 +1,175 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_users_api
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Тестовые обработчики: record запоминает аргументы, fail падает."""
+    from backend import jobs
+
+    calls = []
+    monkeypatch.setitem(jobs.HANDLERS, 'record', jobs.Handler(
+        lambda **kwargs: calls.append(kwargs), jobs.NORMAL, None, None
+    ))
+
+    def fail():
+        raise RuntimeError('Сбой задачи')
+
+    monkeypatch.setitem(jobs.HANDLERS, 'fail', jobs.Handler(
+        fail, jobs.NORMAL, 2, None
+    ))
+    return calls
+
+
+class Test31Jobs:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_mail(self, client, mailoutbox):
+        from backend.models import Job
+
+        data = {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == 200
+        assert not mailoutbox, (
+            'Проверьте, что письмо с кодом отправляется в фоне'
+        )
+        assert Job.objects.get().name == 'confirmation_code'
+
+        out = StringIO()
+        call_command('run_jobs', stdout=out)
+        assert '1 jobs run, 0 ready, 0 delayed' in out.getvalue()
+        assert 'Successfully processed job queue' in out.getvalue()
+        assert mailoutbox[0].to == [data['email']]
+        code = mailoutbox[0].body.rsplit(' ', 1)[-1]
+        response = client.post('/api/v1/auth/token/', data={
+            'username': data['username'], 'confirmation_code': code
+        })
+        assert response.status_code == 201, (
+            'Проверьте, что код из письма подходит для получения токена'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_priority_and_key(self, handlers):
+        from backend import jobs
+
+        jobs.enqueue('record', {'order': 'low'}, priority=jobs.LOW)
+        first = jobs.enqueue('record', {'order': 'normal'}, key='once')
+        assert jobs.enqueue('record', {'order': 'again'}, key='once') == (
+            first
+        ), 'Проверьте, что задача с тем же ключом ставится один раз'
+        jobs.enqueue('record', {'order': 'high'}, priority=jobs.HIGH)
+        jobs.enqueue('record', {'order': 'later'}, delay=60)
+        assert jobs.work() == 3
+        assert handlers == [
+            {'order': 'high'}, {'order': 'normal'}, {'order': 'low'}
+        ], 'Проверьте, что задачи выдаются по приоритету'
+        with pytest.raises(LookupError):
+            jobs.enqueue('unknown')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_retries(self, handlers, settings):
+        from django.utils import timezone
+
+        from backend import jobs
+        from backend.models import Job
+
+        settings.JOB_RETRY_DELAY = 30
+        job = jobs.enqueue('fail')
+        started = timezone.now()
+        assert jobs.work() == 1
+        job.refresh_from_db()
+        assert (job.status, job.attempts) == (Job.PENDING, 1)
+        assert 'Сбой задачи' in job.error
+        assert job.run_after >= started + timedelta(seconds=30), (
+            'Проверьте, что упавшая задача повторяется с задержкой'
+        )
+        assert jobs.work() == 0
+
+        Job.objects.update(run_after=timezone.now())
+        assert jobs.work() == 1
+        job.refresh_from_db()
+        assert (job.status, job.attempts) == (Job.FAILED, 2), (
+            'Проверьте, что после последней попытки задача не повторяется'
+        )
+        jobs.requeue(Job.objects.all())
+        job.refresh_from_db()
+        assert (job.status, job.attempts, job.error) == (Job.PENDING, 0, '')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_visibility_timeout(self, handlers):
+        from django.utils import timezone
+
+        from backend import jobs
+        from backend.models import Job
+
+        jobs.enqueue('record', {'order': 'first'})
+        [lost] = jobs.claim('crashed')
+        assert jobs.claim('other') == [], (
+            'Проверьте, что захваченная задача не выдаётся другому воркеру'
+        )
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        [job] = jobs.claim('other')
+        assert (job.pk, job.attempts) == (lost.pk, 2), (
+            'Проверьте, что задача с истёкшей арендой выдаётся снова'
+        )
+        jobs.finish(lost)
+        assert Job.objects.get().status == Job.RUNNING, (
+            'Проверьте, что воркер с истёкшей арендой не меняет задачу'
+        )
+        jobs.run(job)
+        assert Job.objects.get().status == Job.DONE
+        assert handlers == [{'order': 'first'}]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_thread_pool(self, handlers):
+        from backend import jobs
+
+        for index in range(6):
+            jobs.enqueue('record', {'order': index})
+        assert jobs.work(workers=3) == 6
+        assert sorted(call['order'] for call in handlers) == list(range(6))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_stats(self, admin_client, handlers):
+        from backend import jobs
+
+        jobs.enqueue('record')
+        jobs.enqueue('record', delay=60)
+        jobs.enqueue('fail')
+        jobs.work(names=['fail'])
+        user, _ = create_users_api(admin_client)
+        response = auth_client(user).get('/api/v1/jobs/stats/')
+        assert response.status_code == 403, (
+            'Проверьте, что статистика очереди доступна только администратору'
+        )
+        data = admin_client.get('/api/v1/jobs/stats/').json()
+        assert (data['depth'], data['delayed'], data['running']) == (1, 2, 0)
+        assert data['oldest_wait'] >= 0
+        assert data['queues']['record']['pending'] == 2
+        assert data['queues']['fail']['pending'] == 1
+        response = admin_client.get('/api/v1/jobs/?name=fail')
+        [job] = response.json()['results']
+        assert job['attempts'] == 1 and 'lease' not in job
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_background_populatedb(self, settings, tmp_path):
+        from backend.models import Genre, ImportJob
+
+        settings.IMPORT_UPLOAD_DIR = str(tmp_path / 'uploads')
+        path = tmp_path / 'genre.csv'
+        path.write_text('id,name,slug\n1,Драма,drama\n', encoding='utf-8')
+        out = StringIO()
+        call_command('populatedb', str(path), background=True, stdout=out)
+        job = ImportJob.objects.get()
+        assert f'genre.csv: queued as import #{job.pk}' in out.getvalue()
+        assert not Genre.objects.exists()
+        call_command('run_jobs', stdout=out)
+        assert list(Genre.objects.values_list('slug', flat=True)) == [
+            'drama'
+        ], 'Проверьте, что populatedb --background загружает файл в фоне'
+        assert path.exists()